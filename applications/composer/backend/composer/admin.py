@@ -7,6 +7,11 @@ from django.conf import settings
 from django.urls import path, reverse
 
 from composer.enums import RelationshipType
+from composer.services.cs_ingestion.custom_relationship_code import (
+    ALLOWED_MODULES,
+    CUSTOM_CODE_TIME_BUDGET,
+    SAFE_BUILTIN_NAMES,
+)
 from .views import index
 from typing import Any
 from django.db.models.query import QuerySet
@@ -149,6 +154,12 @@ class RelationshipAdmin(admin.ModelAdmin):
                 "&nbsp;&nbsp;- Region-layer pairs: list of dicts [{'region': 'region_uri', 'layer': 'layer_uri'}, ...]<br>"
                 "&nbsp;&nbsp;- Mixed: list combining both formats<br>"
                 "&nbsp;&nbsp;- Note: Region-layer pairs respect the 'update_anatomical_entities' flag<br><br>"
+                f"The code has {CUSTOM_CODE_TIME_BUDGET} seconds per statement and can only import "
+                f"{', '.join(sorted(ALLOWED_MODULES))}.<br>"
+                f"Available builtins: {', '.join(SAFE_BUILTIN_NAMES)}, and the builtin exception classes "
+                "(Exception, ValueError, ZeroDivisionError, RuntimeError...).<br>"
+                "These restrictions only catch mistakes, they are not a sandbox: only add code you trust.<br>"
+                "Code that does not compile stops the ingestion before any statement is processed.<br>"
                 "Errors are logged to the ingestion anomalies file and the relationship will be skipped."
             )
         return form
@@ -6,11 +6,13 @@ from drf_writable_nested.mixins import UniqueFieldsMixin
 from drf_writable_nested.serializers import WritableNestedModelSerializer
 from rest_framework import serializers
 
-from ..enums import RelationshipType, SentenceState, CSState
+from ..enums import RelationshipType, SentenceState, CSState, DestinationType, ViaType
 from ..pure_enums import BulkActionType
 from ..models import (
     AlertType,
     AnatomicalEntity,
+    BulkActionJob,
+    IngestionAnomaly,
     ConnectivityStatementTriple,
     ConnectivityStatementText,
     ConnectivityStatementAnatomicalEntity,
@@ -35,11 +37,13 @@ from ..models import (
     AnatomicalEntityMeta,
     GraphRenderingState,
 )
-from ..services.connections_service import get_complete_from_entities_for_destination, \
-    get_complete_from_entities_for_via
+from ..services.connections_service import get_implicit_from_entities
 from ..services.statement_service import get_statement_preview as get_statement_preview_aux
-from ..services.errors_service import get_connectivity_errors
+from ..services.errors_service import get_connectivity_errors, refresh_connectivity_errors
+from ..services.transition_service import TransitionEvaluator
+from ..services.relationship_service import get_relationship_catalog, get_relationship_options
 from composer.services.export.helpers.predicate_mapping import ExportRelationships, PredicateToDBMapping
+from composer.constants import CLONE_STATEMENTS_MAX_ITEMS, PREDICATE_MAPPING_MAX_URIS
 
 
 # MixIns
@@ -130,6 +134,10 @@ class AnatomicalEntityIntersectionSerializer(serializers.ModelSerializer):
         )
 
 
+# Context key of the map (id -> data) of the anatomical entities sideloaded in a response
+SIDELOADED_ENTITIES = "sideloaded_entities"
+
+
 class AnatomicalEntitySerializer(serializers.ModelSerializer):
     simple_entity = AnatomicalEntityMetaSerializer(read_only=True)
     region_layer = AnatomicalEntityIntersectionSerializer(read_only=True)
@@ -139,6 +147,18 @@ class AnatomicalEntitySerializer(serializers.ModelSerializer):
     def get_synonyms(obj):
         return ", ".join(synonym.name for synonym in obj.synonyms.all())
 
+    def to_representation(self, instance):
+        """
+        When the context has a sideloaded entities map, the entity is serialized into it
+        (once per response) and only its id is returned.
+        """
+        sideloaded_entities = self.context.get(SIDELOADED_ENTITIES)
+        if sideloaded_entities is None:
+            return super().to_representation(instance)
+        if instance.pk not in sideloaded_entities:
+            sideloaded_entities[instance.pk] = super().to_representation(instance)
+        return instance.pk
+
     class Meta:
         model = AnatomicalEntity
         fields = (
@@ -229,6 +249,18 @@ class PopulationSetSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "description")
 
 
+def get_layer_implicit_from_entities(context, layer):
+    """
+    Implicit from_entities of a via or destination. They are computed for all the layers
+    of the statement at once and kept in the serializer context.
+    """
+    implicit_from_entities = context.setdefault("implicit_from_entities", {})
+    statement_id = layer.connectivity_statement_id
+    if statement_id not in implicit_from_entities:
+        implicit_from_entities[statement_id] = get_implicit_from_entities(layer.connectivity_statement)
+    return implicit_from_entities[statement_id].get((layer.__class__, layer.pk), [])
+
+
 class ViaSerializerDetails(serializers.ModelSerializer):
     """Via Serializer with Custom Logic for from_entities"""
 
@@ -267,9 +299,11 @@ class ViaSerializerDetails(serializers.ModelSerializer):
         representation = super().to_representation(instance)
 
         # Check if from_entities is empty
-        if not instance.from_entities.exists():
-            appropriate_entities = get_complete_from_entities_for_via(instance)
-            representation['from_entities'] = AnatomicalEntitySerializer(appropriate_entities, many=True).data
+        if not representation['from_entities']:
+            appropriate_entities = get_layer_implicit_from_entities(self.context, instance)
+            representation['from_entities'] = AnatomicalEntitySerializer(
+                appropriate_entities, many=True, context=self.context
+            ).data
 
         return representation
 
@@ -361,9 +395,11 @@ class DestinationSerializerDetails(serializers.ModelSerializer):
         representation = super().to_representation(instance)
 
         # Check if from_entities is empty
-        if not instance.from_entities.exists():
-            appropriate_entities = get_complete_from_entities_for_destination(instance)
-            representation['from_entities'] = AnatomicalEntitySerializer(appropriate_entities, many=True).data
+        if not representation['from_entities']:
+            appropriate_entities = get_layer_implicit_from_entities(self.context, instance)
+            representation['from_entities'] = AnatomicalEntitySerializer(
+                appropriate_entities, many=True, context=self.context
+            ).data
 
         return representation
 
@@ -498,9 +534,8 @@ class SentenceSerializer(FixManyToManyMixin, FixedWritableNestedModelSerializer)
         return instance.has_notes
 
     def get_available_transitions(self, instance) -> list[SentenceState]:
-        request = self.context.get("request", None)
-        user = request.user if request else None
-        return [t.name for t in instance.get_available_user_state_transitions(user)]
+        evaluator = TransitionEvaluator.for_request(self.context.get("request", None))
+        return [t.name for t in evaluator.get_available_transitions(instance)]
 
     class Meta:
         model = Sentence
@@ -535,6 +570,38 @@ class SentenceSerializer(FixManyToManyMixin, FixedWritableNestedModelSerializer)
         )
 
 
+# Context keys of the sparse fieldsets, requested with ?fields= and ?expand=
+REQUESTED_FIELDS = "requested_fields"
+EXPANDED_FIELDS = "expanded_fields"
+
+
+class SparseFieldsetsSerializerMixin:
+    """
+    Restricts the output to the fields requested in the context ("id" is always kept),
+    so the method fields that are not requested are never evaluated.
+    Related objects are expanded by default; once a sparse fieldset is requested they
+    are only expanded when listed in the expanded fields.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested_fields = self.context.get(REQUESTED_FIELDS)
+        if requested_fields is not None:
+            for field_name in list(fields):
+                if field_name != "id" and field_name not in requested_fields:
+                    fields.pop(field_name)
+        return fields
+
+    def is_requested(self, field_name):
+        requested_fields = self.context.get(REQUESTED_FIELDS)
+        return requested_fields is None or field_name in requested_fields
+
+    def is_expanded(self, field_name):
+        if REQUESTED_FIELDS not in self.context and EXPANDED_FIELDS not in self.context:
+            return True
+        return field_name in self.context.get(EXPANDED_FIELDS, ())
+
+
 class BaseConnectivityStatementSerializer(FixManyToManyMixin, FixedWritableNestedModelSerializer):
     id = serializers.IntegerField(
         required=False, default=None, allow_null=True, read_only=True
@@ -779,12 +846,13 @@ class ConnectivityStatementAnatomicalEntitySerializer(serializers.ModelSerialize
         representation = super().to_representation(instance)
         representation['anatomical_entities'] = AnatomicalEntitySerializer(
             instance.anatomical_entities.all(), 
-            many=True
+            many=True,
+            context=self.context,
         ).data
         return representation
 
 
-class ConnectivityStatementSerializer(BaseConnectivityStatementSerializer):
+class ConnectivityStatementSerializer(SparseFieldsetsSerializerMixin, BaseConnectivityStatementSerializer):
     """Connectivity Statement"""
 
     sentence_id = serializers.IntegerField(required=False)
@@ -824,9 +892,8 @@ class ConnectivityStatementSerializer(BaseConnectivityStatementSerializer):
 
 
     def get_available_transitions(self, instance) -> list[CSState]:
-        request = self.context.get("request", None)
-        user = request.user if request else None
-        return [t.name for t in instance.get_available_user_state_transitions(user) if t.name != CSState.DEPRECATED]
+        evaluator = TransitionEvaluator.for_request(self.context.get("request", None))
+        return [t.name for t in evaluator.get_available_transitions(instance) if t.name != CSState.DEPRECATED]
 
     def get_journey(self, instance):
         if 'journey' not in self.context:
@@ -848,29 +915,27 @@ class ConnectivityStatementSerializer(BaseConnectivityStatementSerializer):
     def get_statement_triples(self, instance):
         """Get triple-based relationships grouped by relationship ID"""
         statement_triples = instance.connectivitystatementtriple_set.all()
-        grouped = {}
-
-        for statement_triple in statement_triples:
-            relationship = statement_triple.relationship.id
-            serialized = ConnectivityStatementTripleSerializer(statement_triple).data
-            
-            # Since triples is now always M2M, return consistent structure
-            grouped[relationship] = serialized
+        serialized = ConnectivityStatementTripleSerializer(statement_triples, many=True).data
 
-        return grouped
+        # Since triples is now always M2M, return consistent structure
+        return {
+            statement_triple.relationship_id: data
+            for statement_triple, data in zip(statement_triples, serialized)
+        }
 
     def get_statement_texts(self, instance):
         """Get text-based relationships"""
         texts = instance.connectivitystatementtext_set.all()
-        return {text.relationship.id: ConnectivityStatementTextSerializer(text).data for text in texts}
+        serialized = ConnectivityStatementTextSerializer(texts, many=True).data
+        return {text.relationship_id: data for text, data in zip(texts, serialized)}
 
     def get_statement_anatomical_entities(self, instance):
         """Get anatomical entity-based relationships"""
         anatomical_entities = instance.connectivitystatementanatomicalentity_set.all()
-        return {
-            ae.relationship.id: ConnectivityStatementAnatomicalEntitySerializer(ae).data 
-            for ae in anatomical_entities
-        }
+        serialized = ConnectivityStatementAnatomicalEntitySerializer(
+            anatomical_entities, many=True, context=self.context
+        ).data
+        return {ae.relationship_id: data for ae, data in zip(anatomical_entities, serialized)}
 
     def to_representation(self, instance):
         """
@@ -879,9 +944,13 @@ class ConnectivityStatementSerializer(BaseConnectivityStatementSerializer):
         representation = super().to_representation(instance)
         depth = self.context.get('depth', 0)
 
-        if depth < 1:
+        if depth < 1 and self.is_requested("forward_connection") and self.is_expanded("forward_connection"):
+            forward_connections = list(instance.forward_connection.all())
+            if self.is_requested("errors"):
+                # compute the missing errors of all the forward connections with one query
+                refresh_connectivity_errors(forward_connections)
             representation["forward_connection"] = ConnectivityStatementSerializer(
-                instance.forward_connection.all(),
+                forward_connections,
                 many=True,
                 context={**self.context, 'depth': depth + 1}
             ).data
@@ -1073,12 +1142,17 @@ class KnowledgeStatementSerializer(ConnectivityStatementSerializer):
         representation = super(ConnectivityStatementSerializer, self).to_representation(instance)
         depth = self.context.get('depth', 0)
 
-        if depth < 1:
-            representation["forward_connection"] = KnowledgeStatementSerializer(
-                instance.forward_connection.all(),
-                many=True,
-                context={**self.context, 'depth': depth + 1}
-            ).data
+        if depth < 1 and self.is_requested("forward_connection"):
+            if self.is_expanded("forward_connection"):
+                representation["forward_connection"] = KnowledgeStatementSerializer(
+                    instance.forward_connection.all(),
+                    many=True,
+                    context={**self.context, 'depth': depth + 1}
+                ).data
+            else:
+                representation["forward_connection"] = [
+                    forward_connection.pk for forward_connection in instance.forward_connection.all()
+                ]
 
         if 'journey' in self.context:
             del self.context['journey']
@@ -1206,6 +1280,94 @@ class BulkActionResponseSerializer(serializers.Serializer):
     updated_count = serializers.IntegerField()
 
 
+class BatchUpdateResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.IntegerField()
+    modified_date = serializers.DateTimeField(required=False)
+    errors = serializers.JSONField(required=False)
+
+
+class CloneStatementsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=CLONE_STATEMENTS_MAX_ITEMS,
+        help_text="IDs of the statements to clone.",
+    )
+
+
+class TopologyViaSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=ViaType.choices, required=False)
+    anatomical_entities = serializers.ListField(child=serializers.IntegerField(), required=False)
+    from_entities = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class TopologyDestinationSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=DestinationType.choices, required=False)
+    anatomical_entities = serializers.ListField(child=serializers.IntegerField(), required=False)
+    from_entities = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class StatementTopologySerializer(serializers.Serializer):
+    """
+    Origins, vias and destinations of a statement, written in a single request.
+    The vias are ordered as given. Anatomical entities are referenced by id and
+    checked with a single query.
+    """
+    origins = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    vias = TopologyViaSerializer(many=True, required=False, default=list)
+    destinations = TopologyDestinationSerializer(many=True, required=False, default=list)
+
+    def validate(self, data):
+        entity_ids = set(data["origins"])
+        for layer in [*data["vias"], *data["destinations"]]:
+            entity_ids.update(layer.get("anatomical_entities", []))
+            entity_ids.update(layer.get("from_entities", []))
+
+        unknown_ids = entity_ids - set(
+            AnatomicalEntity.objects.filter(id__in=entity_ids).values_list("id", flat=True)
+        )
+        if unknown_ids:
+            raise serializers.ValidationError(
+                {"anatomical_entities": f"Unknown anatomical entities: {sorted(unknown_ids)}"}
+            )
+        return data
+
+
+class BulkActionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkActionJob
+        fields = (
+            "id",
+            "action",
+            "status",
+            "total",
+            "processed",
+            "succeeded",
+            "failed",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+
+class IngestionAnomalySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestionAnomaly
+        fields = (
+            "id",
+            "severity",
+            "type",
+            "statement_id",
+            "entity_id",
+            "message",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
 class PredicateMappingRequestSerializer(serializers.Serializer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1227,9 +1389,18 @@ class PredicateMappingRequestSerializer(serializers.Serializer):
         return data
 
 
+    def validate_request_size(self, data):
+        uris_count = sum(len(uris) for uris in data.values() if isinstance(uris, list))
+        if uris_count > PREDICATE_MAPPING_MAX_URIS:
+            raise serializers.ValidationError(
+                f"Too many URIs ({uris_count}), at most {PREDICATE_MAPPING_MAX_URIS} are accepted per request"
+            )
+        return data
+
     def validate(self, data):
         request_body = self.initial_data
         self.validate_predicate_supported(request_body)
+        self.validate_request_size(request_body)
         return super().validate(request_body)
 
     
@@ -1244,5 +1415,7 @@ class RelationshipSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "predicate_name", "predicate_uri", "type", "order", "options"]
 
     def get_options(self, obj):
-        triples = Triple.objects.filter(relationship=obj)
-        return TripleSerializer(triples, many=True).data
+        # the catalog version is read once per request, not once per relationship
+        if "relationship_catalog" not in self.context:
+            self.context["relationship_catalog"] = get_relationship_catalog()
+        return get_relationship_options(obj.id, self.context["relationship_catalog"])
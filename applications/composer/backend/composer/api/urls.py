@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     AnatomicalEntityViewSet,
+    BulkActionJobViewSet,
     ConnectivityStatementTripleViewSet,
     ConnectivityStatementTextViewSet,
     ConnectivityStatementAnatomicalEntityViewSet,
@@ -52,6 +53,7 @@ router.register(r"via", ViaViewSet, basename="via")
 router.register(r"destination", DestinationViewSet, basename="destination")
 router.register(r"statementAlert", StatementAlertViewSet, basename="statementAlert")
 router.register(r"relationship", RelationshipViewSet, basename="relationship")
+router.register(r"bulk-action-job", BulkActionJobViewSet, basename="bulk-action-job")
 router.register(r"connectivityStatementTriple", ConnectivityStatementTripleViewSet, basename="ConnectivityStatementTriple")
 router.register(r"connectivityStatementText", ConnectivityStatementTextViewSet, basename="ConnectivityStatementText")
 router.register(r"connectivityStatementAnatomicalEntity", ConnectivityStatementAnatomicalEntityViewSet, basename="ConnectivityStatementAnatomicalEntity")
@@ -1,5 +1,9 @@
 import json
-from django.http import HttpResponse, Http404
+import os
+from django.http import HttpResponse, HttpResponseNotModified, Http404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.db import transaction
 from django.db.models import Q
 from drf_react_template.schema_form_encoder import SchemaProcessor, UiSchemaProcessor
 from drf_spectacular.types import OpenApiTypes
@@ -15,9 +19,17 @@ from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Case, When, Value, IntegerField
 from composer.services.export.helpers.predicate_mapping import PredicateToDBMapping
-from composer.services.dynamic_schema_service import inject_dynamic_relationship_schema
-from composer.services import bulk_service
+from composer.services.predicate_mapping_service import get_labels_for_uris, get_labels_version
+from composer.services.dynamic_schema_service import (
+    get_cached_jsonschemas,
+    inject_dynamic_relationship_schema,
+)
+from composer.services import bulk_service, bulk_jobs_service, cloning_service
+from composer.services.derived_fields_service import coalesce_derived_fields
+from composer.services.topology_service import replace_statement_topology
+from composer.constants import BATCH_UPDATE_MAX_ITEMS
 from composer.pure_enums import BulkActionType
+from composer.enums import CSState, IngestionAnomalySeverity, IngestionAnomalyType
 from composer.services.state_services import (
     ConnectivityStatementStateService,
     SentenceStateService,
@@ -39,8 +51,12 @@ from .serializers import (
     AssignPopulationSetSerializer,
     AssignTagsSerializer,
     AssignUserSerializer,
+    BulkActionJobSerializer,
+    IngestionAnomalySerializer,
     BulkActionResponseSerializer,
+    BatchUpdateResultSerializer,
     ChangeStatusSerializer,
+    CloneStatementsSerializer,
     ConnectivityStatementTripleSerializer,
     ConnectivityStatementTextSerializer,
     ConnectivityStatementAnatomicalEntitySerializer,
@@ -69,15 +85,22 @@ from .serializers import (
     WriteNoteSerializer,
     PredicateMappingSerializer,
     PredicateMappingRequestSerializer,
+    StatementTopologySerializer,
+    SIDELOADED_ENTITIES,
+    REQUESTED_FIELDS,
+    EXPANDED_FIELDS,
 )
 from .permissions import (
     IsStaffUserIfExportedStateInConnectivityStatement,
     IsOwnerOrAssignOwnerOrCreateOrReadOnly,
     IsOwnerOfConnectivityStatementOrReadOnly,
+    check_related_entity_ownership,
 )
 from ..models import (
     AlertType,
     AnatomicalEntity,
+    BulkActionJob,
+    IngestionAnomaly,
     Phenotype,
     ProjectionPhenotype,
     ConnectivityStatement,
@@ -296,20 +319,115 @@ class TransitionMixin(viewsets.GenericViewSet):
         return Response(self.get_serializer(instance).data)
 
 
+class SparseFieldsetsMixin:
+    """
+    Sparse fieldsets for the statement endpoints: ?fields=id,knowledge_statement,...
+    limits the output (and the prefetched relations) to the listed fields, and
+    ?expand=forward_connection returns the forward connections in full instead of ids.
+    Without these parameters the full representation is returned.
+    """
+
+    def get_sparse_fieldsets(self):
+        request = getattr(self, "request", None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return {}
+
+        sparse_fieldsets = {}
+        for param, context_key in (("fields", REQUESTED_FIELDS), ("expand", EXPANDED_FIELDS)):
+            if param in request.query_params:
+                sparse_fieldsets[context_key] = {
+                    name.strip()
+                    for value in request.query_params.getlist(param)
+                    for name in value.split(",")
+                    if name.strip()
+                }
+        return sparse_fieldsets
+
+    def get_prefetched_queryset(self, queryset, default_fields=None):
+        sparse_fieldsets = self.get_sparse_fieldsets()
+        return ConnectivityStatement.objects.prefetch_for_fields(
+            queryset,
+            fields=sparse_fieldsets.get(REQUESTED_FIELDS, default_fields),
+            expand_forward_connection=not sparse_fieldsets
+            or "forward_connection" in sparse_fieldsets.get(EXPANDED_FIELDS, ()),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update(self.get_sparse_fieldsets())
+        return context
+
+
+class SideloadEntitiesMixin:
+    """
+    Opt-in compact responses: with ?sideload_entities=true each anatomical entity is
+    serialized once, in a top-level "entities" map (by id), and referenced by its id
+    everywhere else in the response.
+    """
+
+    sideload_entities_param = "sideload_entities"
+
+    def is_sideloading_entities(self):
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+        return request.query_params.get(self.sideload_entities_param, "").lower() in ("true", "1")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_sideloading_entities():
+            if not hasattr(self, "sideloaded_entities"):
+                self.sideloaded_entities = {}
+            context[SIDELOADED_ENTITIES] = self.sideloaded_entities
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            hasattr(self, "sideloaded_entities")
+            and isinstance(getattr(response, "data", None), dict)
+            and status.is_success(response.status_code)
+        ):
+            response.data["entities"] = self.sideloaded_entities
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
 class CSCloningMixin(viewsets.GenericViewSet):
     @action(detail=True, methods=["get"], url_path="clone_statement")
     def clone_statement(self, request, pk=None, statement_id=None):
-        instance = self.get_object()
-        instance.pk = None
-        instance.origins = None
-        instance.save()
-        instance.species.add(*self.get_object().species.all())
-        provenances = (
-            Provenance(connectivity_statement=instance, uri=provenance.uri)
-            for provenance in self.get_object().provenance_set.all()
+        clone = cloning_service.clone_statement(self.get_object())
+        return Response(self.get_serializer(clone).data)
+
+    @extend_schema(
+        request=CloneStatementsSerializer,
+        responses={201: BaseConnectivityStatementSerializer(many=True)},
+    )
+    @action(detail=False, methods=["post"], url_path="clone_statements")
+    def clone_statements(self, request):
+        """
+        Clones a batch of statements, returned in the order of the given IDs.
+        """
+        serializer = CloneStatementsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+
+        statements = self.get_queryset().prefetch_related(None).in_bulk(ids)
+        missing_ids = [statement_id for statement_id in ids if statement_id not in statements]
+        if missing_ids:
+            return Response(
+                {"error": f"Statements not found: {missing_ids}"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        clones = cloning_service.clone_statements(statements[statement_id] for statement_id in ids)
+        clones_by_id = ConnectivityStatement.objects.for_list().in_bulk([clone.pk for clone in clones])
+        return Response(
+            BaseConnectivityStatementSerializer(
+                [clones_by_id[clone.pk] for clone in clones],
+                many=True,
+                context=self.get_serializer_context(),
+            ).data,
+            status=status.HTTP_201_CREATED,
         )
-        Provenance.objects.bulk_create(provenances)
-        return Response(self.get_serializer(instance).data)
 
 
 class BulkActionMixin:
@@ -407,7 +525,7 @@ class BulkActionMixin:
             serializers=bulk_action_serializers,
             resource_type_field_name="action",
         ),
-        responses={200: BulkActionResponseSerializer},
+        responses={200: BulkActionResponseSerializer, 202: BulkActionJobSerializer},
         filters=True,
     )
 
@@ -416,6 +534,8 @@ class BulkActionMixin:
         """
         Apply a bulk action to the selected items and return the number
         of items updated successfully.
+        Long running actions (status changes) are queued instead, and the
+        created job is returned so its progress can be followed.
         """
         action_type = request.data.get("action")
         serializer_mapping = self.get_bulk_action_serializer_mapping()
@@ -434,6 +554,13 @@ class BulkActionMixin:
                 {"error": "No items found."}, status=status.HTTP_400_BAD_REQUEST
             )
 
+        if bulk_jobs_service.is_job_action(action_type):
+            # long running actions are executed in chunks by the job worker
+            job = bulk_jobs_service.create_bulk_action_job(
+                qs, action_type, request.user, dict(serializer.validated_data)
+            )
+            return Response(BulkActionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
         mapping = self.get_bulk_action_mapping()
         if action_type not in mapping:
             return Response(
@@ -561,6 +688,8 @@ class ConnectivityStatementViewSet(
     TransitionMixin,
     AssignOwnerMixin,
     CSCloningMixin,
+    SideloadEntitiesMixin,
+    SparseFieldsetsMixin,
     viewsets.ModelViewSet,
     BulkActionMixin,
 ):
@@ -587,9 +716,6 @@ class ConnectivityStatementViewSet(
         BulkActionType.WRITE_NOTE.value: lambda qs, req, data: bulk_service.write_note(
             qs, req.user, data["note_text"]
         ),
-        BulkActionType.CHANGE_STATUS.value: lambda qs, req, data: bulk_service.change_status(
-            qs, data["new_status"], req.user
-        ),
         BulkActionType.ASSIGN_POPULATION_SET.value: lambda qs, req, data: bulk_service.assign_population_set(
             qs, data["population_set_id"]
         ),
@@ -604,8 +730,13 @@ class ConnectivityStatementViewSet(
 
 
     def get_queryset(self):
-        if self.action == "list" and "sentence_id" not in self.request.query_params:
-            return ConnectivityStatement.objects.excluding_draft()
+        if self.action == "list":
+            queryset = ConnectivityStatement.objects.for_list()
+            if "sentence_id" not in self.request.query_params:
+                queryset = queryset.exclude(state=CSState.DRAFT)
+            return queryset
+        if self.action == "retrieve":
+            return self.get_prefetched_queryset(ConnectivityStatement.objects.get_queryset())
         return super().get_queryset()
 
     def get_assignable_users_data(self):
@@ -646,9 +777,125 @@ class ConnectivityStatementViewSet(
     def partial_update(self, request, *args, **kwargs):
         return super().partial_update(request, *args, **kwargs)
 
+    def has_object_permissions(self, request, obj):
+        return all(
+            permission.has_object_permission(request, self, obj)
+            for permission in self.get_permissions()
+        )
+
+    @extend_schema(
+        request=ConnectivityStatementUpdateSerializer(many=True),
+        responses={200: BatchUpdateResultSerializer(many=True), 400: BatchUpdateResultSerializer(many=True)},
+    )
+    @action(detail=False, methods=["patch"], url_path="batch")
+    def batch_update(self, request):
+        """
+        Applies a list of partial updates (each one with the statement "id") in a single transaction.
+        Nothing is written unless every update is found, allowed and valid.
+        Journeys, graph states and statement previews are recomputed once per statement.
+        Returns one compact result per update.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response(
+                {"error": "Expected a non-empty list of partial updates."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > BATCH_UPDATE_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {BATCH_UPDATE_MAX_ITEMS} updates are accepted per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = [item.get("id") for item in items]
+        if None in ids or len(set(ids)) != len(ids):
+            return Response(
+                {"error": "Each update needs a distinct statement id."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        statements = self.get_queryset().in_bulk(ids)
+        context = self.get_serializer_context()
+        valid_serializers, failures = [], []
+        for item in items:
+            statement = statements.get(item["id"])
+            if statement is None:
+                failures.append({"id": item["id"], "status": status.HTTP_404_NOT_FOUND, "errors": {"detail": "Not found."}})
+                continue
+            if not self.has_object_permissions(request, statement):
+                failures.append({"id": item["id"], "status": status.HTTP_403_FORBIDDEN, "errors": {"detail": "Permission denied."}})
+                continue
+            serializer = ConnectivityStatementUpdateSerializer(statement, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                failures.append({"id": item["id"], "status": status.HTTP_400_BAD_REQUEST, "errors": serializer.errors})
+                continue
+            valid_serializers.append(serializer)
+
+        if failures:
+            return Response(BatchUpdateResultSerializer(failures, many=True).data, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(), coalesce_derived_fields():
+            for serializer in valid_serializers:
+                serializer.save()
+
+        results = [
+            {"id": serializer.instance.id, "status": status.HTTP_200_OK, "modified_date": serializer.instance.modified_date}
+            for serializer in valid_serializers
+        ]
+        return Response(BatchUpdateResultSerializer(results, many=True).data)
+
+    def get_statement_response(self, connectivity_statement, response_status=status.HTTP_200_OK):
+        connectivity_statement = ConnectivityStatement.objects.for_retrieve().get(pk=connectivity_statement.pk)
+        return Response(
+            ConnectivityStatementSerializer(connectivity_statement, context=self.get_serializer_context()).data,
+            status=response_status,
+        )
+
+    @extend_schema(
+        request=StatementTopologySerializer,
+        responses={200: ConnectivityStatementSerializer},
+    )
+    @action(detail=True, methods=["put"], url_path="topology")
+    def topology(self, request, pk=None):
+        """
+        Replaces the origins, vias and destinations of the statement in a single request.
+        """
+        connectivity_statement = self.get_object()
+        serializer = StatementTopologySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        replace_statement_topology(connectivity_statement, **serializer.validated_data)
+        return self.get_statement_response(connectivity_statement)
+
+    @extend_schema(
+        request=ConnectivityStatementSerializer,
+        responses={201: ConnectivityStatementSerializer},
+    )
+    @action(detail=False, methods=["post"], url_path="with-topology")
+    def create_with_topology(self, request):
+        """
+        Creates a statement together with its origins, vias and destinations.
+        Takes the statement fields plus the "origins", "vias" and "destinations"
+        of the topology endpoint.
+        """
+        check_related_entity_ownership(request)
+        topology_serializer = StatementTopologySerializer(data=request.data)
+        topology_serializer.is_valid(raise_exception=True)
+        serializer = self.get_serializer(data={
+            key: value
+            for key, value in request.data.items()
+            if key not in StatementTopologySerializer().fields
+        })
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic(), coalesce_derived_fields():
+            self.perform_create(serializer)
+            replace_statement_topology(serializer.instance, **topology_serializer.validated_data)
+        return self.get_statement_response(serializer.instance, status.HTTP_201_CREATED)
+
 
 @extend_schema(tags=["public"])
 class KnowledgeStatementViewSet(
+    SideloadEntitiesMixin,
+    SparseFieldsetsMixin,
     generics.ListAPIView,
 ):
     """
@@ -671,6 +918,26 @@ class KnowledgeStatementViewSet(
     def get_serializer_class(self):
         return KnowledgeStatementSerializer
 
+    def get_queryset(self):
+        return self.get_prefetched_queryset(
+            super().get_queryset(),
+            default_fields=(*KnowledgeStatementSerializer.Meta.fields, "forward_connection"),
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "fields",
+                OpenApiTypes.STR,
+                description="Comma separated list of the fields to return.",
+            ),
+            OpenApiParameter(
+                "expand",
+                OpenApiTypes.STR,
+                description="Comma separated list of the related fields to expand (forward_connection).",
+            ),
+        ],
+    )
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
         return response
@@ -695,24 +962,42 @@ class PredicateMappingViewSet(APIView):
         request_serializer.is_valid(raise_exception=True)
         validated_data = request_serializer.validated_data
 
+        # resolve the uris of all the predicates sharing a model together
+        uris_by_model = {}
+        for predicate_name, uris in validated_data.items():
+            model = PredicateToDBMapping[predicate_name].value
+            uris_by_model.setdefault(model, set()).update(uris)
+        version = get_labels_version()
+        labels_by_model = {
+            model: get_labels_for_uris(model, uris, version) for model, uris in uris_by_model.items()
+        }
+
         response_data = {}
         for predicate_name, uris in validated_data.items():
             model = PredicateToDBMapping[predicate_name].value
-            uri_to_labels = {}
-            for uri in uris:
-                if issubclass(model, AnatomicalEntity):
-                    obj = AnatomicalEntity.objects.get_by_ontology_uri(uri)
-                else:
-                    obj = model.objects.filter(ontology_uri=uri).first()
-                labels = [obj.name] if obj else []
-                if isinstance(obj, AnatomicalEntity):
-                    labels.extend([synonym.name for synonym in obj.synonyms.all()])
-                uri_to_labels[uri] = labels
-            response_data[predicate_name] = uri_to_labels
+            response_data[predicate_name] = {uri: labels_by_model[model][uri] for uri in uris}
         serializer = PredicateMappingSerializer(response_data)
         return Response(serializer.data)
 
 
+class BulkActionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Bulk action jobs: progress of the bulk actions running in the background.
+    """
+
+    queryset = BulkActionJob.objects.all()
+    serializer_class = BulkActionJobSerializer
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Tag
@@ -750,9 +1035,6 @@ class SentenceViewSet(
         BulkActionType.WRITE_NOTE.value: lambda qs, req, data: bulk_service.write_note(
             qs, req.user, data["note_text"]
         ),
-        BulkActionType.CHANGE_STATUS.value: lambda qs, req, data: bulk_service.change_status(
-            qs, data["new_status"], req.user
-        ),
         BulkActionType.ASSIGN_POPULATION_SET.value: lambda qs, req, data: bulk_service.assign_population_set(
             qs, data["population_set_id"]
         ),
@@ -772,10 +1054,12 @@ class SentenceViewSet(
         return Response(batch_names)
 
     def get_queryset(self):
+        queryset = (
+            Sentence.objects.for_list() if self.action == "list" else super().get_queryset()
+        )
         if "ordering" not in self.request.query_params:
             return (
-                super()
-                .get_queryset()
+                queryset
                 .annotate(
                     is_current_user=Case(
                         When(owner=self.request.user, then=Value(1)),
@@ -785,7 +1069,7 @@ class SentenceViewSet(
                 )
                 .order_by("-is_current_user", "-modified_date")
             )
-        return super().get_queryset()
+        return queryset
 
 
 class SpecieViewSet(viewsets.ReadOnlyModelViewSet):
@@ -932,11 +1216,7 @@ class ConnectivityStatementAnatomicalEntityViewSet(viewsets.ModelViewSet):
 
 
 
-@extend_schema(
-    responses=OpenApiTypes.OBJECT,
-)
-@api_view(["GET"])
-def jsonschemas(request):
+def render_jsonschemas():
     serializers = [
         ConnectivityStatementSerializer,
         SentenceSerializer,
@@ -968,14 +1248,46 @@ def jsonschemas(request):
         separators=INDENT_SEPARATORS,
     )
     ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
-    data = bytes(ret.encode("utf-8"))
-    return HttpResponse(data)
+    return bytes(ret.encode("utf-8"))
+
+
+def etag_matches(etag, if_none_match):
+    """
+    Weak comparison of etag with the entity tags of an If-None-Match header.
+    """
+    etags = parse_etags(if_none_match)
+    if etags == ["*"]:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in etags)
+
+
+@extend_schema(
+    responses=OpenApiTypes.OBJECT,
+)
+@api_view(["GET"])
+def jsonschemas(request):
+    # the schemas only change with the code or the Relationship/Triple rows
+    rendered = get_cached_jsonschemas(render_jsonschemas)
+    etag = rendered["etag"]
+
+    if etag_matches(etag, request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    elif "gzip" in request.headers.get("Accept-Encoding", ""):
+        response = HttpResponse(rendered["gzip"])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(rendered["raw"])
+
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
 
 
 class IngestionLogFileView(APIView):
     """
     API endpoint to download ingestion log files.
     Staff-only access to download CSV log files generated during the ingestion process.
+    The anomalies stored in the database by the last ingestion can also be paged and filtered.
     """
     permission_classes = [permissions.IsAdminUser]
     
@@ -989,6 +1301,38 @@ class IngestionLogFileView(APIView):
                 enum=['anomalies', 'ingested'],
                 required=True,
             ),
+            OpenApiParameter(
+                name='output',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='"file" (default) downloads the CSV file, "records" pages the anomalies stored '
+                            'in the database (anomalies log only)',
+                enum=['file', 'records'],
+                required=False,
+            ),
+            OpenApiParameter(
+                name='statement_id',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only the anomalies of this statement reference uri (records output)',
+                required=False,
+            ),
+            OpenApiParameter(
+                name='severity',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only the anomalies of this severity (records output)',
+                enum=IngestionAnomalySeverity.values,
+                required=False,
+            ),
+            OpenApiParameter(
+                name='type',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only the anomalies of this type (records output)',
+                enum=IngestionAnomalyType.values,
+                required=False,
+            ),
         ],
         responses={
             200: OpenApiTypes.BINARY,
@@ -1002,15 +1346,18 @@ class IngestionLogFileView(APIView):
         
         Query Parameters:
         - log_type: 'anomalies' or 'ingested'
+        - output: 'file' or 'records'
+        - statement_id, severity, type: filters of the 'records' output
         
         Returns:
-        - CSV file download
+        - CSV file download, or a page of anomalies
         """
-        import os
-        from django.http import FileResponse
+        from django.http import StreamingHttpResponse
         from composer.constants import INGESTION_ANOMALIES_LOG_PATH, INGESTION_INGESTED_LOG_PATH
+        from composer.services.cs_ingestion.logging_service import get_log_file_paths
         
         log_type = request.query_params.get('log_type')
+        output = request.query_params.get('output', 'file')
         
         if not log_type:
             return Response(
@@ -1029,9 +1376,25 @@ class IngestionLogFileView(APIView):
                 {'error': 'Invalid log_type. Use "anomalies" or "ingested"'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        if output == 'records':
+            if log_type != 'anomalies':
+                return Response(
+                    {'error': 'The records output is only available for the anomalies log'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return self.get_anomaly_records(request)
+        if output != 'file':
+            return Response(
+                {'error': 'Invalid output. Use "file" or "records"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The anomalies log is rotated, its files are served oldest first
+        log_paths = get_log_file_paths(log_path) if log_type == 'anomalies' else [log_path]
         
         # Check if file exists
-        if not os.path.exists(log_path):
+        if not any(os.path.exists(path) for path in log_paths):
             return Response(
                 {'error': f'Log file not found: {log_path}'},
                 status=status.HTTP_404_NOT_FOUND
@@ -1039,8 +1402,7 @@ class IngestionLogFileView(APIView):
         
         # Serve the file for download
         try:
-            file_handle = open(log_path, 'rb')
-            response = FileResponse(file_handle, content_type='text/csv')
+            response = StreamingHttpResponse(read_files(log_paths), content_type='text/csv')
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
             
@@ -1049,3 +1411,33 @@ class IngestionLogFileView(APIView):
                 {'error': f'Error reading log file: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    def get_anomaly_records(self, request):
+        from rest_framework.pagination import LimitOffsetPagination
+
+        queryset = IngestionAnomaly.objects.all()
+        statement_id = request.query_params.get('statement_id')
+        if statement_id:
+            queryset = queryset.filter(statement_id=statement_id)
+        for field, choices in (('severity', IngestionAnomalySeverity), ('type', IngestionAnomalyType)):
+            value = request.query_params.get(field)
+            if value:
+                if value not in choices.values:
+                    return Response(
+                        {'error': f'Invalid {field}. Use one of: {", ".join(choices.values)}'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                queryset = queryset.filter(**{field: value})
+
+        paginator = LimitOffsetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(IngestionAnomalySerializer(page, many=True).data)
+
+
+def read_files(paths, chunk_size=64 * 1024):
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
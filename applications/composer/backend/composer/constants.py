@@ -20,5 +20,31 @@ INGESTION_TEMP_DIR = os.path.join(INGESTION_BASE_DIR, "ingestion_temp")
 INGESTION_ANOMALIES_LOG_PATH = os.path.join(INGESTION_BASE_DIR, "ingestion_anomalies_log.csv")
 INGESTION_INGESTED_LOG_PATH = os.path.join(INGESTION_BASE_DIR, "ingested_log.csv")
 
+# Parsed ontology triples of the neurondm step, keyed by the content hash of the ttl files
+INGESTION_ONTOLOGY_CACHE_DIR = os.path.join(INGESTION_BASE_DIR, "ontology_cache")
+
 # Cleanup settings
 DEFAULT_CLEANUP_DAYS = 30
+
+# Predicate mapping endpoint
+# Maximum number of URIs (over all predicates) accepted in a single request
+PREDICATE_MAPPING_MAX_URIS = 1000
+# Number of URI -> labels entries kept in the process-level cache
+PREDICATE_MAPPING_CACHE_SIZE = 20000
+
+# Bulk action jobs
+# Number of threads running bulk action jobs in each app process
+BULK_ACTION_JOB_WORKERS = 2
+# Number of objects processed (and progress reported) at a time
+BULK_ACTION_JOB_CHUNK_SIZE = 100
+# Jobs pending or running without progress for this long are considered lost
+# (e.g. their app process was restarted) and are marked as failed
+BULK_ACTION_JOB_STALE_MINUTES = 30
+# Interval at which each app process touches the jobs it holds and fails the stale jobs
+BULK_ACTION_JOB_HEARTBEAT_MINUTES = 5
+
+# Maximum number of statements updated by a single batch PATCH request
+BATCH_UPDATE_MAX_ITEMS = 200
+
+# Maximum number of statements cloned by a single request
+CLONE_STATEMENTS_MAX_ITEMS = 200
@@ -1,6 +1,7 @@
 
 from django.db import models
 from composer.pure_enums import (
+    AnomalyType as PureAnomalyType,
     CircuitType as PureCircuitType,
     SentenceState as PureSentenceState,
     CSState as PureCSState,
@@ -92,4 +93,36 @@ class RelationshipType(models.TextChoices):
     TRIPLE_SINGLE = "triple_single", "Triple - Single select"
     TRIPLE_MULTI = "triple_multi", "Triple - Multi select"
     ANATOMICAL_MULTI = "anatomical_multi", "Anatomical Entity - Multi select"
-    TEXT = "text", "Text area"
\ No newline at end of file
+    TEXT = "text", "Text area"
+
+class BulkActionJobStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    COMPLETED = "completed", "Completed"
+    FAILED = "failed", "Failed"
+
+
+class IngestionRunStatus(models.TextChoices):
+    RUNNING = "running", "Running"
+    COMPLETED = "completed", "Completed"
+    FAILED = "failed", "Failed"
+
+
+class IngestionAnomalySeverity(models.TextChoices):
+    # same values as cs_ingestion.models.Severity
+    ERROR = "error", "Error"
+    WARNING = "warning", "Warning"
+    INFO = "info", "Info"
+
+
+class IngestionAnomalyType(models.TextChoices):
+    """
+    Django TextChoices wrapper for AnomalyType.
+    Uses values from pure_enums.AnomalyType as the single source of truth.
+    """
+    AXIOM_NOT_FOUND = PureAnomalyType.AXIOM_NOT_FOUND.value, "Axiom not found"
+    UNKNOWN_URI = PureAnomalyType.UNKNOWN_URI.value, "Unknown uri"
+    INCORRECT_STATE = PureAnomalyType.INCORRECT_STATE.value, "Incorrect state"
+    CUSTOM_RELATIONSHIP = PureAnomalyType.CUSTOM_RELATIONSHIP.value, "Custom relationship"
+    ERROR = PureAnomalyType.ERROR.value, "Error"
+    OTHER = PureAnomalyType.OTHER.value, "Other"
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from composer.constants import BULK_ACTION_JOB_STALE_MINUTES
+from composer.services.bulk_jobs_service import fail_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Marks as failed the bulk action jobs lost with the app process running them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=BULK_ACTION_JOB_STALE_MINUTES,
+            help=f'Fail the pending/running jobs without progress for this many minutes '
+                 f'(default: {BULK_ACTION_JOB_STALE_MINUTES})',
+        )
+
+    def handle(self, *args, **options):
+        failed = fail_stale_jobs(options['minutes'])
+        self.stdout.write(self.style.SUCCESS(f"Marked {failed} stale bulk action job(s) as failed"))
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.db.utils import IntegrityError
 from composer.models import AnatomicalEntity, Synonym, AnatomicalEntityMeta
+from composer.services.predicate_mapping_service import clear_label_cache
 
 URI = "o"
 NAME = "o_label"
@@ -94,5 +95,8 @@ class Command(BaseCommand):
                 except Exception as e:
                     self.stdout.write(self.style.ERROR(f"An error occurred during bulk creation: {e}"))
 
+        # bulk_create does not send the post_save signal that invalidates the predicate labels
+        clear_label_cache()
+
         end_time = time.time()
         self.stdout.write(self.style.SUCCESS(f"Operation completed in {end_time - start_time:.2f} seconds."))
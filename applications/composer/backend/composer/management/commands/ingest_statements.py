@@ -39,6 +39,22 @@ class Command(BaseCommand):
             type=str,
             help='Path to a text file containing population URIs (one per line). When provided, ONLY statements matching these URIs will be processed for ingestion.',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Set this flag to write the statements with bulk queries instead of one statement at a time.',
+        )
+        parser.add_argument(
+            '--ontology_dir', '--ontology-dir',
+            type=str,
+            help='Path to a local NIF-Ontology checkout (neurons branch) to read the ttl files from instead of downloading them.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes converting the neurons.',
+        )
 
     def handle(self, *args, **options):
         update_upstream = options['update_upstream']
@@ -47,6 +63,9 @@ class Command(BaseCommand):
         full_imports = options['full_imports']
         label_imports = options['label_imports']
         population_file = options['population_file']
+        bulk = options['bulk']
+        ontology_dir = options['ontology_dir']
+        workers = options['workers']
 
         # Read population URIs from file if provided
         population_uris = None
@@ -64,7 +83,7 @@ class Command(BaseCommand):
 
         start_time = time.time()
 
-        success = ingest_statements(update_upstream, update_anatomical_entities, disable_overwrite, full_imports, label_imports, population_uris)
+        success = ingest_statements(update_upstream, update_anatomical_entities, disable_overwrite, full_imports, label_imports, population_uris, bulk, ontology_dir, workers)
 
         end_time = time.time()
 
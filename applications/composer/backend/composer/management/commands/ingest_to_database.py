@@ -1,10 +1,11 @@
-import json
 import time
 
 from django.core.management.base import BaseCommand
-from composer.services.cs_ingestion.cs_ingestion_services import ingest_to_database
-from composer.services.cs_ingestion.logging_service import LoggerService
-from composer.services.cs_ingestion.models import convert_statement_from_json
+from composer.enums import IngestionRunStatus
+from composer.services.cs_ingestion.cs_ingestion_services import ingest_to_database, ingest_to_database_in_chunks
+from composer.services.cs_ingestion.anomaly_db_sink import DatabaseAnomalySink
+from composer.services.cs_ingestion.logging_service import LoggerService, format_severity_counts
+from composer.services.cs_ingestion.intermediate_file import NDJSON_GZ_SUFFIX, iter_statements_file
 from composer.constants import INGESTION_ANOMALIES_LOG_PATH, INGESTION_INGESTED_LOG_PATH
 
 
@@ -16,7 +17,8 @@ class Command(BaseCommand):
             '--input_filepath',
             type=str,
             required=True,
-            help='Path to input JSON file containing processed statements from Step 1.',
+            help='Path to the file containing processed statements from Step 1: gzip NDJSON (.ndjson.gz), '
+                 'or a legacy JSON array (.json).',
         )
         parser.add_argument(
             '--update_upstream',
@@ -43,6 +45,29 @@ class Command(BaseCommand):
             type=str,
             help='Path to input anomalies CSV file from Step 1 (will be merged with new anomalies)',
         )
+        parser.add_argument(
+            '--anomalies_db',
+            action='store_true',
+            help='Set this flag to also store the anomalies in the database, where they can be paged and filtered.',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Set this flag to write the statements with bulk queries instead of one statement at a time.',
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            help='Commit every N statements and record the progress in an ingestion run, which can be resumed '
+                 'if it fails. By default all the statements are written in a single transaction.',
+        )
+        parser.add_argument(
+            '--resume',
+            type=int,
+            metavar='RUN_ID',
+            help='Resume a failed chunked ingestion run with the same input file, skipping the committed chunks. '
+                 'The options of the run are used.',
+        )
 
     def handle(self, *args, **options):
         input_filepath = options['input_filepath']
@@ -51,21 +76,25 @@ class Command(BaseCommand):
         disable_overwrite = options['disable_overwrite']
         force_state_transition = options['force_state_transition']
         anomalies_csv_input = options.get('anomalies_csv_input')
+        bulk = options['bulk']
+        anomalies_db = options['anomalies_db']
+        chunk_size = options['chunk_size']
+        resume_run_id = options['resume']
+
+        if chunk_size is not None and chunk_size < 1:
+            self.stderr.write(self.style.ERROR("--chunk_size must be a positive number"))
+            return
 
-        # Load statements from JSON file
+        # Load statements from the intermediate file
         try:
-            if not input_filepath.endswith('.json'):
+            if not input_filepath.endswith((NDJSON_GZ_SUFFIX, '.json')):
                 self.stderr.write(self.style.ERROR(
-                    "Input file must have .json extension"
+                    f"Input file must have {NDJSON_GZ_SUFFIX} or .json extension"
                 ))
                 return
             
-            with open(input_filepath, 'r', encoding='utf-8') as f:
-                statements_list = json.load(f)
-            
-            # Convert JSON-serialized statements back to object format
-            self.stdout.write("Converting JSON statements to object format...")
-            statements_list = [convert_statement_from_json(stmt) for stmt in statements_list]
+            # Each statement is converted back to object format as it is read
+            statements_list = list(iter_statements_file(input_filepath))
             
             self.stdout.write(f"Loaded {len(statements_list)} statements from {input_filepath}")
         except FileNotFoundError:
@@ -83,29 +112,53 @@ class Command(BaseCommand):
             ingested_log_path=INGESTION_INGESTED_LOG_PATH
         )
         
+        if anomalies_db:
+            logger_service.set_db_sink(DatabaseAnomalySink())
+
         # Load any previous anomalies from the CSV file (e.g., from process_neurondm step)
         if anomalies_csv_input:
-            logger_service.load_anomalies_from_json(anomalies_csv_input)
+            logger_service.load_anomalies_from_file(anomalies_csv_input)
 
         try:
             # Step 2: Ingest to database
             self.stdout.write("Ingesting statements to database...")
-            success = ingest_to_database(
-                statements_list=statements_list,
-                update_upstream=update_upstream,
-                update_anatomical_entities=update_anatomical_entities,
-                disable_overwrite=disable_overwrite,
-                force_state_transition=force_state_transition,
-                logger_service_param=logger_service,
-            )
+            if chunk_size or resume_run_id is not None:
+                run = ingest_to_database_in_chunks(
+                    statements_list=statements_list,
+                    chunk_size=chunk_size,
+                    resume_run_id=resume_run_id,
+                    update_upstream=update_upstream,
+                    update_anatomical_entities=update_anatomical_entities,
+                    disable_overwrite=disable_overwrite,
+                    force_state_transition=force_state_transition,
+                    logger_service_param=logger_service,
+                    bulk=bulk,
+                )
+                success = run.status == IngestionRunStatus.COMPLETED
+                self.stdout.write(f"Ingestion run {run.id}: {run.processed}/{run.total} statements committed.")
+                if not success:
+                    self.stderr.write(self.style.ERROR(f"Resume it with --resume {run.id}"))
+            else:
+                success = ingest_to_database(
+                    statements_list=statements_list,
+                    update_upstream=update_upstream,
+                    update_anatomical_entities=update_anatomical_entities,
+                    disable_overwrite=disable_overwrite,
+                    force_state_transition=force_state_transition,
+                    logger_service_param=logger_service,
+                    bulk=bulk,
+                )
 
             end_time = time.time()
             duration = end_time - start_time
 
 
-            # First convert JSON anomalies to CSV format
-            logger_service.write_anomalies_to_file()
-            self.stdout.write(f"Saved {len(logger_service.anomalies)} total anomalies to {logger_service.anomalies_log_path}")
+            # The anomalies are already in the log, closing it loads them into the database sink
+            logger_service.close()
+            self.stdout.write(
+                f"Saved {logger_service.total_anomalies} total anomalies to {logger_service.anomalies_log_path} "
+                f"({format_severity_counts(logger_service.severity_counts)})"
+            )
             logger_service.write_ingested_statements_to_file(statements_list)
             self.stdout.write(f"Saved ingested statements log to {logger_service.ingested_log_path}")
 
@@ -121,6 +174,7 @@ class Command(BaseCommand):
         except Exception as e:
             end_time = time.time()
             duration = end_time - start_time
+            logger_service.close()
             self.stderr.write(self.style.ERROR(
                 f"Ingestion failed after {duration:.2f} seconds: {e}"
             ))
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("composer", "0097_relationship_custom_ingestion_code"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="connectivitystatement",
+            name="cached_errors",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="connectivitystatement",
+            name="errors_version",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
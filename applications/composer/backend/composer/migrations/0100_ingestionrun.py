@@ -0,0 +1,61 @@
+# Generated by Django 4.1.13 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("composer", "0099_bulkactionjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        db_index=True,
+                        default="running",
+                        max_length=20,
+                    ),
+                ),
+                ("options", models.JSONField(blank=True, default=dict)),
+                ("chunk_size", models.PositiveIntegerField()),
+                ("statement_ids", models.JSONField(blank=True, default=list)),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("processed", models.PositiveIntegerField(default=0)),
+                (
+                    "invalid",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of statements ingested as invalid",
+                    ),
+                ),
+                ("last_reference_uri", models.URLField(blank=True, max_length=500)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "Ingestion Runs",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
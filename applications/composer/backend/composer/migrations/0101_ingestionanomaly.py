@@ -0,0 +1,65 @@
+# Generated by Django 4.1.13 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("composer", "0100_ingestionrun"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestionAnomaly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("error", "Error"),
+                            ("warning", "Warning"),
+                            ("info", "Info"),
+                        ],
+                        db_index=True,
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("axiom_not_found", "Axiom not found"),
+                            ("unknown_uri", "Unknown uri"),
+                            ("incorrect_state", "Incorrect state"),
+                            ("custom_relationship", "Custom relationship"),
+                            ("error", "Error"),
+                            ("other", "Other"),
+                        ],
+                        db_index=True,
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "statement_id",
+                    models.CharField(blank=True, db_index=True, max_length=500),
+                ),
+                ("entity_id", models.TextField(blank=True)),
+                ("message", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name_plural": "Ingestion Anomalies",
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-19 18:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("composer", "0101_ingestionanomaly"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkactionjob",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                help_text="Last progress of the job",
+            ),
+            preserve_default=False,
+        ),
+    ]
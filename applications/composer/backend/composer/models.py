@@ -1,6 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models, transaction
-from django.db.models import Q, CheckConstraint
+from django.db.models import Q, CheckConstraint, Exists, OuterRef
 from django.db.models.expressions import F
 from django.forms.widgets import Input as InputWidget
 from django_fsm import FSMField, transition
@@ -15,9 +15,13 @@ from composer.services.state_services import (
     is_system_user
 )
 from .enums import (
+    BulkActionJobStatus,
     CircuitType,
     CSState,
     DestinationType,
+    IngestionAnomalySeverity,
+    IngestionAnomalyType,
+    IngestionRunStatus,
     Laterality,
     MetricEntity,
     RelationshipType,
@@ -167,6 +171,96 @@ class ConnectivityStatementManager(models.Manager):
     def excluding_draft(self):
         return self.get_queryset().exclude(state=CSState.DRAFT)
 
+    def for_list(self):
+        """
+        Lean queryset for the statements list endpoint.
+
+        Skips the default prefetches (notes, provenances, species, origins, destinations),
+        which the list serializer never reads, and resolves `has_notes` with a single
+        EXISTS subquery instead of one query per row.
+        """
+        non_transition_notes = Note.all_objects.filter(
+            connectivity_statement=OuterRef("pk")
+        ).exclude(type=NoteType.TRANSITION)
+        return (
+            super()
+            .get_queryset()
+            .select_related("owner")
+            .prefetch_related("tags")
+            .exclude(state=CSState.DEPRECATED)
+            .annotate(has_notes_annotation=Exists(non_transition_notes))
+        )
+
+    def get_field_prefetches(self):
+        """
+        Relations read by each field of the statement serializers.
+        """
+        return {
+            "tags": ["tags"],
+            "provenances": ["provenance_set"],
+            "expert_consultants": ["expertconsultant_set"],
+            "species": ["species"],
+            "origins": ["origins"],
+            "vias": [models.Prefetch("via_set", queryset=Via.objects.order_by("order"))],
+            "destinations": ["destinations"],
+            "statement_alerts": ["statement_alerts"],
+            "statement_triples": [
+                models.Prefetch(
+                    "connectivitystatementtriple_set",
+                    queryset=ConnectivityStatementTriple.objects.select_related("relationship").prefetch_related("triples"),
+                ),
+            ],
+            "statement_texts": [
+                models.Prefetch(
+                    "connectivitystatementtext_set",
+                    queryset=ConnectivityStatementText.objects.select_related("relationship"),
+                ),
+            ],
+            "statement_anatomical_entities": [
+                models.Prefetch(
+                    "connectivitystatementanatomicalentity_set",
+                    queryset=ConnectivityStatementAnatomicalEntity.objects.select_related(
+                        "relationship"
+                    ).prefetch_related("anatomical_entities"),
+                ),
+            ],
+        }
+
+    def prefetch_for_fields(self, queryset, fields=None, expand_forward_connection=True):
+        """
+        Replaces the prefetches of queryset with the ones the given serializer fields
+        (all of them by default) read. The forward connections are loaded with the same
+        plan when expanded, or as bare ids otherwise.
+        """
+        prefetches = [
+            prefetch
+            for field_name, field_prefetches in self.get_field_prefetches().items()
+            if fields is None or field_name in fields
+            for prefetch in field_prefetches
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(*prefetches)
+
+        if fields is None or "forward_connection" in fields:
+            if expand_forward_connection:
+                forward_connections = self.get_queryset().prefetch_related(None).prefetch_related(*prefetches)
+            else:
+                forward_connections = self.get_queryset().select_related(None).prefetch_related(None).only("id")
+            queryset = queryset.prefetch_related(
+                models.Prefetch("forward_connection", queryset=forward_connections)
+            )
+        return queryset
+
+    def for_retrieve(self, fields=None, expand_forward_connection=True):
+        """
+        Queryset for the statement detail endpoint.
+
+        Loads the relations of the requested fields: the vias (ordered), the dynamic
+        relationship values (triples, texts and anatomical entities) and the forward
+        connections with the same plan, so serializing a statement costs a constant
+        number of queries.
+        """
+        return self.prefetch_for_fields(self.get_queryset(), fields, expand_forward_connection)
+
     def exported(self):
         return self.get_queryset().filter(state=CSState.EXPORTED)
 
@@ -178,15 +272,35 @@ class ConnectivityStatementManager(models.Manager):
 
 class SentenceStatementManager(models.Manager):
     def get_queryset(self):
+        # Load the statements with everything SentenceConnectivityStatement nests,
+        # so a page of sentences costs a constant number of queries.
+        statements = (
+            ConnectivityStatement.objects.select_related(
+                "projection_phenotype",
+                "population",
+            )
+            .prefetch_related(None)
+            .prefetch_related("provenance_set", "species")
+        )
         return (
             super()
             .get_queryset()
             .select_related(
                 "owner",
             )
-            .prefetch_related("notes", "tags", "connectivitystatement_set")
+            .prefetch_related(
+                "notes",
+                "tags",
+                models.Prefetch("connectivitystatement_set", queryset=statements),
+            )
         )
 
+    def for_list(self):
+        non_transition_notes = Note.all_objects.filter(
+            sentence=OuterRef("pk")
+        ).exclude(type=NoteType.TRANSITION)
+        return self.get_queryset().annotate(has_notes_annotation=Exists(non_transition_notes))
+
 
 class NoteManager(models.Manager):
     def get_queryset(self):
@@ -641,6 +755,9 @@ class Sentence(models.Model, BulkActionMixin):
 
     @property
     def has_notes(self):
+        # Querysets from SentenceStatementManager.for_list() already carry the answer
+        if hasattr(self, "has_notes_annotation"):
+            return self.has_notes_annotation
         return self.notes.exclude(type=NoteType.TRANSITION).exists()
 
     class Meta:
@@ -740,6 +857,8 @@ class ConnectivityStatement(models.Model, BulkActionMixin):
     )
     population_index = models.PositiveIntegerField(null=True, blank=True, help_text="Index of this statement within its assigned population.")
     has_statement_been_exported = models.BooleanField(default=False)
+    cached_errors = models.JSONField(null=True, blank=True, editable=False)
+    errors_version = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         suffix = ""
@@ -923,6 +1042,9 @@ class ConnectivityStatement(models.Model, BulkActionMixin):
 
     @property
     def has_notes(self):
+        # Querysets from ConnectivityStatementManager.for_list() already carry the answer
+        if hasattr(self, "has_notes_annotation"):
+            return self.has_notes_annotation
         return self.notes.exclude(type=NoteType.TRANSITION).exists()
 
     @property
@@ -990,6 +1112,10 @@ class ConnectivityStatement(models.Model, BulkActionMixin):
     def save(self, *args, **kwargs):
         if not self.pk and self.sentence and not self.owner:
             self.owner = self.sentence.owner
+        if not self.pk:
+            # a new (or cloned) statement has no connections yet
+            self.cached_errors = None
+            self.errors_version = None
 
         self.clean()
         super().save(*args, **kwargs)
@@ -1570,3 +1696,101 @@ class StatementAlert(models.Model):
     def __str__(self):
         return f"{self.alert_type.name} for Statement {self.connectivity_statement.id}"
 
+
+class BulkActionJob(models.Model):
+    """
+    Bulk action executed in the background, in chunks, by the local job worker.
+    The selection is frozen (object_ids) when the job is created.
+    Jobs are not resumed: if the app process stops, the job stays pending/running
+    (with some chunks applied) until it is marked as failed by fail_stale_jobs.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    model_label = models.CharField(max_length=100, help_text="app_label.ModelName of the selected objects")
+    action = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    object_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(
+        max_length=20, choices=BulkActionJobStatus.choices, default=BulkActionJobStatus.PENDING, db_index=True
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last progress of the job")
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Bulk Action Jobs"
+
+    def __str__(self):
+        return f"{self.action} on {self.total} {self.model_label} ({self.status})"
+
+
+class IngestionRun(models.Model):
+    """
+    Checkpoint of an ingestion committed in chunks.
+    The statements to ingest (statement_ids) and the options are frozen when the run is created,
+    processed counts the statements of the chunks already committed.
+    """
+
+    status = models.CharField(
+        max_length=20, choices=IngestionRunStatus.choices, default=IngestionRunStatus.RUNNING, db_index=True
+    )
+    options = models.JSONField(default=dict, blank=True)
+    chunk_size = models.PositiveIntegerField()
+    statement_ids = models.JSONField(default=list, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    invalid = models.PositiveIntegerField(default=0, help_text="Number of statements ingested as invalid")
+    last_reference_uri = models.URLField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Ingestion Runs"
+
+    def __str__(self):
+        return f"Ingestion run {self.id}: {self.processed}/{self.total} statements ({self.status})"
+
+
+class IngestionAnomaly(models.Model):
+    """
+    Anomaly of the last ingestion, loaded from the anomalies log when the database sink is enabled.
+    statement_id is the reference uri of the statement, when the anomaly is about one.
+    """
+
+    severity = models.CharField(max_length=20, choices=IngestionAnomalySeverity.choices, db_index=True)
+    type = models.CharField(max_length=50, choices=IngestionAnomalyType.choices, db_index=True)
+    statement_id = models.CharField(max_length=500, blank=True, db_index=True)
+    entity_id = models.TextField(blank=True)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name_plural = "Ingestion Anomalies"
+
+    def __str__(self):
+        return f"{self.severity}: {self.message[:100]}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version of a set of rows, shared by all the app processes.
+    Anything derived from the rows is cached under the version, which is bumped
+    (in the same transaction) when the rows change.
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
@@ -54,3 +54,16 @@ class CSState(str, Enum):
     EXPORTED = "exported"
     DEPRECATED = "deprecated"
     INVALID = "invalid"
+
+
+class AnomalyType(str, Enum):
+    """
+    Ingestion anomaly type enumeration - Django-independent.
+    This is the single source of truth for anomaly type values.
+    """
+    AXIOM_NOT_FOUND = "axiom_not_found"
+    UNKNOWN_URI = "unknown_uri"
+    INCORRECT_STATE = "incorrect_state"
+    CUSTOM_RELATIONSHIP = "custom_relationship"
+    ERROR = "error"
+    OTHER = "other"
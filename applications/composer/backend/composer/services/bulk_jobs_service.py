@@ -0,0 +1,178 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from composer.constants import (
+    BULK_ACTION_JOB_CHUNK_SIZE,
+    BULK_ACTION_JOB_HEARTBEAT_MINUTES,
+    BULK_ACTION_JOB_STALE_MINUTES,
+    BULK_ACTION_JOB_WORKERS,
+)
+from composer.enums import BulkActionJobStatus
+from composer.models import BulkActionJob
+from composer.pure_enums import BulkActionType
+from composer.services import bulk_service
+
+logger = logging.getLogger(__name__)
+
+# Jobs run in a thread pool of the app process that queued them, nothing is persisted to resume them:
+# when the process stops (restart, deploy), its jobs stay pending/running, possibly with some chunks applied.
+# fail_stale_jobs marks them as failed once they made no progress for BULK_ACTION_JOB_STALE_MINUTES.
+# While a process holds jobs (queued or running), a timer touches them every BULK_ACTION_JOB_HEARTBEAT_MINUTES,
+# so that only the jobs of the stopped processes become stale, and fails the stale jobs.
+# fail_stale_jobs also runs when the server starts (fail_stale_bulk_action_jobs command).
+
+# Bulk actions run by the job worker instead of inside the request.
+# Each function gets a chunk of the selection, the user and the validated payload,
+# and returns the number of objects updated successfully.
+JOB_ACTIONS = {
+    BulkActionType.CHANGE_STATUS.value: lambda qs, user, data: bulk_service.change_status(
+        qs, data["new_status"], user
+    ),
+}
+
+_executor = None
+# ids of the jobs queued or running in this process, and the timer touching them
+_held_job_ids = set()
+_heartbeat_timer = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=BULK_ACTION_JOB_WORKERS, thread_name_prefix="bulk-action-job"
+        )
+    return _executor
+
+
+def _submit(job_id):
+    global _heartbeat_timer
+    with _lock:
+        _held_job_ids.add(job_id)
+        if _heartbeat_timer is None:
+            _heartbeat_timer = threading.Timer(BULK_ACTION_JOB_HEARTBEAT_MINUTES * 60, _heartbeat)
+            _heartbeat_timer.daemon = True
+            _heartbeat_timer.start()
+    _get_executor().submit(_run_in_worker, job_id)
+
+
+def _heartbeat():
+    global _heartbeat_timer
+    try:
+        with _lock:
+            job_ids = list(_held_job_ids)
+        BulkActionJob.objects.filter(
+            id__in=job_ids, status__in=[BulkActionJobStatus.PENDING, BulkActionJobStatus.RUNNING]
+        ).update(updated_at=timezone.now())
+        fail_stale_jobs()
+    except Exception:
+        logger.exception("Bulk action jobs heartbeat failed")
+    finally:
+        connection.close()
+        with _lock:
+            # the timer stops with the last job, the next submitted job restarts it
+            if _held_job_ids:
+                _heartbeat_timer = threading.Timer(BULK_ACTION_JOB_HEARTBEAT_MINUTES * 60, _heartbeat)
+                _heartbeat_timer.daemon = True
+                _heartbeat_timer.start()
+            else:
+                _heartbeat_timer = None
+
+
+def is_job_action(action_type):
+    return action_type in JOB_ACTIONS
+
+
+def create_bulk_action_job(queryset, action_type, user, payload):
+    """
+    Freezes the selection and queues the job; it starts once the current transaction commits.
+    """
+    object_ids = list(queryset.values_list("id", flat=True))
+    job = BulkActionJob.objects.create(
+        user=user,
+        model_label=queryset.model._meta.label,
+        action=action_type,
+        payload=payload,
+        object_ids=object_ids,
+        total=len(object_ids),
+    )
+    transaction.on_commit(lambda: _submit(job.id))
+    return job
+
+
+def _run_in_worker(job_id):
+    try:
+        run_bulk_action_job(job_id)
+    finally:
+        with _lock:
+            _held_job_ids.discard(job_id)
+        # worker threads own their database connection
+        connection.close()
+
+
+def run_bulk_action_job(job_id):
+    """
+    Runs a pending job. Every status and progress update only applies to the job in the expected
+    status, so a job failed meanwhile (see fail_stale_jobs) is left failed and stops at the next chunk.
+    """
+    job = BulkActionJob.objects.select_related("user").get(id=job_id)
+    started = BulkActionJob.objects.filter(id=job_id, status=BulkActionJobStatus.PENDING).update(
+        status=BulkActionJobStatus.RUNNING, started_at=timezone.now(), updated_at=timezone.now()
+    )
+    if not started:
+        logger.warning(f"Bulk action job {job_id} is no longer pending, it is not run")
+        return
+    running = BulkActionJob.objects.filter(id=job_id, status=BulkActionJobStatus.RUNNING)
+
+    try:
+        model = apps.get_model(job.model_label)
+        run_action = JOB_ACTIONS[job.action]
+        for start in range(0, len(job.object_ids), BULK_ACTION_JOB_CHUNK_SIZE):
+            chunk_ids = job.object_ids[start:start + BULK_ACTION_JOB_CHUNK_SIZE]
+            succeeded = run_action(model.objects.filter(id__in=chunk_ids), job.user, job.payload)
+            updated = running.update(
+                processed=F("processed") + len(chunk_ids),
+                succeeded=F("succeeded") + succeeded,
+                failed=F("failed") + len(chunk_ids) - succeeded,
+                updated_at=timezone.now(),
+            )
+            if not updated:
+                logger.warning(f"Bulk action job {job_id} was failed while running, it is stopped")
+                return
+    except Exception as e:
+        logger.exception(f"Bulk action job {job_id} failed")
+        running.update(
+            status=BulkActionJobStatus.FAILED, error=str(e), finished_at=timezone.now(), updated_at=timezone.now()
+        )
+        return
+
+    running.update(
+        status=BulkActionJobStatus.COMPLETED, finished_at=timezone.now(), updated_at=timezone.now()
+    )
+
+
+def fail_stale_jobs(stale_minutes=BULK_ACTION_JOB_STALE_MINUTES):
+    """
+    Marks as failed the pending/running jobs without progress for stale_minutes,
+    i.e. the jobs lost with the app process running them: the jobs still held by a process
+    are touched by its heartbeat. Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    return BulkActionJob.objects.filter(
+        status__in=[BulkActionJobStatus.PENDING, BulkActionJobStatus.RUNNING],
+        updated_at__lt=now - timedelta(minutes=stale_minutes),
+    ).update(
+        status=BulkActionJobStatus.FAILED,
+        error=f"The job made no progress for {stale_minutes} minutes, it was probably interrupted "
+              f"by a restart of the server. Some of the objects may have been updated.",
+        finished_at=now,
+        updated_at=now,
+    )
@@ -1,11 +1,13 @@
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import connections, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
 from django_fsm import TransitionNotAllowed
 from django.db.models import ForeignKey, Q, Count
 from composer.services.state_services import (
     get_available_FIELD_transitions_without_conditions_check,
 )
-from composer.enums import CSState
+from composer.enums import CSState, NoteType
 from composer.models import ConnectivityStatement, Profile, Sentence, Tag, Note, User
 
 
@@ -16,14 +18,15 @@ def assign_owner(instances, requested_by, owner_id):
     Any modifications to this logic should be applied to both places to maintain consistency.
     """
     owner = get_object_or_404(User, id=owner_id)
-    updated_count = instances.update(owner=owner)
 
     if instances.model == Sentence:
+        # Update the draft statements first: the selection may depend on the owner,
+        # so it has to be evaluated before the sentences change
         ConnectivityStatement.objects.filter(
-            sentence__in=instances, state=CSState.DRAFT
+            sentence__in=_selected_ids(instances), state=CSState.DRAFT
         ).update(owner=owner)
 
-    return updated_count
+    return instances.update(owner=owner)
 
 
 def assign_tags(instances, add_tag_ids, remove_tag_ids):
@@ -31,18 +34,11 @@ def assign_tags(instances, add_tag_ids, remove_tag_ids):
     For each instance in the queryset:
       - Bulk add associations for tags in add_tag_ids (if not already present).
       - Bulk remove associations for tags in remove_tag_ids (if present).
-    
+
+    Both run as a single statement driven by the queryset SQL (DELETE ... WHERE IN,
+    INSERT ... SELECT), so no ids are loaded in Python whatever the selection size.
     Returns the number of processed instances.
     """
-
-    # Validate add and remove tag IDs
-    valid_add_tag_ids = list(
-        Tag.objects.filter(id__in=add_tag_ids).values_list("id", flat=True)
-    )
-    valid_remove_tag_ids = list(
-        Tag.objects.filter(id__in=remove_tag_ids).values_list("id", flat=True)
-    )
-
     # Get the many-to-many field info.
     m2m_field = instances.model._meta.get_field("tags")
     through_model = m2m_field.remote_field.through
@@ -52,39 +48,36 @@ def assign_tags(instances, add_tag_ids, remove_tag_ids):
     if not source_field_name.endswith("_id"):
         source_field_name += "_id"
 
-    instance_ids = list(instances.values_list("id", flat=True))
+    selected_ids = _selected_ids(instances)
 
     # 1. Bulk remove associations for tags in the remove list.
-    if valid_remove_tag_ids:
+    if remove_tag_ids:
         through_model.objects.filter(
-            **{f"{source_field_name}__in": instance_ids},
-            tag_id__in=valid_remove_tag_ids
+            **{f"{source_field_name}__in": selected_ids},
+            tag_id__in=remove_tag_ids
         ).delete()
 
-    # 2. Bulk insert associations for tags in the add list.
-    associations = []
-    batch_size = 1000
-    for instance_id in instance_ids:
-        for tag_id in valid_add_tag_ids:
-            associations.append(
-                through_model(**{source_field_name: instance_id, "tag_id": tag_id})
-            )
-            if len(associations) >= batch_size:
-                through_model.objects.bulk_create(
-                    associations, ignore_conflicts=True, batch_size=batch_size
-                )
-                associations = []
-    if associations:
-        through_model.objects.bulk_create(
-            associations, ignore_conflicts=True, batch_size=batch_size
+    # 2. Bulk insert associations for tags in the add list (unknown tag ids are skipped by the join).
+    if add_tag_ids:
+        connection = connections[instances.db]
+        qn = connection.ops.quote_name
+        ids_sql, ids_params = selected_ids.query.sql_with_params()
+        tag_placeholders = ", ".join(["%s"] * len(add_tag_ids))
+        _insert_from_select(
+            connection,
+            through_model,
+            [source_field_name, "tag_id"],
+            f"SELECT selected.id, tag.id FROM ({ids_sql}) selected "
+            f"CROSS JOIN {qn(Tag._meta.db_table)} tag WHERE tag.id IN ({tag_placeholders})",
+            [*ids_params, *add_tag_ids],
         )
 
-    return len(instance_ids)
+    return selected_ids.count()
 
 
 def write_note(instances, user, note_text):
     """
-    Adds a note to each selected instance using bulk_create for efficiency.
+    Adds a note to each selected instance with a single INSERT ... SELECT.
     Returns the number of notes created.
     """
     # Determine the model class from the queryset
@@ -93,12 +86,16 @@ def write_note(instances, user, note_text):
     )
     note_field = _get_note_field_for_model(model_class)
 
-    notes_to_create = [
-        Note(user=user, note=note_text, **{note_field: instance})
-        for instance in instances.iterator()
-    ]
-    Note.objects.bulk_create(notes_to_create)
-    return len(notes_to_create)
+    connection = connections[instances.db]
+    ids_sql, ids_params = _selected_ids(instances).query.sql_with_params()
+    created_at = Note._meta.get_field("created_at").get_db_prep_value(timezone.now(), connection)
+    return _insert_from_select(
+        connection,
+        Note,
+        ["note", "user_id", "created_at", "type", f"{note_field}_id"],
+        f"SELECT %s, %s, %s, %s, selected.id FROM ({ids_sql}) selected",
+        [note_text, user.id, created_at, NoteType.PLAIN.value, *ids_params],
+    )
 
 
 def change_status(instances, new_status, user=None):
@@ -154,6 +151,28 @@ def assign_population_set(instances, population_set_id):
     return n_updated
 
 
+def _selected_ids(instances):
+    # ids subquery without the ordering, annotations and prefetches of the view queryset
+    return instances.order_by().values("id")
+
+
+def _insert_from_select(connection, model, columns, select_sql, params):
+    """
+    Runs INSERT INTO <model table> (columns) <select_sql>, skipping the rows that
+    conflict with existing ones, like bulk_create(ignore_conflicts=True).
+    Returns the number of inserted rows.
+    """
+    qn = connection.ops.quote_name
+    on_conflict_suffix = connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, [], [])
+    sql = (
+        f"{connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)} {qn(model._meta.db_table)} "
+        f"({', '.join(qn(column) for column in columns)}) {select_sql} {on_conflict_suffix or ''}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
 def _get_note_field_for_model(model_class):
     for field in Note._meta.fields:
         if isinstance(field, ForeignKey) and field.related_model == model_class:
@@ -0,0 +1,22 @@
+from django.db.models import F
+
+from composer.models import CacheVersion
+
+
+def get_cache_version(key):
+    """
+    Returns the version of the rows identified by key, shared by all the app processes.
+    """
+    return CacheVersion.objects.filter(key=key).values_list("version", flat=True).first() or 0
+
+
+def bump_cache_version(key):
+    """
+    Increments the version of the rows identified by key, in the current transaction.
+    """
+    updated = CacheVersion.objects.filter(key=key).update(version=F("version") + 1)
+    if not updated:
+        _, created = CacheVersion.objects.get_or_create(key=key, defaults={"version": 1})
+        if not created:
+            # created by a concurrent bump
+            CacheVersion.objects.filter(key=key).update(version=F("version") + 1)
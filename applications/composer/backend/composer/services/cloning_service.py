@@ -0,0 +1,110 @@
+from django.db import transaction
+
+from composer.enums import CSState
+from composer.models import (
+    ConnectivityStatement,
+    ConnectivityStatementAnatomicalEntity,
+    ConnectivityStatementText,
+    ConnectivityStatementTriple,
+    Destination,
+    ExpertConsultant,
+    Provenance,
+    Via,
+)
+
+# Values of the clones: a clone is a new draft, not the ingested or exported statement it was copied from
+CLONE_OVERRIDES = {
+    "reference_uri": None,
+    "curie_id": None,
+    "population_index": None,
+    "has_statement_been_exported": False,
+    "state": CSState.DRAFT,
+    "cached_errors": None,
+    "errors_version": None,
+}
+
+# Many to many relations copied with the statement
+STATEMENT_M2M_FIELDS = ("origins", "species", "tags", "forward_connection")
+
+# Rows pointing at the statement that are copied with it, with their many to many relations
+STATEMENT_CHILDREN = (
+    (Via, ("anatomical_entities", "from_entities")),
+    (Destination, ("anatomical_entities", "from_entities")),
+    (Provenance, ()),
+    (ExpertConsultant, ()),
+    (ConnectivityStatementTriple, ("triples",)),
+    (ConnectivityStatementText, ()),
+    (ConnectivityStatementAnatomicalEntity, ("anatomical_entities",)),
+)
+
+
+def clone_statement(connectivity_statement):
+    return clone_statements([connectivity_statement])[0]
+
+
+def clone_statements(statements):
+    """
+    Deep-copies statements: the statement row, its vias, destinations, provenances,
+    expert consultants, dynamic relationships and all their many to many rows.
+
+    The clones are drafts without the reference uri, curie id and population index of
+    the originals (see CLONE_OVERRIDES).
+    Everything is written with bulk_create, a few queries per table whatever the number
+    of statements. Via.save (order renumbering) and the signals are skipped, the
+    journey_path, prefix and suffix are copied as they are instead of being recomputed.
+    Returns the clones in the order of the given statements.
+    """
+    statements = list(statements)
+    with transaction.atomic():
+        clones = ConnectivityStatement.objects.bulk_create([
+            _copy_row(statement, **CLONE_OVERRIDES) for statement in statements
+        ])
+        clone_ids = {statement.pk: clone.pk for statement, clone in zip(statements, clones)}
+
+        for field_name in STATEMENT_M2M_FIELDS:
+            _copy_m2m(ConnectivityStatement._meta.get_field(field_name), clone_ids)
+        for model, m2m_fields in STATEMENT_CHILDREN:
+            _copy_children(model, m2m_fields, clone_ids)
+
+    return clones
+
+
+def _copy_row(instance, **overrides):
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if not field.primary_key
+    }
+    values.update(overrides)
+    return instance.__class__(**values)
+
+
+def _copy_children(model, m2m_fields, clone_ids):
+    originals = list(
+        model._base_manager.filter(connectivity_statement_id__in=clone_ids).order_by("pk")
+    )
+    copies = model.objects.bulk_create([
+        _copy_row(row, connectivity_statement_id=clone_ids[row.connectivity_statement_id])
+        for row in originals
+    ])
+    copy_ids = {original.pk: copy.pk for original, copy in zip(originals, copies)}
+
+    for field_name in m2m_fields:
+        _copy_m2m(model._meta.get_field(field_name), copy_ids)
+
+
+def _copy_m2m(m2m_field, copy_ids):
+    """
+    Copies the through rows of the keys of copy_ids to the matching values.
+    """
+    if not copy_ids:
+        return
+    through = m2m_field.remote_field.through
+    source = f"{m2m_field.m2m_field_name()}_id"
+    target = f"{m2m_field.m2m_reverse_field_name()}_id"
+
+    rows = through.objects.filter(**{f"{source}__in": copy_ids}).values_list(source, target)
+    through.objects.bulk_create([
+        through(**{source: copy_ids[source_id], target: target_id})
+        for source_id, target_id in rows
+    ])
@@ -18,3 +18,29 @@ def get_complete_from_entities_for_destination(destination_instance: Destination
         connectivity_statement=destination_instance.connectivity_statement
     ).order_by('-order').first()
     return highest_order_via.anatomical_entities.all() if highest_order_via else destination_instance.connectivity_statement.origins.all()
+
+
+def get_implicit_from_entities(connectivity_statement):
+    """
+    Computes, in a single pass over the statement layers, the entities each layer connects
+    from when it has no explicit from_entities: the origins for the first via, the previous
+    via for the others and the last via (or the origins) for the destinations.
+    Same results as the two functions above, read from the prefetched origins, vias and
+    destinations when available. Returns a dict keyed by (layer model, layer pk).
+    """
+    origins = list(connectivity_statement.origins.all())
+    vias = sorted(connectivity_statement.via_set.all(), key=lambda via: via.order)
+    vias_by_order = {via.order: via for via in vias}
+
+    implicit_from_entities = {}
+    for via in vias:
+        if via.order == 0:
+            implicit_from_entities[(Via, via.pk)] = origins
+        else:
+            previous_via = vias_by_order.get(via.order - 1)
+            implicit_from_entities[(Via, via.pk)] = list(previous_via.anatomical_entities.all()) if previous_via else []
+
+    last_via_entities = list(vias[-1].anatomical_entities.all()) if vias else origins
+    for destination in connectivity_statement.destinations.all():
+        implicit_from_entities[(Destination, destination.pk)] = last_via_entities
+    return implicit_from_entities
@@ -0,0 +1,37 @@
+from typing import Iterable
+
+from django.db import transaction
+
+from composer.models import IngestionAnomaly
+from composer.services.cs_ingestion.logging_service import get_anomaly_type
+from composer.services.cs_ingestion.models import LoggableAnomaly
+
+ANOMALIES_DB_BATCH_SIZE = 1000
+
+
+class DatabaseAnomalySink:
+    """
+    Database sink of the LoggerService: replaces the IngestionAnomaly rows with the anomalies of the log.
+    The rows are inserted in batches, once the log is closed, so they are not part of
+    (nor rolled back with) the ingestion transactions.
+    """
+
+    def __init__(self, batch_size: int = ANOMALIES_DB_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def write(self, anomalies: Iterable[LoggableAnomaly]):
+        with transaction.atomic():
+            IngestionAnomaly.objects.all().delete()
+            batch = []
+            for anomaly in anomalies:
+                batch.append(IngestionAnomaly(
+                    severity=anomaly.severity.value,
+                    type=get_anomaly_type(anomaly).value,
+                    statement_id=anomaly.statement_id or "",
+                    entity_id=anomaly.entity_id or "",
+                    message=anomaly.message,
+                ))
+                if len(batch) >= self.batch_size:
+                    IngestionAnomaly.objects.bulk_create(batch)
+                    batch = []
+            IngestionAnomaly.objects.bulk_create(batch)
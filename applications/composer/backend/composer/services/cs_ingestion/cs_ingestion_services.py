@@ -1,20 +1,29 @@
 import logging
 
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
-from composer.models import AlertType, Relationship
-from composer.constants import INGESTION_ANOMALIES_LOG_PATH, INGESTION_INGESTED_LOG_PATH
+from composer.enums import CSState, IngestionRunStatus
+from composer.models import AlertType, ConnectivityStatement, IngestionRun, Relationship
+from composer.constants import (
+    INGESTION_ANOMALIES_LOG_PATH,
+    INGESTION_INGESTED_LOG_PATH,
+    INGESTION_ONTOLOGY_CACHE_DIR,
+)
 from composer.services.cs_ingestion.helpers.overwritable_helper import (
     get_overwritable_and_new_statements,
 )
 from composer.services.cs_ingestion.helpers.sentence_helper import (
     get_or_create_sentence,
 )
+from composer.services.cs_ingestion.helpers.common_helpers import ID, STATE
 from composer.services.cs_ingestion.helpers.validators import validate_statements
 from .helpers.statement_helper import (
     create_or_update_connectivity_statement,
     update_forward_connections,
 )
+from .helpers.bulk_statement_helper import bulk_create_or_update_connectivity_statements
 from .helpers.upstream_changes_helper import update_upstream_statements
 from .logging_service import LoggerService
 from .models import LoggableAnomaly, Severity
@@ -49,6 +58,9 @@ def process_neurondm(
     population_uris=None,
     composer_data=None,
     logger_service_param=None,
+    ontology_dir=None,
+    ontology_cache_dir=None,
+    workers=1,
 ):
     """
     Process NeuroDM neurons, execute custom code, filter by population.
@@ -60,6 +72,9 @@ def process_neurondm(
         population_uris: Set of population URIs to filter (None means all)
         composer_data: Dict with 'custom_relationships' and 'statement_alert_uris' (will query from DB if None)
         logger_service_param: Logger service instance (optional)
+        ontology_dir: Local NIF-Ontology checkout to read the ttl files from (optional)
+        ontology_cache_dir: Directory of the parsed ontology cache (optional)
+        workers: Number of processes converting the neurons
         
     Returns: List of composer statement dictionaries
     """
@@ -83,6 +98,9 @@ def process_neurondm(
         statement_alert_uris=statement_alert_uris,
         population_uris=population_uris,
         custom_relationships=custom_relationships,
+        ontology_dir=ontology_dir,
+        ontology_cache_dir=ontology_cache_dir,
+        workers=workers,
     )
     
     return statements_list
@@ -95,6 +113,7 @@ def ingest_to_database(
     disable_overwrite=False,
     force_state_transition=False,
     logger_service_param=None,
+    bulk=False,
 ):
     """
     Validate and ingest statements into the database.
@@ -107,6 +126,8 @@ def ingest_to_database(
         force_state_transition: If True, allows state transitions from any state (e.g., TO_BE_REVIEWED -> EXPORTED).
                                Use when ingesting pre-filtered populations.
         logger_service_param: Logger service instance (optional)
+        bulk: Whether to write the statements with the set based engine (bulk_statement_helper),
+              which leads to the same database state with far fewer queries
     
     Returns: Boolean indicating successful transaction
     """
@@ -126,13 +147,9 @@ def ingest_to_database(
     successful_transaction = True
     try:
         with transaction.atomic():
-            for statement in statements:
-                sentence, _ = get_or_create_sentence(statement)
-                create_or_update_connectivity_statement(
-                    statement, sentence, update_anatomical_entities, logger_service_param, force_state_transition
-                )
-
-            update_forward_connections(statements)
+            write_statements(
+                statements, update_anatomical_entities, logger_service_param, force_state_transition, bulk
+            )
 
     except Exception as e:
         logger_service_param.add_anomaly(
@@ -154,6 +171,151 @@ def ingest_to_database(
     return successful_transaction
 
 
+def write_statements(
+    statements,
+    update_anatomical_entities,
+    logger_service,
+    force_state_transition=False,
+    bulk=False,
+    forward_connections=True,
+):
+    """
+    Writes the validated statements, must run inside a transaction.
+    The forward connections can be left out when some of their targets are written later.
+    """
+    if bulk:
+        bulk_create_or_update_connectivity_statements(
+            statements, update_anatomical_entities, logger_service, force_state_transition, forward_connections
+        )
+        return
+
+    for statement in statements:
+        sentence, _ = get_or_create_sentence(statement)
+        create_or_update_connectivity_statement(
+            statement, sentence, update_anatomical_entities, logger_service, force_state_transition
+        )
+
+    if forward_connections:
+        update_forward_connections(statements)
+
+
+def ingest_to_database_in_chunks(
+    statements_list,
+    chunk_size=None,
+    resume_run_id=None,
+    update_upstream=False,
+    update_anatomical_entities=False,
+    disable_overwrite=False,
+    force_state_transition=False,
+    logger_service_param=None,
+    bulk=False,
+):
+    """
+    Like ingest_to_database, but commits every chunk_size statements and records the progress
+    in an IngestionRun, so a failure only rolls back the chunk being written.
+
+    A failed run is resumed with resume_run_id and the same input: the statements and options
+    frozen in the run are used, and the chunks already committed are skipped.
+    The forward connections are written once all the statements exist, then the upstream
+    statements are updated.
+
+    Returns: the IngestionRun
+    """
+    if logger_service_param is None:
+        logger_service_param = LoggerService(
+            ingestion_anomalies_log_path=INGESTION_ANOMALIES_LOG_PATH,
+            ingested_log_path=INGESTION_INGESTED_LOG_PATH
+        )
+
+    if resume_run_id is not None:
+        run = IngestionRun.objects.get(id=resume_run_id)
+        if run.status == IngestionRunStatus.COMPLETED:
+            return run
+        statements_by_id = {statement[ID]: statement for statement in statements_list}
+        missing_ids = [statement_id for statement_id in run.statement_ids if statement_id not in statements_by_id]
+        if missing_ids:
+            raise ValueError(
+                f"{len(missing_ids)} statements of ingestion run {run.id} are not in the input, e.g. {missing_ids[0]}"
+            )
+        statements = [statements_by_id[statement_id] for statement_id in run.statement_ids]
+    else:
+        statements = get_overwritable_and_new_statements(
+            statements_list, disable_overwrite, force_overwrite=force_state_transition
+        )
+        run = IngestionRun.objects.create(
+            options={
+                "update_upstream": update_upstream,
+                "update_anatomical_entities": update_anatomical_entities,
+                "force_state_transition": force_state_transition,
+                "bulk": bulk,
+            },
+            chunk_size=chunk_size,
+            statement_ids=[statement[ID] for statement in statements],
+            total=len(statements),
+        )
+
+    options = run.options
+    statements = validate_statements(statements, options["update_anatomical_entities"])
+
+    # The statements of the committed chunks are not written again, their state is read back
+    # for the forward connections and the ingested log
+    states = dict(
+        ConnectivityStatement.objects.filter(
+            reference_uri__in=run.statement_ids[:run.processed]
+        ).values_list("reference_uri", "state")
+    )
+    for statement in statements[:run.processed]:
+        statement[STATE] = states.get(statement[ID])
+
+    IngestionRun.objects.filter(id=run.id).update(status=IngestionRunStatus.RUNNING, error="")
+    for start in range(run.processed, run.total, run.chunk_size):
+        chunk = statements[start:start + run.chunk_size]
+        try:
+            with transaction.atomic():
+                write_statements(
+                    chunk, options["update_anatomical_entities"], logger_service_param,
+                    options["force_state_transition"], options["bulk"], forward_connections=False,
+                )
+                # the checkpoint is committed with the chunk
+                IngestionRun.objects.filter(id=run.id).update(
+                    processed=start + len(chunk),
+                    last_reference_uri=chunk[-1][ID],
+                    invalid=F("invalid") + sum(statement[STATE] == CSState.INVALID for statement in chunk),
+                )
+        except Exception as e:
+            return _fail_ingestion_run(run, e, logger_service_param)
+
+    try:
+        with transaction.atomic():
+            update_forward_connections(statements)
+    except Exception as e:
+        return _fail_ingestion_run(run, e, logger_service_param)
+
+    if options["update_upstream"]:
+        update_upstream_statements()
+
+    IngestionRun.objects.filter(id=run.id).update(
+        status=IngestionRunStatus.COMPLETED, finished_at=timezone.now()
+    )
+    run.refresh_from_db()
+    return run
+
+
+def _fail_ingestion_run(run, error, logger_service):
+    logger_service.add_anomaly(
+        LoggableAnomaly(
+            statement_id=None,
+            entity_id=None,
+            message=str(error),
+            severity=Severity.ERROR,
+        )
+    )
+    logging.error(f"Ingestion run {run.id} stopped due to {error}")
+    IngestionRun.objects.filter(id=run.id).update(status=IngestionRunStatus.FAILED, error=str(error))
+    run.refresh_from_db()
+    return run
+
+
 def ingest_statements(
     update_upstream=False,
     update_anatomical_entities=False,
@@ -161,6 +323,9 @@ def ingest_statements(
     full_imports=[],
     label_imports=[],
     population_uris=None,
+    bulk=False,
+    ontology_dir=None,
+    workers=1,
 ):
     """
     Complete ingestion process: runs all 3 steps.
@@ -181,6 +346,9 @@ def ingest_statements(
         population_uris=population_uris,
         composer_data=composer_data,
         logger_service_param=logger_service,
+        ontology_dir=ontology_dir,
+        ontology_cache_dir=INGESTION_ONTOLOGY_CACHE_DIR,
+        workers=workers,
     )
     
     # Database ingestion
@@ -192,6 +360,8 @@ def ingest_statements(
         disable_overwrite=disable_overwrite,
         force_state_transition=(population_uris is not None),
         logger_service_param=logger_service,
+        bulk=bulk,
     )
+    logger_service.close()
     
     return successful_transaction
@@ -0,0 +1,131 @@
+"""
+Compilation and execution of the custom ingestion code of the relationships, in the neurondm step.
+This module does not depend on Django, it runs in the neurondm task image.
+
+The restricted builtins and imports only catch mistakes, they are not a sandbox:
+getattr, type and the allowed neurondm/rdflib modules give access to everything.
+The code must be trusted like any other code of the ingestion.
+"""
+import builtins
+import signal
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import CodeType
+from typing import Dict, List, NamedTuple
+
+from composer.services.cs_ingestion.exceptions import CustomRelationshipCodeError
+
+# Seconds the code of a relationship can run on a single statement
+CUSTOM_CODE_TIME_BUDGET = 5
+
+# Modules (and their submodules) the custom code can import
+ALLOWED_MODULES = {
+    'collections', 'functools', 'itertools', 'json', 'math', 're', 'string',
+    'neurondm', 'pyontutils', 'rdflib',
+}
+
+SAFE_BUILTIN_NAMES = (
+    'abs', 'all', 'any', 'ascii', 'bin', 'bool', 'bytearray', 'bytes', 'callable', 'chr', 'classmethod',
+    'complex', 'dict', 'dir', 'divmod', 'enumerate', 'filter', 'float', 'format', 'frozenset', 'getattr',
+    'hasattr', 'hash', 'hex', 'id', 'int', 'isinstance', 'issubclass', 'iter', 'len', 'list', 'map', 'max',
+    'min', 'next', 'object', 'oct', 'ord', 'pow', 'print', 'property', 'range', 'repr', 'reversed', 'round',
+    'set', 'slice', 'sorted', 'staticmethod', 'str', 'sum', 'super', 'tuple', 'type', 'zip',
+    'Ellipsis', 'NotImplemented',
+)
+
+# Every builtin exception class that can be caught with `except Exception`
+SAFE_EXCEPTION_NAMES = tuple(
+    name for name, value in vars(builtins).items() if isinstance(value, type) and issubclass(value, Exception)
+)
+
+
+def restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level != 0 or name.split('.')[0] not in ALLOWED_MODULES:
+        raise ImportError(f"Import of '{name}' is not allowed in custom ingestion code")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+SAFE_BUILTINS = {name: getattr(builtins, name) for name in SAFE_BUILTIN_NAMES + SAFE_EXCEPTION_NAMES}
+SAFE_BUILTINS['__import__'] = restricted_import
+SAFE_BUILTINS['__build_class__'] = builtins.__build_class__
+
+
+class CustomCodeTimeout(BaseException):
+    """
+    Raised in the custom code when it runs out of time.
+    Not an Exception, so that the custom code cannot catch it by mistake.
+    """
+
+
+class CompiledRelationship(NamedTuple):
+    id: int
+    title: str
+    type: str
+    source: str
+    code: CodeType
+
+
+@dataclass
+class CustomCodeStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: 'CustomCodeStats'):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.timeouts += other.timeouts
+        self.seconds += other.seconds
+
+
+def compile_custom_relationships(custom_relationships: List[Dict]) -> List[CompiledRelationship]:
+    """
+    Compiles the custom_ingestion_code of each relationship once per run.
+    Raises CustomRelationshipCodeError on the first relationship whose code does not compile.
+    """
+    compiled_relationships = []
+    for relationship_info in custom_relationships:
+        source = relationship_info['custom_ingestion_code']
+        try:
+            code = compile(source, f"<relationship {relationship_info['id']}>", 'exec')
+        except (SyntaxError, ValueError) as e:
+            raise CustomRelationshipCodeError(relationship_info['id'], relationship_info['title'], str(e))
+        compiled_relationships.append(CompiledRelationship(
+            relationship_info['id'], relationship_info['title'], relationship_info.get('type'), source, code,
+        ))
+    return compiled_relationships
+
+
+@contextmanager
+def time_budget(seconds: float):
+    """
+    Raises CustomCodeTimeout in the block once the seconds elapsed.
+    Relies on SIGALRM, the budget is not enforced outside of the main thread or without setitimer.
+    """
+    if not seconds or not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise CustomCodeTimeout()
+
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def run_custom_code(relationship: CompiledRelationship, fc: Dict, seconds: float = CUSTOM_CODE_TIME_BUDGET) -> Dict:
+    """
+    Runs the code of the relationship on a statement, in a namespace that only holds fc and the allowed builtins.
+    Returns the namespace, where the code defines result.
+    """
+    namespace = {'__builtins__': SAFE_BUILTINS, '__name__': 'custom_ingestion_code', 'fc': fc}
+    with time_budget(seconds):
+        exec(relationship.code, namespace)
+    return namespace
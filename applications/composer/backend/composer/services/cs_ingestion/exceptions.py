@@ -8,3 +8,13 @@ class NeuronDMInconsistency(Exception):
 
 class EntityNotFoundException(Exception):
     pass
+
+
+class CustomRelationshipCodeError(Exception):
+    def __init__(self, relationship_id, relationship_title, message):
+        self.relationship_id = relationship_id
+        self.relationship_title = relationship_title
+        self.message = message
+        super().__init__(
+            f"RelationshipID: {relationship_id}, Title: {relationship_title}, Invalid custom ingestion code: {message}"
+        )
@@ -1,70 +1,53 @@
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from django.db import IntegrityError, transaction
 from neurondm import orders
 
 from composer.enums import CSState
-from composer.models import ConnectivityStatement, AnatomicalEntityMeta, Via, Destination, AnatomicalEntity, Layer, \
-    Region, AnatomicalEntityIntersection
+from composer.models import ConnectivityStatement, AnatomicalEntityMeta, AnatomicalEntity, Layer, Region, \
+    AnatomicalEntityIntersection
 from composer.services.cs_ingestion.exceptions import EntityNotFoundException
-from composer.services.cs_ingestion.helpers.common_helpers import ORIGINS, VIAS, DESTINATIONS
+from composer.services.cs_ingestion.helpers.common_helpers import ORIGINS
 
 
-def add_origins(connectivity_statement: ConnectivityStatement, statement: Dict, update_anatomic_entities: bool):
+def get_origin_ids(connectivity_statement: ConnectivityStatement, statement: Dict,
+                   update_anatomic_entities: bool) -> List[int]:
+    origin_ids = []
     for entity in statement[ORIGINS].anatomical_entities:
         try:
-            add_entity_to_instance(connectivity_statement, 'origins', entity, update_anatomic_entities)
+            origin_ids.append(get_or_create_entity(entity, update_anatomic_entities).pk)
         except (EntityNotFoundException, AnatomicalEntityMeta.DoesNotExist):
             assert connectivity_statement.state == CSState.INVALID, f"connectivity_statement {connectivity_statement} should be invalid due to entity {entity} not found but it isn't"
-        except IntegrityError as e:
-            raise e
+    return origin_ids
 
 
-def add_vias(connectivity_statement: ConnectivityStatement, statement: Dict, update_anatomic_entities: bool):
-    for neurondm_via in statement[VIAS]:
-        via_instance = Via.objects.create(connectivity_statement=connectivity_statement,
-                                          type=neurondm_via.type,
-                                          order=neurondm_via.order)
-        add_entities_to_connection(via_instance,
-                                   neurondm_via.anatomical_entities,
-                                   neurondm_via.from_entities,
-                                   connectivity_statement, update_anatomic_entities)
-
-
-def add_destinations(connectivity_statement: ConnectivityStatement, statement: Dict, update_anatomic_entities: bool):
-    for neurondm_destination in statement[DESTINATIONS]:
-        destination_instance = Destination.objects.create(connectivity_statement=connectivity_statement,
-                                                          type=neurondm_destination.type)
-        add_entities_to_connection(destination_instance,
-                                   neurondm_destination.anatomical_entities,
-                                   neurondm_destination.from_entities,
-                                   connectivity_statement, update_anatomic_entities)
-
-
-def add_entities_to_connection(instance, anatomical_entities, from_entities, connectivity_statement,
-                               update_anatomic_entities: bool):
+def get_layer_entity_ids(connectivity_statement: ConnectivityStatement, neurondm_layer,
+                         update_anatomic_entities: bool) -> Tuple[List[int], List[int]]:
+    """
+    Returns the ids of the anatomical entities and of the from entities of a via or destination,
+    the first entity not found stops the layer.
+    """
+    anatomical_entity_ids, from_entity_ids = [], []
     try:
-        for entity in anatomical_entities:
-            add_entity_to_instance(instance, 'anatomical_entities', entity, update_anatomic_entities)
+        for entity in neurondm_layer.anatomical_entities:
+            anatomical_entity_ids.append(get_or_create_entity(entity, update_anatomic_entities).pk)
 
-        for entity in from_entities:
-            add_entity_to_instance(instance, 'from_entities', entity, update_anatomic_entities)
+        for entity in neurondm_layer.from_entities:
+            from_entity_ids.append(get_or_create_entity(entity, update_anatomic_entities).pk)
 
     except (EntityNotFoundException, AnatomicalEntity.DoesNotExist):
         assert connectivity_statement.state == CSState.INVALID, \
             f"connectivity_statement {connectivity_statement} should be invalid due to entity {entity} not found but it isn't"
-    except IntegrityError as e:
-        raise e
+    return anatomical_entity_ids, from_entity_ids
 
 
-def add_entity_to_instance(instance, entity_field, entity, update_anatomic_entities: bool):
+def get_or_create_entity(entity, update_anatomic_entities: bool) -> AnatomicalEntity:
     if isinstance(entity, orders.rl):
-        complex_anatomical_entity, _ = get_or_create_complex_entity(str(entity.region), str(entity.layer),
-                                                                    update_anatomic_entities)
-        getattr(instance, entity_field).add(complex_anatomical_entity)
+        anatomical_entity, _ = get_or_create_complex_entity(str(entity.region), str(entity.layer),
+                                                            update_anatomic_entities)
     else:
         anatomical_entity, _ = get_or_create_simple_entity(str(entity))
-        getattr(instance, entity_field).add(anatomical_entity)
+    return anatomical_entity
 
 
 def get_or_create_complex_entity(region_uri, layer_uri, update_anatomical_entities=False):
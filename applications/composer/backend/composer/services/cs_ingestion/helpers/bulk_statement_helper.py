@@ -0,0 +1,570 @@
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from django.db.models.functions import Lower
+from django.utils import timezone
+from neurondm import orders
+
+from composer.enums import CSState
+from composer.models import (
+    AlertType,
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    ConnectivityStatementAnatomicalEntity,
+    ConnectivityStatementText,
+    ConnectivityStatementTriple,
+    Destination,
+    ExpertConsultant,
+    FunctionalCircuitRole,
+    Note,
+    Phenotype,
+    PopulationSet,
+    ProjectionPhenotype,
+    Provenance,
+    Sentence,
+    Sex,
+    Specie,
+    StatementAlert,
+    Via,
+)
+from composer.services.cs_ingestion.exceptions import EntityNotFoundException
+from composer.services.cs_ingestion.helpers.anatomical_entities_helper import get_or_create_complex_entity
+from composer.services.cs_ingestion.helpers.changes_detector import has_changes
+from composer.services.cs_ingestion.helpers.common_helpers import (
+    ID,
+    LABEL,
+    ORIGINS,
+    VIAS,
+    DESTINATIONS,
+    SEX,
+    FUNCTIONAL_CIRCUIT_ROLE,
+    PHENOTYPE,
+    OTHER_PHENOTYPE,
+    SPECIES,
+    PROVENANCE,
+    EXPERT_CONSULTANTS,
+    FORWARD_CONNECTION,
+    STATEMENT_ALERTS,
+    STATE,
+)
+from composer.services.cs_ingestion.helpers.notes_helper import build_ingestion_system_note
+from composer.services.cs_ingestion.helpers.sentence_helper import get_sentence_defaults
+from composer.services.cs_ingestion.helpers.statement_helper import (
+    build_alert_notes,
+    build_statement_alert_error_note,
+    get_statement_alert_type_and_text,
+    get_statement_defaults,
+    process_dynamic_relationships,
+    update_statement_state,
+)
+from composer.services.cs_ingestion.logging_service import LoggerService
+from composer.services.derived_fields_service import (
+    GRAPH,
+    JOURNEY,
+    PREFIX,
+    SUFFIX,
+    coalesce_derived_fields,
+    defer_derived_fields,
+)
+from composer.services.errors_service import invalidate_connectivity_errors
+from composer.services.predicate_mapping_service import clear_label_cache
+
+# Keys of the anatomical entities resolved by IngestionLookups
+ENTITY = "entity"
+ENTITY_META = "entity_meta"
+
+# Rows of a statement that the ingestion deletes and writes again
+STATEMENT_CHILDREN = (
+    Provenance,
+    ExpertConsultant,
+    Destination,
+    Via,
+    ConnectivityStatementTriple,
+    ConnectivityStatementText,
+    ConnectivityStatementAnatomicalEntity,
+)
+
+
+class IngestionLookups:
+    """
+    The rows an ingestion batch refers to by uri (sexes, phenotypes, species, anatomical
+    entities...) and by name (population sets), loaded with one query per table.
+    """
+
+    def __init__(self, statements: List[Dict], update_anatomical_entities: bool):
+        self.update_anatomical_entities = update_anatomical_entities
+
+        uris = {model: set() for model in (Sex, FunctionalCircuitRole, Phenotype, ProjectionPhenotype)}
+        species_uris = set()
+        population_names = set()
+        entity_uris = set()
+        for statement in statements:
+            uris[Sex].update(statement[SEX][:1])
+            uris[FunctionalCircuitRole].update(statement[FUNCTIONAL_CIRCUIT_ROLE][:1])
+            uris[Phenotype].update(statement[PHENOTYPE])
+            uris[ProjectionPhenotype].update(statement[OTHER_PHENOTYPE][-1:])
+            species_uris.update(statement[SPECIES])
+            population_names.add(statement.get("populationset", ""))
+            entity_uris.update(
+                str(entity) for entity in get_statement_entities(statement) if not isinstance(entity, orders.rl)
+            )
+
+        self.rows_by_uri = {model: _first_by_uri(model, model_uris) for model, model_uris in uris.items()}
+        self.species_ids = {}
+        for specie in Specie.objects.filter(ontology_uri__in=species_uris):
+            self.species_ids.setdefault(specie.ontology_uri, []).append(specie.pk)
+
+        # PopulationSet.save lower cases the name, so the spellings of a name share one row
+        names_by_stored_name = {}
+        for name in population_names:
+            names_by_stored_name.setdefault(name.lower(), []).append(name)
+        populationsets = {
+            populationset.name: populationset
+            for populationset in PopulationSet.objects.filter(name__in=names_by_stored_name)
+        }
+        missing_names = [name for name in names_by_stored_name if name not in populationsets]
+        # bulk_create skips PopulationSet.save, the names are already lower cased
+        created = PopulationSet.objects.bulk_create([PopulationSet(name=name) for name in missing_names])
+        populationsets.update(zip(missing_names, created))
+        self.populationsets = {
+            name: populationsets[stored_name]
+            for stored_name, names in names_by_stored_name.items()
+            for name in names
+        }
+
+        self.entity_meta_ids = dict(
+            AnatomicalEntityMeta.objects.filter(ontology_uri__in=entity_uris).values_list("ontology_uri", "pk")
+        )
+        self.entity_ids_by_meta = dict(
+            AnatomicalEntity.objects.filter(simple_entity_id__in=self.entity_meta_ids.values()).values_list(
+                "simple_entity_id", "pk"
+            )
+        )
+        self.complex_entity_ids = {}
+
+    def get_by_uri(self, model, uri):
+        if not uri:
+            return None
+        return self.rows_by_uri[model].get(uri)
+
+    def get_populationset(self, name: str) -> PopulationSet:
+        return self.populationsets[name]
+
+    def get_species_ids(self, uris: Iterable[str]) -> List[int]:
+        return [specie_id for uri in uris for specie_id in self.species_ids.get(uri, [])]
+
+    def resolve_entity(self, entity) -> Tuple[str, int]:
+        """
+        Returns the key of a neurondm entity: the id of its anatomical entity, or the id of
+        the AnatomicalEntityMeta for the simple entities that may not have one yet.
+        Raises EntityNotFoundException like get_or_create_simple_entity / get_or_create_complex_entity.
+        """
+        if isinstance(entity, orders.rl):
+            region_layer = (str(entity.region), str(entity.layer))
+            if region_layer not in self.complex_entity_ids:
+                anatomical_entity, _ = get_or_create_complex_entity(*region_layer, self.update_anatomical_entities)
+                self.complex_entity_ids[region_layer] = anatomical_entity.pk
+            return ENTITY, self.complex_entity_ids[region_layer]
+
+        uri = str(entity)
+        if uri not in self.entity_meta_ids:
+            raise EntityNotFoundException(f"Anatomical entity meta not found for URI: {uri}")
+        return ENTITY_META, self.entity_meta_ids[uri]
+
+    def create_missing_entities(self, keys: Iterable[Tuple[str, int]]):
+        """
+        Creates the anatomical entities of the simple entity keys that have none,
+        only the entities actually used are created, like get_or_create_simple_entity does.
+        """
+        missing = {
+            meta_id for kind, meta_id in keys
+            if kind == ENTITY_META and meta_id not in self.entity_ids_by_meta
+        }
+        if not missing:
+            return
+        # creating a region or a layer also creates the simple entity of its meta
+        self.entity_ids_by_meta.update(
+            AnatomicalEntity.objects.filter(simple_entity_id__in=missing).values_list("simple_entity_id", "pk")
+        )
+        created = AnatomicalEntity.objects.bulk_create([
+            AnatomicalEntity(simple_entity_id=meta_id)
+            for meta_id in missing if meta_id not in self.entity_ids_by_meta
+        ])
+        self.entity_ids_by_meta.update((entity.simple_entity_id, entity.pk) for entity in created)
+        if created:
+            # bulk_create does not send the post_save signal that invalidates the labels
+            clear_label_cache()
+
+    def get_entity_ids(self, keys: Iterable[Tuple[str, int]]) -> List[int]:
+        return [
+            self.entity_ids_by_meta[key_id] if kind == ENTITY_META else key_id
+            for kind, key_id in keys
+        ]
+
+
+def bulk_create_or_update_connectivity_statements(
+    statements: List[Dict],
+    update_anatomical_entities: bool,
+    logger_service: LoggerService,
+    force_state_transition: bool = False,
+    forward_connections: bool = True,
+) -> List[ConnectivityStatement]:
+    """
+    Set based version of get_or_create_sentence + create_or_update_connectivity_statement
+    + update_forward_connections (unless forward_connections is False), leading to the same database state.
+
+    The related rows are preloaded with IngestionLookups, the existing statements by
+    reference_uri, and the sentences, statements, layers, provenances, notes... and the
+    through table rows are written with bulk_create / bulk_update.
+    The state transitions still run statement by statement, in the same order, since they
+    go through django-fsm. As bulk writes send no signals, the derived fields (graph, journey,
+    prefix, suffix) and the connectivity errors are refreshed once at the end.
+    Must run inside a transaction.
+    """
+    if not statements:
+        return []
+
+    system_user = User.objects.get(username="system")
+    lookups = IngestionLookups(statements, update_anatomical_entities)
+    sentences = _get_or_create_sentences(statements)
+    existing_statements = _get_existing_statements([statement[ID] for statement in statements])
+
+    with coalesce_derived_fields():
+        connectivity_statements = _create_or_update_statements(
+            statements, sentences, existing_statements, lookups, system_user
+        )
+        for connectivity_statement in connectivity_statements:
+            defer_derived_fields(connectivity_statement, GRAPH, JOURNEY, PREFIX, SUFFIX)
+
+        # The exported transitions check the origins of the forward connections of the statement.
+        # create_or_update_connectivity_statement writes the relations of each statement right
+        # after its transition, so the earlier statements of the batch are written before the
+        # transition of a statement forward connecting to them.
+        pending, pending_ids = [], set()
+        for connectivity_statement, statement in zip(connectivity_statements, statements):
+            if pending_ids & _get_forward_connection_ids(connectivity_statement):
+                _replace_relations(pending, lookups, system_user)
+                pending, pending_ids = [], set()
+            update_statement_state(connectivity_statement, statement, force_state_transition)
+            statement[STATE] = connectivity_statement.state
+            pending.append((connectivity_statement, statement))
+            pending_ids.add(connectivity_statement.pk)
+        _replace_relations(pending, lookups, system_user)
+
+        _update_statement_alerts(connectivity_statements, statements, system_user)
+        for connectivity_statement, statement in zip(connectivity_statements, statements):
+            process_dynamic_relationships(
+                connectivity_statement, statement, logger_service, update_anatomical_entities
+            )
+
+        if forward_connections:
+            _update_forward_connections(connectivity_statements, statements)
+
+        statement_ids = [connectivity_statement.pk for connectivity_statement in connectivity_statements]
+        ForwardConnection = ConnectivityStatement.forward_connection.through
+        invalidate_connectivity_errors(statement_ids)
+        invalidate_connectivity_errors(
+            ForwardConnection.objects.filter(to_connectivitystatement_id__in=statement_ids).values(
+                "from_connectivitystatement_id"
+            )
+        )
+        for connectivity_statement in connectivity_statements:
+            connectivity_statement.cached_errors = None
+            connectivity_statement.errors_version = None
+            # the derived fields are computed from the relations written above
+            getattr(connectivity_statement, "_prefetched_objects_cache", {}).clear()
+
+    return connectivity_statements
+
+
+def get_statement_entities(statement: Dict):
+    yield from statement[ORIGINS].anatomical_entities
+    for layer in [*statement[VIAS], *statement[DESTINATIONS]]:
+        yield from layer.anatomical_entities
+        yield from layer.from_entities
+
+
+def _first_by_uri(model, uris):
+    """
+    Maps the uris to the first matching row, like common_helpers.get_value_or_none.
+    """
+    rows = {}
+    for row in model.objects.filter(ontology_uri__in=uris).order_by(*(model._meta.ordering or ["pk"])):
+        rows.setdefault(row.ontology_uri, row)
+    return rows
+
+
+def _get_or_create_sentences(statements: List[Dict]) -> List[Sentence]:
+    sentences = {}
+    existing = (
+        Sentence.objects.prefetch_related(None)
+        .annotate(lower_doi=Lower("doi"))
+        .filter(lower_doi__in={statement[ID].lower() for statement in statements})
+        .order_by("pk")
+    )
+    for sentence in existing:
+        sentences.setdefault(sentence.lower_doi, sentence)
+
+    new_sentences = {}
+    for statement in statements:
+        defaults = get_sentence_defaults(statement)
+        doi = statement[ID].lower()
+        if doi not in sentences:
+            sentences[doi] = new_sentences[doi] = Sentence(**defaults)
+    Sentence.objects.bulk_create(new_sentences.values())
+    for statement in statements:
+        if statement[ID].lower() in new_sentences:
+            logging.info(f"Sentence for neuron {statement[LABEL]} created.")
+
+    return [sentences[statement[ID].lower()] for statement in statements]
+
+
+def _get_existing_statements(reference_uris: List[str]) -> Dict[str, ConnectivityStatement]:
+    """
+    Statements by reference_uri, with the relations read by has_changes.
+    """
+    entities = AnatomicalEntity.objects.prefetch_related(None)
+    layer_prefetches = (
+        Prefetch("anatomical_entities", queryset=entities),
+        Prefetch("from_entities", queryset=entities),
+    )
+    statements = (
+        ConnectivityStatement.objects.filter(reference_uri__in=reference_uris)
+        .prefetch_related(None)
+        .prefetch_related(
+            "species",
+            "provenance_set",
+            "expertconsultant_set",
+            Prefetch(
+                "forward_connection",
+                queryset=ConnectivityStatement.objects.select_related(None).prefetch_related(None),
+            ),
+            Prefetch("origins", queryset=entities),
+            Prefetch("via_set", queryset=Via.objects.prefetch_related(None).prefetch_related(*layer_prefetches)),
+            Prefetch(
+                "destinations",
+                queryset=Destination.objects.prefetch_related(None).prefetch_related(*layer_prefetches),
+            ),
+        )
+    )
+    return {statement.reference_uri: statement for statement in statements}
+
+
+def _get_forward_connection_ids(connectivity_statement: ConnectivityStatement):
+    # new statements have no forward connections yet
+    prefetched = getattr(connectivity_statement, "_prefetched_objects_cache", {})
+    return {statement.pk for statement in prefetched.get("forward_connection", [])}
+
+
+def _create_or_update_statements(
+    statements: List[Dict],
+    sentences: List[Sentence],
+    existing_statements: Dict[str, ConnectivityStatement],
+    lookups: IngestionLookups,
+    system_user: User,
+) -> List[ConnectivityStatement]:
+    connectivity_statements, new_statements, changed_statements = [], [], []
+    updated_fields = []
+    for statement, sentence in zip(statements, sentences):
+        defaults = get_statement_defaults(statement, sentence, lookups)
+        updated_fields = [field for field in defaults if field != "state"]
+
+        connectivity_statement = existing_statements.get(statement[ID])
+        if connectivity_statement is None:
+            # ConnectivityStatement.save gives the new statements the owner of their sentence
+            connectivity_statement = ConnectivityStatement(owner_id=sentence.owner_id, **defaults)
+            new_statements.append(connectivity_statement)
+        elif has_changes(connectivity_statement, statement, defaults):
+            for field in updated_fields:
+                setattr(connectivity_statement, field, defaults[field])
+            changed_statements.append(connectivity_statement)
+        else:
+            # the exports of the batch increase last_used_index on this shared instance
+            connectivity_statement.population = defaults["population"]
+        connectivity_statements.append(connectivity_statement)
+
+    ConnectivityStatement.objects.bulk_create(new_statements)
+    ConnectivityStatement.objects.bulk_update(changed_statements, updated_fields)
+    Note.objects.bulk_create([
+        build_ingestion_system_note(connectivity_statement, system_user)
+        for connectivity_statement in changed_statements
+    ])
+    return connectivity_statements
+
+
+def _replace_relations(items: List[Tuple[ConnectivityStatement, Dict]], lookups: IngestionLookups, system_user: User):
+    """
+    Set based update_many_to_many_fields for the (connectivity statement, statement) items.
+    """
+    if not items:
+        return
+    statement_ids = [connectivity_statement.pk for connectivity_statement, _ in items]
+
+    _delete_relations(ConnectivityStatement.origins.field, statement_ids)
+    _delete_relations(ConnectivityStatement.species.field, statement_ids)
+    for model in STATEMENT_CHILDREN:
+        model._base_manager.filter(connectivity_statement_id__in=statement_ids).delete()
+
+    origins, vias, destinations = {}, [], []
+    for connectivity_statement, statement in items:
+        origins[connectivity_statement.pk] = _resolve_origins(connectivity_statement, statement, lookups)
+        for order, neurondm_via in enumerate(statement[VIAS]):
+            via = Via(connectivity_statement=connectivity_statement, type=neurondm_via.type, order=order)
+            vias.append((via, *_resolve_layer(connectivity_statement, neurondm_via, lookups)))
+        for neurondm_destination in statement[DESTINATIONS]:
+            destination = Destination(connectivity_statement=connectivity_statement, type=neurondm_destination.type)
+            destinations.append((destination, *_resolve_layer(connectivity_statement, neurondm_destination, lookups)))
+
+    entity_keys = [key for keys in origins.values() for key in keys]
+    for _, anatomical_entities, from_entities in [*vias, *destinations]:
+        entity_keys.extend(anatomical_entities + from_entities)
+    lookups.create_missing_entities(entity_keys)
+    _add_relations(
+        ConnectivityStatement.origins.field,
+        {statement_id: lookups.get_entity_ids(keys) for statement_id, keys in origins.items()},
+    )
+    for model, layers in ((Via, vias), (Destination, destinations)):
+        model.objects.bulk_create([layer for layer, _, _ in layers])
+        _add_relations(
+            model.anatomical_entities.field,
+            {layer.pk: lookups.get_entity_ids(keys) for layer, keys, _ in layers},
+        )
+        _add_relations(
+            model.from_entities.field,
+            {layer.pk: lookups.get_entity_ids(keys) for layer, _, keys in layers},
+        )
+
+    _add_relations(
+        ConnectivityStatement.species.field,
+        {
+            connectivity_statement.pk: lookups.get_species_ids(statement[SPECIES])
+            for connectivity_statement, statement in items
+        },
+    )
+    Provenance.objects.bulk_create([
+        Provenance(connectivity_statement=connectivity_statement, uri=uri)
+        for connectivity_statement, statement in items
+        for uri in (statement[PROVENANCE] if statement[PROVENANCE] else [statement[ID]])
+    ])
+    ExpertConsultant.objects.bulk_create([
+        ExpertConsultant(connectivity_statement=connectivity_statement, uri=uri)
+        for connectivity_statement, statement in items
+        for uri in statement.get(EXPERT_CONSULTANTS, [])
+    ])
+    Note.objects.bulk_create([
+        note
+        for connectivity_statement, statement in items
+        for note in build_alert_notes(connectivity_statement, statement, system_user)
+    ])
+
+
+def _resolve_origins(connectivity_statement: ConnectivityStatement, statement: Dict, lookups: IngestionLookups):
+    keys = []
+    for entity in statement[ORIGINS].anatomical_entities:
+        try:
+            keys.append(lookups.resolve_entity(entity))
+        except (EntityNotFoundException, AnatomicalEntityMeta.DoesNotExist):
+            assert connectivity_statement.state == CSState.INVALID, f"connectivity_statement {connectivity_statement} should be invalid due to entity {entity} not found but it isn't"
+    return keys
+
+
+def _resolve_layer(connectivity_statement: ConnectivityStatement, neurondm_layer, lookups: IngestionLookups):
+    """
+    Returns the keys of the anatomical entities and of the from entities of a via or destination.
+    Like get_layer_entity_ids, the first entity not found stops the layer.
+    """
+    anatomical_entities, from_entities = [], []
+    try:
+        for entity in neurondm_layer.anatomical_entities:
+            anatomical_entities.append(lookups.resolve_entity(entity))
+        for entity in neurondm_layer.from_entities:
+            from_entities.append(lookups.resolve_entity(entity))
+    except (EntityNotFoundException, AnatomicalEntity.DoesNotExist):
+        assert connectivity_statement.state == CSState.INVALID, \
+            f"connectivity_statement {connectivity_statement} should be invalid due to entity {entity} not found but it isn't"
+    return anatomical_entities, from_entities
+
+
+def _update_statement_alerts(
+    connectivity_statements: List[ConnectivityStatement], statements: List[Dict], system_user: User
+):
+    alert_types = {alert_type.uri: alert_type for alert_type in AlertType.objects.all()}
+    alerts = {
+        (alert.connectivity_statement_id, alert.alert_type_id): alert
+        for alert in StatementAlert.objects.filter(connectivity_statement__in=connectivity_statements)
+    }
+    new_alerts, updated_alerts, notes = {}, {}, []
+    # bulk_update does not set the auto_now fields
+    now = timezone.now()
+
+    for connectivity_statement, statement in zip(connectivity_statements, statements):
+        for alert_data in statement.get(STATEMENT_ALERTS, []):
+            try:
+                alert_type, alert_text = get_statement_alert_type_and_text(alert_data, alert_types)
+            except ValueError as e:
+                notes.append(build_statement_alert_error_note(connectivity_statement, e, system_user))
+                continue
+
+            key = (connectivity_statement.pk, alert_type.pk)
+            if key not in alerts:
+                alerts[key] = new_alerts[key] = StatementAlert(
+                    connectivity_statement=connectivity_statement, alert_type=alert_type
+                )
+            elif key not in new_alerts:
+                updated_alerts[key] = alerts[key]
+            alert = alerts[key]
+            alert.text = alert_text
+            alert.saved_by = system_user
+            alert.updated_at = now
+
+    StatementAlert.objects.bulk_create(new_alerts.values())
+    StatementAlert.objects.bulk_update(updated_alerts.values(), ["text", "saved_by", "updated_at"])
+    Note.objects.bulk_create(notes)
+
+
+def _update_forward_connections(connectivity_statements: List[ConnectivityStatement], statements: List[Dict]):
+    statement_ids = {
+        connectivity_statement.reference_uri: connectivity_statement.pk
+        for connectivity_statement in connectivity_statements
+    }
+    missing_uris = {uri for statement in statements for uri in statement[FORWARD_CONNECTION]} - statement_ids.keys()
+    statement_ids.update(
+        ConnectivityStatement.objects.filter(reference_uri__in=missing_uris).values_list("reference_uri", "pk")
+    )
+
+    forward_connections = {}
+    for connectivity_statement, statement in zip(connectivity_statements, statements):
+        forward_connections[connectivity_statement.pk] = []
+        for uri in statement[FORWARD_CONNECTION]:
+            if uri not in statement_ids:
+                assert (
+                    statement[STATE] == CSState.INVALID
+                ), f"connectivity_statement {connectivity_statement} should be invalid due to forward connection {uri} not found but it isn't"
+                continue
+            forward_connections[connectivity_statement.pk].append(statement_ids[uri])
+
+    # like forward_connection.clear(), which only sees the statements that are not deprecated
+    ForwardConnection = ConnectivityStatement.forward_connection.through
+    ForwardConnection.objects.filter(from_connectivitystatement_id__in=forward_connections).exclude(
+        to_connectivitystatement__state=CSState.DEPRECATED
+    ).delete()
+    _add_relations(ConnectivityStatement.forward_connection.field, forward_connections)
+
+
+def _delete_relations(m2m_field, object_ids):
+    through = m2m_field.remote_field.through
+    through.objects.filter(**{f"{m2m_field.m2m_field_name()}_id__in": object_ids}).delete()
+
+
+def _add_relations(m2m_field, related_ids_by_id):
+    through = m2m_field.remote_field.through
+    source = f"{m2m_field.m2m_field_name()}_id"
+    target = f"{m2m_field.m2m_reverse_field_name()}_id"
+    through.objects.bulk_create([
+        through(**{source: object_id, target: related_id})
+        for object_id, related_ids in related_ids_by_id.items()
+        for related_id in dict.fromkeys(related_ids)
+    ])
@@ -66,7 +66,8 @@ def has_changes(connectivity_statement, statement, defaults):
                 get_anatomical_entity_identifier_composer(ae) for ae in via.anatomical_entities.all()),
             'from_entities': set(get_anatomical_entity_identifier_composer(ae) for ae in via.from_entities.all())
         }
-        for via in connectivity_statement.via_set.order_by('order').all()
+        # Via is ordered by 'order', all() also reads the vias prefetched by the bulk ingestion
+        for via in connectivity_statement.via_set.all()
     ]
     new_vias = statement[VIAS]
 
@@ -19,17 +19,24 @@ logger_service = LoggerService(
 )
 
 
-def get_sex(statement: Dict) -> Sex:
-    return get_value_or_none(Sex, statement[SEX][0] if statement[SEX] else None)
+def _get_by_uri(model, uri: Optional[str], lookups=None):
+    # lookups (IngestionLookups) holds the rows preloaded by the bulk ingestion
+    if lookups is not None:
+        return lookups.get_by_uri(model, uri)
+    return get_value_or_none(model, uri)
 
 
-def get_functional_circuit_role(statement: Dict) -> Optional[FunctionalCircuitRole]:
+def get_sex(statement: Dict, lookups=None) -> Sex:
+    return _get_by_uri(Sex, statement[SEX][0] if statement[SEX] else None, lookups)
+
+
+def get_functional_circuit_role(statement: Dict, lookups=None) -> Optional[FunctionalCircuitRole]:
     if len(statement[FUNCTIONAL_CIRCUIT_ROLE]) > 1:
         logger_service.add_anomaly(
             LoggableAnomaly(statement[ID], None, f'Multiple functional circuit roles found.'))
 
-    return get_value_or_none(
-        FunctionalCircuitRole, statement[FUNCTIONAL_CIRCUIT_ROLE][0]) if statement[FUNCTIONAL_CIRCUIT_ROLE] else None
+    return _get_by_uri(
+        FunctionalCircuitRole, statement[FUNCTIONAL_CIRCUIT_ROLE][0], lookups) if statement[FUNCTIONAL_CIRCUIT_ROLE] else None
 
 
 def get_circuit_type(statement: Dict):
@@ -42,12 +49,17 @@ def get_circuit_type(statement: Dict):
         return None
 
 
-def get_phenotype(statement: Dict) -> Optional[Phenotype]:
+def get_phenotype(statement: Dict, lookups=None) -> Optional[Phenotype]:
     if statement[PHENOTYPE]:
         if len(statement[PHENOTYPE]) > 1:
             logger_service.add_anomaly(LoggableAnomaly(statement[ID], None, f'Multiple phenotypes found.'))
 
         for p in statement[PHENOTYPE]:
+            if lookups is not None:
+                phenotype = lookups.get_by_uri(Phenotype, p)
+                if phenotype:
+                    return phenotype
+                continue
             try:
                 phenotype = Phenotype.objects.get(ontology_uri=p)
                 return phenotype
@@ -60,16 +72,20 @@ def get_phenotype(statement: Dict) -> Optional[Phenotype]:
 
 
 
-def get_or_create_populationset(populationset_name: str) -> PopulationSet:
+def get_or_create_populationset(populationset_name: str, lookups=None) -> PopulationSet:
+    if lookups is not None:
+        return lookups.get_populationset(populationset_name)
     populationset, _ = PopulationSet.objects.get_or_create(
         name=populationset_name
     )
     return populationset
 
 
-def get_projection_phenotype(statement: Dict) -> Optional[ProjectionPhenotype]:
+def get_projection_phenotype(statement: Dict, lookups=None) -> Optional[ProjectionPhenotype]:
     if statement[OTHER_PHENOTYPE]:
         last_phenotype_uri = statement[OTHER_PHENOTYPE][-1]
+        if lookups is not None:
+            return lookups.get_by_uri(ProjectionPhenotype, last_phenotype_uri)
         try:
             projection_phenotype = ProjectionPhenotype.objects.get(ontology_uri=last_phenotype_uri)
             return projection_phenotype
@@ -5,10 +5,14 @@ from composer.models import ConnectivityStatement, Note
 
 
 def add_ingestion_system_note(connectivity_statement: ConnectivityStatement):
-    Note.objects.create(connectivity_statement=connectivity_statement,
-                        user=User.objects.get(username="system"),
-                        type=NoteType.ALERT,
-                        note=f"Overwritten by manual ingestion")
+    build_ingestion_system_note(connectivity_statement, User.objects.get(username="system")).save()
+
+
+def build_ingestion_system_note(connectivity_statement: ConnectivityStatement, system_user: User) -> Note:
+    return Note(connectivity_statement=connectivity_statement,
+                user=system_user,
+                type=NoteType.ALERT,
+                note=f"Overwritten by manual ingestion")
 
 
 def do_transition_to_invalid_with_note(connectivity_statement: ConnectivityStatement, note: str):
@@ -20,12 +24,14 @@ def do_transition_to_invalid_with_note(connectivity_statement: ConnectivityState
 
 
 def create_invalid_note(connectivity_statement: ConnectivityStatement, note: str):
-    Note.objects.create(
-        connectivity_statement=connectivity_statement,
-        user=User.objects.get(username="system"),
-        type=NoteType.ALERT,
-        note=f"Invalidated due to the following reason(s): {note}"
-    )
+    build_invalid_note(connectivity_statement, note, User.objects.get(username="system")).save()
+
+
+def build_invalid_note(connectivity_statement: ConnectivityStatement, note: str, system_user: User) -> Note:
+    return Note(connectivity_statement=connectivity_statement,
+                user=system_user,
+                type=NoteType.ALERT,
+                note=f"Invalidated due to the following reason(s): {note}")
 
 
 def do_transition_to_exported(connectivity_statement: ConnectivityStatement):
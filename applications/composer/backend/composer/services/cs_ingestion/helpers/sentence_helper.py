@@ -16,7 +16,7 @@ logger_service = LoggerService(
 )
 
 
-def get_or_create_sentence(statement: Dict) -> Tuple[Sentence, bool]:
+def get_sentence_defaults(statement: Dict) -> Dict:
     text = f'{statement[LABEL]} created from neurondm on {NOW}'
     has_sentence_reference = len(statement[SENTENCE_NUMBER]) > 0
 
@@ -24,15 +24,19 @@ def get_or_create_sentence(statement: Dict) -> Tuple[Sentence, bool]:
         logger_service.add_anomaly(
             LoggableAnomaly(statement[ID], None, f'Multiple sentence numbers found.'))
 
+    return {"title": text[0:185],
+            "text": text,
+            "doi": statement[ID],
+            "external_ref": statement[SENTENCE_NUMBER][0] if has_sentence_reference else None,
+            "batch_name": f"neurondm-{NOW}" if has_sentence_reference else None,
+            "state": SentenceState.COMPOSE_NOW
+            }
+
+
+def get_or_create_sentence(statement: Dict) -> Tuple[Sentence, bool]:
     sentence, created = Sentence.objects.get_or_create(
         doi__iexact=statement[ID],
-        defaults={"title": text[0:185],
-                  "text": text,
-                  "doi": statement[ID],
-                  "external_ref": statement[SENTENCE_NUMBER][0] if has_sentence_reference else None,
-                  "batch_name": f"neurondm-{NOW}" if has_sentence_reference else None,
-                  "state": SentenceState.COMPOSE_NOW
-                  },
+        defaults=get_sentence_defaults(statement),
     )
     if created:
         logging.info(f"Sentence for neuron {statement[LABEL]} created.")
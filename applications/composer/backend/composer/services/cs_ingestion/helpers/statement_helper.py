@@ -1,10 +1,23 @@
 import re
+from collections import Counter
 from typing import Dict, Tuple, List
 import traceback
 
 from django.contrib.auth.models import User
 
 from composer.services.cs_ingestion.logging_service import LoggerService
+from composer.services.derived_fields_service import (
+    GRAPH,
+    JOURNEY,
+    PREFIX,
+    SUFFIX,
+    coalesce_derived_fields,
+    defer_derived_fields,
+)
+from composer.services.errors_service import (
+    invalidate_connectivity_errors,
+    invalidate_upstream_connectivity_errors,
+)
 from composer.services.state_services import ConnectivityStatementStateService
 from composer.enums import CSState, NoteType, RelationshipType
 from composer.management.commands.ingest_nlp_sentence import ID
@@ -23,11 +36,12 @@ from composer.models import (
     ConnectivityStatementText,
     ConnectivityStatementAnatomicalEntity,
     AnatomicalEntity,
+    Via,
+    Destination,
 )
 from composer.services.cs_ingestion.helpers.anatomical_entities_helper import (
-    add_origins,
-    add_vias,
-    add_destinations,
+    get_origin_ids,
+    get_layer_entity_ids,
 )
 from composer.services.cs_ingestion.helpers.changes_detector import has_changes
 from composer.services.cs_ingestion.helpers.common_helpers import (
@@ -41,6 +55,8 @@ from composer.services.cs_ingestion.helpers.common_helpers import (
     EXPERT_CONSULTANTS,
     SPECIES,
     FORWARD_CONNECTION,
+    VIAS,
+    DESTINATIONS,
 )
 from composer.services.cs_ingestion.helpers.getters import (
     get_sex,
@@ -64,6 +80,11 @@ from composer.services.cs_ingestion.models import (
 )
 
 
+# Fields of the ingested defaults the statement preview prefix and suffix are computed from
+PREVIEW_PREFIX_FIELDS = ("sex", "phenotype")
+PREVIEW_SUFFIX_FIELDS = ("circuit_type", "projection_phenotype")
+
+
 def create_or_update_connectivity_statement(
     statement: Dict,
     sentence: Sentence,
@@ -86,37 +107,96 @@ def create_or_update_connectivity_statement(
         Tuple of (ConnectivityStatement, created) where created is True if new
     """
     reference_uri = statement[ID]
+    defaults = get_statement_defaults(statement, sentence)
+
+    connectivity_statement, created = ConnectivityStatement.objects.get_or_create(
+        reference_uri=reference_uri, defaults=defaults
+    )
+    # the preview is refreshed once, after the relations are written by update_many_to_many_fields
+    with coalesce_derived_fields():
+        if not created:
+            if has_changes(connectivity_statement, statement, defaults):
+                # QuerySet.update sends no post_save, the preview is refreshed here
+                outdated = get_outdated_preview_fields(connectivity_statement, defaults)
+                defaults_without_state = {
+                    field: value for field, value in defaults.items() if field != "state"
+                }
+                ConnectivityStatement.objects.filter(reference_uri=reference_uri).update(
+                    **defaults_without_state
+                )
+                connectivity_statement = ConnectivityStatement.objects.get(
+                    reference_uri=reference_uri
+                )
+                if outdated:
+                    defer_derived_fields(connectivity_statement, *outdated)
+                add_ingestion_system_note(connectivity_statement)
+
+        update_statement_state(connectivity_statement, statement, force_state_transition)
+
+        for alert_data in statement.get(STATEMENT_ALERTS, []):
+            try:
+                create_or_update_statement_alert(connectivity_statement, alert_data)
+            except ValueError as e:
+                build_statement_alert_error_note(
+                    connectivity_statement, e, User.objects.get(username="system")
+                ).save()
+
+        update_many_to_many_fields(
+            connectivity_statement, statement, update_anatomical_entities
+        )
+    
+    # Process dynamic relationships with custom code
+    process_dynamic_relationships(connectivity_statement, statement, logger_service, update_anatomical_entities)
+    
+    statement[STATE] = connectivity_statement.state
+
+    return connectivity_statement, created
+
+
+def get_outdated_preview_fields(connectivity_statement: ConnectivityStatement, defaults: Dict) -> List[str]:
+    """
+    Returns the statement preview fields (PREFIX, SUFFIX) computed from the defaults that differ from the row.
+    """
+    def differs(field):
+        value = defaults[field]
+        if ConnectivityStatement._meta.get_field(field).is_relation:
+            return getattr(connectivity_statement, f"{field}_id") != (value.pk if value is not None else None)
+        return getattr(connectivity_statement, field) != value
+
+    outdated = []
+    if any(differs(field) for field in PREVIEW_PREFIX_FIELDS):
+        outdated.append(PREFIX)
+    if any(differs(field) for field in PREVIEW_SUFFIX_FIELDS):
+        outdated.append(SUFFIX)
+    return outdated
+
+
+def get_statement_defaults(statement: Dict, sentence: Sentence, lookups=None) -> Dict:
+    """
+    Field values of the statement row. lookups (IngestionLookups) provides the preloaded
+    related rows in the bulk ingestion, they are queried one by one otherwise.
+    """
     populationset_name = statement.get("populationset", "")
-    defaults = {
+    return {
         "sentence": sentence,
         "knowledge_statement": statement[PREF_LABEL],
-        "sex": get_sex(statement),
+        "sex": get_sex(statement, lookups),
         "circuit_type": get_circuit_type(statement),
-        "functional_circuit_role": get_functional_circuit_role(statement),
-        "phenotype": get_phenotype(statement),
-        "population": get_or_create_populationset(populationset_name),
-        "projection_phenotype": get_projection_phenotype(statement),
+        "functional_circuit_role": get_functional_circuit_role(statement, lookups),
+        "phenotype": get_phenotype(statement, lookups),
+        "population": get_or_create_populationset(populationset_name, lookups),
+        "projection_phenotype": get_projection_phenotype(statement, lookups),
         "reference_uri": statement[ID],
         "state": CSState.NPO_APPROVED,
         "curie_id": statement[LABEL],
     }
 
-    connectivity_statement, created = ConnectivityStatement.objects.get_or_create(
-        reference_uri=reference_uri, defaults=defaults
-    )
-    if not created:
-        if has_changes(connectivity_statement, statement, defaults):
-            defaults_without_state = {
-                field: value for field, value in defaults.items() if field != "state"
-            }
-            ConnectivityStatement.objects.filter(reference_uri=reference_uri).update(
-                **defaults_without_state
-            )
-            connectivity_statement = ConnectivityStatement.objects.get(
-                reference_uri=reference_uri
-            )
-            add_ingestion_system_note(connectivity_statement)
 
+def update_statement_state(
+    connectivity_statement: ConnectivityStatement,
+    statement: Dict,
+    force_state_transition: bool = False,
+):
     validation_errors = statement.get(VALIDATION_ERRORS, ValidationErrors())
 
     # State transitions: Handle validation errors and state updates
@@ -146,30 +226,19 @@ def create_or_update_connectivity_statement(
             if connectivity_statement.state != CSState.EXPORTED:
                 do_transition_to_exported(connectivity_statement)
 
-    for alert_data in statement.get(STATEMENT_ALERTS, []):
-        try:
-            create_or_update_statement_alert(connectivity_statement, alert_data)
-        except ValueError as e:
-            Note.objects.create(
-                connectivity_statement=connectivity_statement,
-                user=User.objects.get(username="system"),
-                type=NoteType.ALERT,
-                note=(
-                    f"Warning: A problem occurred while updating a statement alert. "
-                    f"The issue was: '{str(e)}'. Please review the alert data and ensure the associated AlertType exists."
-                ),
-            )
 
-    update_many_to_many_fields(
-        connectivity_statement, statement, update_anatomical_entities
+def build_statement_alert_error_note(
+    connectivity_statement: ConnectivityStatement, error: ValueError, system_user: User
+) -> Note:
+    return Note(
+        connectivity_statement=connectivity_statement,
+        user=system_user,
+        type=NoteType.ALERT,
+        note=(
+            f"Warning: A problem occurred while updating a statement alert. "
+            f"The issue was: '{str(error)}'. Please review the alert data and ensure the associated AlertType exists."
+        ),
     )
-    
-    # Process dynamic relationships with custom code
-    process_dynamic_relationships(connectivity_statement, statement, logger_service, update_anatomical_entities)
-    
-    statement[STATE] = connectivity_statement.state
-
-    return connectivity_statement, created
 
 
 def process_dynamic_relationships(
@@ -409,92 +478,222 @@ def update_many_to_many_fields(
     statement: Dict,
     update_anatomical_entities: bool,
 ):
-    connectivity_statement.origins.clear()
-    connectivity_statement.species.clear()
-    # Notes are not cleared because they should be kept
-
-    for provenance in connectivity_statement.provenance_set.all():
-        provenance.delete()
-
-    for expert_consultant in connectivity_statement.expertconsultant_set.all():
-        expert_consultant.delete()
-
-    for destination in connectivity_statement.destinations.all():
-        destination.delete()
+    """
+    Brings the relations of the statement in line with the ingested data, writing only the rows that differ.
+    The through rows are written without m2m_changed, the graph rendering state, journey and preview
+    are then refreshed once, and only when what they are computed from changed.
+    """
+    # Entities are resolved (and created) in the order origins, vias, destinations
+    origin_ids = get_origin_ids(connectivity_statement, statement, update_anatomical_entities)
+    vias = [
+        (neurondm_via.type, *get_layer_entity_ids(connectivity_statement, neurondm_via, update_anatomical_entities))
+        for neurondm_via in statement[VIAS]
+    ]
+    destinations = [
+        (neurondm_destination.type,
+         *get_layer_entity_ids(connectivity_statement, neurondm_destination, update_anatomical_entities))
+        for neurondm_destination in statement[DESTINATIONS]
+    ]
+    species_ids = Specie.objects.filter(ontology_uri__in=statement[SPECIES]).values_list("id", flat=True)
+
+    with coalesce_derived_fields():
+        outdated = set()
+        if set_related_ids(
+            ConnectivityStatement.origins.field, connectivity_statement.pk,
+            connectivity_statement.origins.values_list("id", flat=True), origin_ids,
+        ):
+            outdated.update((GRAPH, JOURNEY, SUFFIX))
+            invalidate_upstream_connectivity_errors(connectivity_statement.pk)
+        if set_related_ids(
+            ConnectivityStatement.species.field, connectivity_statement.pk,
+            connectivity_statement.species.values_list("id", flat=True), species_ids,
+        ):
+            outdated.add(PREFIX)
+        if update_vias(connectivity_statement, vias):
+            outdated.update((GRAPH, JOURNEY))
+        if update_destinations(connectivity_statement, destinations):
+            outdated.update((GRAPH, JOURNEY))
+            invalidate_connectivity_errors([connectivity_statement.pk])
+        if outdated:
+            defer_derived_fields(connectivity_statement, *outdated)
+
+        set_uris(connectivity_statement, Provenance, statement[PROVENANCE] or [statement[ID]])
+        set_uris(connectivity_statement, ExpertConsultant, statement.get(EXPERT_CONSULTANTS, []))
+        # Notes are not cleared because they should be kept
+        add_notes(connectivity_statement, statement)
 
-    for via in connectivity_statement.via_set.all():
-        via.delete()
-    
     # Clear dynamic relationship data
     for cs_triple in connectivity_statement.connectivitystatementtriple_set.all():
         cs_triple.delete()
-    
+
     for cs_text in connectivity_statement.connectivitystatementtext_set.all():
         cs_text.delete()
-    
+
     for cs_ae in connectivity_statement.connectivitystatementanatomicalentity_set.all():
         cs_ae.delete()
 
-    add_origins(connectivity_statement, statement, update_anatomical_entities)
-    add_vias(connectivity_statement, statement, update_anatomical_entities)
-    add_destinations(connectivity_statement, statement, update_anatomical_entities)
-    add_species(connectivity_statement, statement)
-    add_provenances(connectivity_statement, statement)
-    add_expert_consultants(connectivity_statement, statement)
-    add_notes(connectivity_statement, statement)
 
+def update_vias(connectivity_statement: ConnectivityStatement, vias: List[Tuple]) -> bool:
+    """
+    vias holds the (type, anatomical entity ids, from entity ids) of each via, in order.
+    The existing vias are updated in place by position; returns whether anything changed.
+    """
+    current_vias = list(connectivity_statement.via_set.all())
+    changed = len(current_vias) != len(vias)
+
+    for via, (via_type, anatomical_entity_ids, from_entity_ids) in zip(current_vias, vias):
+        if via.type != via_type:
+            Via.objects.filter(pk=via.pk).update(type=via_type)
+            changed = True
+        changed |= update_layer_entities(via, anatomical_entity_ids, from_entity_ids)
+
+    Via._base_manager.filter(pk__in=[via.pk for via in current_vias[len(vias):]]).delete()
+    for order, (via_type, anatomical_entity_ids, from_entity_ids) in enumerate(vias[len(current_vias):], len(current_vias)):
+        via = Via.objects.create(connectivity_statement=connectivity_statement, type=via_type, order=order)
+        update_layer_entities(via, anatomical_entity_ids, from_entity_ids)
 
-def add_notes(connectivity_statement: ConnectivityStatement, statement: Dict):
-    for note in statement[NOTE_ALERT]:
-        Note.objects.create(
-            connectivity_statement=connectivity_statement,
-            user=User.objects.get(username="system"),
-            type=NoteType.ALERT,
-            note=note,
-        )
+    return changed
 
 
-def add_provenances(connectivity_statement: ConnectivityStatement, statement: Dict):
-    provenances_list = (
-        statement[PROVENANCE] if statement[PROVENANCE] else [statement[ID]]
+def update_destinations(connectivity_statement: ConnectivityStatement, destinations: List[Tuple]) -> bool:
+    """
+    destinations holds the (type, anatomical entity ids, from entity ids) of each destination.
+    Destinations have no order, the ones already matching are kept and the others are reused
+    before anything gets created or deleted; returns whether anything changed.
+    """
+    def layer_key(layer_type, anatomical_entity_ids, from_entity_ids):
+        return layer_type, frozenset(anatomical_entity_ids), frozenset(from_entity_ids)
+
+    current_destinations = list(connectivity_statement.destinations.all())
+    unmatched = list(destinations)
+    for destination in list(current_destinations):
+        key = layer_key(
+            destination.type,
+            [entity.pk for entity in destination.anatomical_entities.all()],
+            [entity.pk for entity in destination.from_entities.all()],
+        )
+        match = next((layer for layer in unmatched if layer_key(*layer) == key), None)
+        if match is not None:
+            unmatched.remove(match)
+            current_destinations.remove(destination)
+
+    if not current_destinations and not unmatched:
+        return False
+
+    for destination, (destination_type, anatomical_entity_ids, from_entity_ids) in zip(current_destinations, unmatched):
+        if destination.type != destination_type:
+            Destination.objects.filter(pk=destination.pk).update(type=destination_type)
+        update_layer_entities(destination, anatomical_entity_ids, from_entity_ids)
+
+    Destination._base_manager.filter(
+        pk__in=[destination.pk for destination in current_destinations[len(unmatched):]]
+    ).delete()
+    for destination_type, anatomical_entity_ids, from_entity_ids in unmatched[len(current_destinations):]:
+        destination = Destination.objects.create(connectivity_statement=connectivity_statement, type=destination_type)
+        update_layer_entities(destination, anatomical_entity_ids, from_entity_ids)
+
+    return True
+
+
+def update_layer_entities(layer, anatomical_entity_ids: List[int], from_entity_ids: List[int]) -> bool:
+    # the entities of the existing layers are prefetched by their manager
+    anatomical_entities_changed = set_related_ids(
+        type(layer).anatomical_entities.field, layer.pk,
+        [entity.pk for entity in layer.anatomical_entities.all()], anatomical_entity_ids,
     )
-    provenances = (
-        Provenance(connectivity_statement=connectivity_statement, uri=provenance)
-        for provenance in provenances_list
+    from_entities_changed = set_related_ids(
+        type(layer).from_entities.field, layer.pk,
+        [entity.pk for entity in layer.from_entities.all()], from_entity_ids,
     )
-    Provenance.objects.bulk_create(provenances)
+    return anatomical_entities_changed or from_entities_changed
 
 
-def add_expert_consultants(connectivity_statement: ConnectivityStatement, statement: Dict):
-    expert_consultants_list = statement.get(EXPERT_CONSULTANTS, [])
-    if expert_consultants_list:
-        expert_consultants = (
-            ExpertConsultant(connectivity_statement=connectivity_statement, uri=uri)
-            for uri in expert_consultants_list
-        )
-        ExpertConsultant.objects.bulk_create(expert_consultants)
+def set_related_ids(m2m_field, object_id: int, current_ids, related_ids) -> bool:
+    """
+    Inserts and deletes the through rows of a many to many field so that object_id is
+    related to exactly related_ids. No m2m_changed is sent; returns whether anything changed.
+    """
+    through = m2m_field.remote_field.through
+    source = f"{m2m_field.m2m_field_name()}_id"
+    target = f"{m2m_field.m2m_reverse_field_name()}_id"
+    current_ids = set(current_ids)
+    related_ids = dict.fromkeys(related_ids)
+
+    removed_ids = current_ids.difference(related_ids)
+    added_ids = [related_id for related_id in related_ids if related_id not in current_ids]
+    if removed_ids:
+        through.objects.filter(**{source: object_id, f"{target}__in": removed_ids}).delete()
+    if added_ids:
+        through.objects.bulk_create([through(**{source: object_id, target: related_id}) for related_id in added_ids])
+    return bool(removed_ids or added_ids)
+
+
+def set_uris(connectivity_statement: ConnectivityStatement, model, uris: List[str]):
+    """
+    Provenances and expert consultants: keeps the existing rows whose uri is still listed,
+    deletes the others and creates the missing ones.
+    """
+    missing = Counter(uris)
+    stale_ids = []
+    for row in model.objects.filter(connectivity_statement=connectivity_statement):
+        if missing[row.uri]:
+            missing[row.uri] -= 1
+        else:
+            stale_ids.append(row.pk)
 
+    new_rows = []
+    for uri in uris:
+        if missing[uri]:
+            missing[uri] -= 1
+            new_rows.append(model(connectivity_statement=connectivity_statement, uri=uri))
 
-def add_species(connectivity_statement: ConnectivityStatement, statement: Dict):
-    species = Specie.objects.filter(ontology_uri__in=statement[SPECIES])
-    connectivity_statement.species.add(*species)
+    if stale_ids:
+        model.objects.filter(pk__in=stale_ids).delete()
+    model.objects.bulk_create(new_rows)
+
+
+def add_notes(connectivity_statement: ConnectivityStatement, statement: Dict):
+    for note in build_alert_notes(connectivity_statement, statement, User.objects.get(username="system")):
+        note.save()
+
+
+def build_alert_notes(connectivity_statement: ConnectivityStatement, statement: Dict, system_user: User) -> List[Note]:
+    return [
+        Note(
+            connectivity_statement=connectivity_statement,
+            user=system_user,
+            type=NoteType.ALERT,
+            note=note,
+        )
+        for note in statement[NOTE_ALERT]
+    ]
 
 
 def update_forward_connections(statements: List):
-    for statement in statements:
-        connectivity_statement = ConnectivityStatement.objects.get(
-            reference_uri=statement[ID]
+    """
+    Resolves the forward connections of all the statements with a single query.
+    """
+    uris = {statement[ID] for statement in statements}
+    uris.update(uri for statement in statements for uri in statement[FORWARD_CONNECTION])
+    connectivity_statements = {
+        connectivity_statement.reference_uri: connectivity_statement
+        for connectivity_statement in ConnectivityStatement.objects.prefetch_related(None).filter(
+            reference_uri__in=uris
         )
-        connectivity_statement.forward_connection.clear()
+    }
+
+    for statement in statements:
+        connectivity_statement = connectivity_statements[statement[ID]]
+        forward_statements = []
         for uri in statement[FORWARD_CONNECTION]:
-            try:
-                forward_statement = ConnectivityStatement.objects.get(reference_uri=uri)
-            except ConnectivityStatement.DoesNotExist:
+            if uri not in connectivity_statements:
                 assert (
                     statement[STATE] == CSState.INVALID
                 ), f"connectivity_statement {connectivity_statement} should be invalid due to forward connection {uri} not found but it isn't"
                 continue
-            connectivity_statement.forward_connection.add(forward_statement)
+            forward_statements.append(connectivity_statements[uri])
+        # like clear() then add(), set() only sees the forward connections that are not deprecated
+        connectivity_statement.forward_connection.set(forward_statements)
 
 
 def create_or_update_statement_alert(
@@ -507,20 +706,7 @@ def create_or_update_statement_alert(
     :param alert_data: A tuple where the first element is the AlertType URI,
                        and the second element is the alert text.
     """
-    alert_uri, alert_value = alert_data
-
-    try:
-        alert_text = str(alert_value)
-    except (TypeError, ValueError):
-        raise ValueError(
-            f"alert_text with value '{alert_value}' cannot be converted to string."
-        )
-
-    try:
-        # Fetch the AlertType based on the URI
-        alert_type = AlertType.objects.get(uri=alert_uri)
-    except AlertType.DoesNotExist:
-        raise ValueError(f"AlertType with URI '{alert_uri}' does not exist")
+    alert_type, alert_text = get_statement_alert_type_and_text(alert_data)
 
     system_user = User.objects.get(username="system")
 
@@ -535,3 +721,29 @@ def create_or_update_statement_alert(
     )
 
     return statement_alert, created
+
+
+def get_statement_alert_type_and_text(alert_data: Tuple[str, str], alert_types: Dict = None):
+    """
+    Returns the AlertType and the text of the alert, raises ValueError when the data is not usable.
+    alert_types maps the uris to the AlertTypes when they are preloaded.
+    """
+    alert_uri, alert_value = alert_data
+
+    try:
+        alert_text = str(alert_value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"alert_text with value '{alert_value}' cannot be converted to string."
+        )
+
+    try:
+        # Fetch the AlertType based on the URI
+        if alert_types is not None:
+            alert_type = alert_types[alert_uri]
+        else:
+            alert_type = AlertType.objects.get(uri=alert_uri)
+    except (AlertType.DoesNotExist, KeyError):
+        raise ValueError(f"AlertType with URI '{alert_uri}' does not exist")
+
+    return alert_type, alert_text
@@ -1,54 +1,84 @@
-from typing import Set, Dict
+from collections import defaultdict, deque
+from typing import Dict, List
+
+from django.contrib.auth.models import User
+from django.utils import timezone
 
 from composer.enums import CSState
-from composer.models import ConnectivityStatement
-from composer.services.cs_ingestion.helpers.notes_helper import do_transition_to_invalid_with_note, create_invalid_note
+from composer.models import ConnectivityStatement, Note
+from composer.services.cs_ingestion.helpers.notes_helper import build_invalid_note
 
 
 def update_upstream_statements():
-    invalid_visited = set()
-    connectivity_statements_invalid_reasons = {}
-
-    initial_invalid_statements = ConnectivityStatement.objects.filter(state=CSState.INVALID)
-
-    for statement in initial_invalid_statements:
-        propagate_invalid_state(statement, invalid_visited, connectivity_statements_invalid_reasons)
+    connectivity_statements_invalid_reasons = propagate_invalid_state(
+        ConnectivityStatement.objects.filter(state=CSState.INVALID).values_list("id", flat=True),
+        get_backward_connections(),
+    )
+    if not connectivity_statements_invalid_reasons:
+        return
 
-    for statement_uri, (connectivity_statement, reasons) in connectivity_statements_invalid_reasons.items():
-        all_reasons = '; '.join(reasons)
+    system_user = User.objects.get(username="system")
+    # Only the statements that are not invalid yet are loaded, to perform their transition
+    for connectivity_statement in ConnectivityStatement.objects.prefetch_related(None).filter(
+        id__in=connectivity_statements_invalid_reasons
+    ).exclude(state=CSState.INVALID):
+        connectivity_statement.invalid(by=system_user)
+        connectivity_statement.save()
 
-        # Perform transition and create a note only if not already invalid
-        if connectivity_statement.state != CSState.INVALID:
-            do_transition_to_invalid_with_note(connectivity_statement, all_reasons)
-        else:
-            create_invalid_note(connectivity_statement, all_reasons)
+    Note.objects.bulk_create([
+        build_invalid_note(ConnectivityStatement(id=statement_id), '; '.join(reasons), system_user)
+        for statement_id, reasons in connectivity_statements_invalid_reasons.items()
+    ])
+    # bulk_create skips the note signal that touches the modified_date of the statement
+    ConnectivityStatement.all_objects.filter(id__in=connectivity_statements_invalid_reasons).update(
+        modified_date=timezone.now()
+    )
 
 
-def propagate_invalid_state(connectivity_statement: ConnectivityStatement, invalid_visited: Set,
-                            connectivity_statements_invalid_reasons: Dict, previous_reason: str = ''):
-    statement_uri = connectivity_statement.reference_uri
+def get_backward_connections() -> Dict[int, List[int]]:
+    """
+    Maps each statement id to the ids of the (not deprecated) statements forward connecting to it,
+    loaded with a single query.
+    """
+    ForwardConnection = ConnectivityStatement.forward_connection.through
+    backward_connections = defaultdict(list)
+    edges = ForwardConnection.objects.exclude(
+        from_connectivitystatement__state=CSState.DEPRECATED
+    ).values_list("to_connectivitystatement_id", "from_connectivitystatement_id")
+    for to_id, from_id in edges:
+        backward_connections[to_id].append(from_id)
+    return backward_connections
 
-    if statement_uri in invalid_visited:
-        return
 
-    invalid_visited.add(statement_uri)
+def propagate_invalid_state(invalid_statement_ids, backward_connections: Dict[int, List[int]]) -> Dict[int, List[str]]:
+    """
+    Breadth first traversal of the backward connections of the invalid statements.
+    Returns the reasons each upstream statement has to be invalid, keyed by statement id.
 
-    # Fetch backward connections directly from the database
-    backward_connections = ConnectivityStatement.objects.filter(
-        forward_connection=connectivity_statement
-    )
+    A reason names the forward connection that is invalid and, when that one is only invalid
+    because of its own forward connections, the statement the invalidity comes from;
+    the notes of the statements in between hold the rest of the path.
+    """
+    connectivity_statements_invalid_reasons = {}
+    # statement id -> the initially invalid statement it was reached from
+    origins = {}
+    queue = deque()
+    for statement_id in invalid_statement_ids:
+        if statement_id not in origins:
+            origins[statement_id] = statement_id
+            queue.append((statement_id, statement_id))
 
-    for backward_cs in backward_connections:
-        # Build the reason string
-        current_reason = (f"statement with id {backward_cs.id} is invalid because its "
-                          f"forward connection with id {connectivity_statement.id} is invalid")
-        if previous_reason:
-            current_reason += f" because {previous_reason}"
+    while queue:
+        statement_id, origin_id = queue.popleft()
+        for backward_id in backward_connections.get(statement_id, ()):
+            reason = (f"statement with id {backward_id} is invalid because its "
+                      f"forward connection with id {statement_id} is invalid")
+            if origin_id != statement_id:
+                reason += f" because of the invalid statement with id {origin_id}"
+            connectivity_statements_invalid_reasons.setdefault(backward_id, []).append(reason)
 
-        # Accumulate reasons in connectivity_statements_invalid_reasons, store ConnectivityStatement object with reasons
-        if backward_cs.reference_uri not in connectivity_statements_invalid_reasons:
-            connectivity_statements_invalid_reasons[backward_cs.reference_uri] = (backward_cs, [])
-        connectivity_statements_invalid_reasons[backward_cs.reference_uri][1].append(current_reason)
+            if backward_id not in origins:
+                origins[backward_id] = origin_id
+                queue.append((backward_id, origin_id))
 
-        # Recursively propagate invalid state
-        propagate_invalid_state(backward_cs, invalid_visited, connectivity_statements_invalid_reasons, current_reason)
+    return connectivity_statements_invalid_reasons
@@ -16,10 +16,50 @@ logger_service = LoggerService(
 )
 
 
+class KnownUris:
+    """
+    The uris referred to by the statements of a run that exist in the database,
+    loaded with one query per table so that the validation itself runs in memory.
+    """
+
+    def __init__(self, statements: List[Dict[str, Any]], update_anatomical_entities: bool):
+        entity_uris, region_layer_uris, species_uris, sex_uris, forward_connection_uris = set(), set(), set(), set(), set()
+        for statement in statements:
+            for entity in get_validated_entities(statement):
+                if isinstance(entity, orders.rl):
+                    region_layer_uris.update((str(entity.region), str(entity.layer)))
+                else:
+                    entity_uris.add(str(entity))
+            species_uris.update(statement[SPECIES])
+            sex_uris.update(statement[SEX][:1])
+            forward_connection_uris.update(statement[FORWARD_CONNECTION])
+
+        if update_anatomical_entities:
+            # the missing regions and layers are created from their AnatomicalEntityMeta
+            entity_uris |= region_layer_uris
+            self.region_uris = self.layer_uris = None
+        else:
+            self.region_uris = _existing_uris(Region, region_layer_uris, "ae_meta__ontology_uri")
+            self.layer_uris = _existing_uris(Layer, region_layer_uris, "ae_meta__ontology_uri")
+        self.entity_uris = _existing_uris(AnatomicalEntityMeta, entity_uris)
+        self.species_uris = _existing_uris(Specie, species_uris)
+        self.sex_uris = _existing_uris(Sex, sex_uris)
+        self.reference_uris = _existing_uris(ConnectivityStatement, forward_connection_uris, "reference_uri")
+
+    def has_region(self, uri) -> bool:
+        return str(uri) in (self.region_uris if self.region_uris is not None else self.entity_uris)
+
+    def has_layer(self, uri) -> bool:
+        return str(uri) in (self.layer_uris if self.layer_uris is not None else self.entity_uris)
+
+
+def _existing_uris(model: Type[DjangoModel], uris: Set[str], field: str = "ontology_uri") -> Set[str]:
+    return set(model.objects.filter(**{f"{field}__in": uris}).values_list(field, flat=True))
+
+
 def validate_statements(statements: List[Dict[str, Any]], update_anatomical_entities: bool) -> List[Dict[str, Any]]:
-    db_reference_uris = set(ConnectivityStatement.objects.values_list('reference_uri', flat=True))
-    input_statement_ids = {statement[ID] for statement in statements}
-    statement_ids = input_statement_ids.union(db_reference_uris)
+    known_uris = KnownUris(statements, update_anatomical_entities)
+    statement_ids = {statement[ID] for statement in statements}.union(known_uris.reference_uris)
 
     for statement in statements:
         # Initialize validation_errors if not already present
@@ -27,59 +67,61 @@ def validate_statements(statements: List[Dict[str, Any]], update_anatomical_enti
             statement[VALIDATION_ERRORS] = ValidationErrors()
 
         # Validate entities, sex, and species, updating validation_errors accordingly
-        annotate_invalid_entities(statement, update_anatomical_entities)
-        annotate_invalid_sex(statement)
-        annotate_invalid_species(statement)
+        annotate_invalid_entities(statement, known_uris)
+        annotate_invalid_sex(statement, known_uris)
+        annotate_invalid_species(statement, known_uris)
 
         # Validate forward connection
         annotate_invalid_forward_connections(statement, statement_ids)
 
+    report_unknown_uris(statements)
     return statements
 
 
-def annotate_invalid_entities(statement: Dict, update_anatomical_entities: bool) -> bool:
-    has_invalid_entities = False
+def get_validated_entities(statement: Dict) -> List:
+    entities = list(statement[ORIGINS].anatomical_entities)
+    entities.extend(entity for dest in statement[DESTINATIONS] for entity in dest.anatomical_entities)
+    entities.extend(entity for via in statement[VIAS] for entity in via.anatomical_entities)
+    return entities
 
-    entities_to_check = list(statement[ORIGINS].anatomical_entities)
-    entities_to_check.extend(entity for dest in statement[DESTINATIONS] for entity in dest.anatomical_entities)
-    entities_to_check.extend(entity for via in statement[VIAS] for entity in via.anatomical_entities)
 
-    for entity in entities_to_check:
+def annotate_invalid_entities(statement: Dict, known_uris: KnownUris) -> bool:
+    has_invalid_entities = False
+
+    for entity in get_validated_entities(statement):
         if isinstance(entity, orders.rl):
-            region_found = found_entity(entity.region, Region if not update_anatomical_entities else None)
-            layer_found = found_entity(entity.layer, Layer if not update_anatomical_entities else None)
-            if not region_found:
+            if not known_uris.has_region(entity.region):
                 statement[VALIDATION_ERRORS].entities.add(entity.region)
                 has_invalid_entities = True
-            if not layer_found:
+            if not known_uris.has_layer(entity.layer):
                 statement[VALIDATION_ERRORS].entities.add(entity.layer)
                 has_invalid_entities = True
         else:
             uri = str(entity)
-            if not found_entity(uri):
+            if uri not in known_uris.entity_uris:
                 statement[VALIDATION_ERRORS].entities.add(uri)
                 has_invalid_entities = True
 
     return has_invalid_entities
 
 
-def annotate_invalid_sex(statement: Dict) -> bool:
+def annotate_invalid_sex(statement: Dict, known_uris: KnownUris) -> bool:
     if statement[SEX]:
         if len(statement[SEX]) > 1:
             logger_service.add_anomaly(
                 LoggableAnomaly(statement[ID], None, f'Multiple sexes found in statement.'))
 
             first_sex_uri = statement[SEX][0]
-            if not Sex.objects.filter(ontology_uri=first_sex_uri).exists():
+            if first_sex_uri not in known_uris.sex_uris:
                 statement[VALIDATION_ERRORS].sex.add(first_sex_uri)
             return True
     return False
 
 
-def annotate_invalid_species(statement: Dict) -> bool:
+def annotate_invalid_species(statement: Dict, known_uris: KnownUris) -> bool:
     has_invalid_species = False
     for species_uri in statement[SPECIES]:
-        if not Specie.objects.filter(ontology_uri=species_uri).exists():
+        if species_uri not in known_uris.species_uris:
             statement[VALIDATION_ERRORS].species.add(species_uri)
             has_invalid_species = True
     return has_invalid_species
@@ -94,7 +136,22 @@ def annotate_invalid_forward_connections(statement: Dict, statement_ids: Set[str
     return has_invalid_forward_connection
 
 
-def found_entity(uri: str, Model: Type[DjangoModel] = None) -> bool:
-    if Model:
-        return Model.objects.filter(ae_meta__ontology_uri=uri).exists()
-    return AnatomicalEntityMeta.objects.filter(ontology_uri=uri).exists()
+def report_unknown_uris(statements: List[Dict[str, Any]]):
+    """
+    Logs one anomaly per unknown uri of the run, with the number of statements referring to it.
+    """
+    unknown_uris = {}
+    for statement in statements:
+        validation_errors = statement[VALIDATION_ERRORS]
+        for kind, uris in (
+            ("Anatomical entity", validation_errors.entities),
+            ("Sex", validation_errors.sex),
+            ("Species", validation_errors.species),
+            ("Forward connection", validation_errors.forward_connection),
+        ):
+            for uri in uris:
+                unknown_uris.setdefault((kind, str(uri)), set()).add(statement[ID])
+
+    for (kind, uri), statement_ids in sorted(unknown_uris.items()):
+        logger_service.add_anomaly(
+            LoggableAnomaly(None, uri, f'{kind} not found, referred to by {len(statement_ids)} statement(s).'))
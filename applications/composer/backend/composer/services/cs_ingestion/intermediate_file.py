@@ -0,0 +1,51 @@
+"""
+Intermediate file of the statements, written by the neurondm step and read by the ingest_to_database step.
+
+The statements are stored as gzip compressed NDJSON, one statement per line, so neither step holds the
+serialized document in memory. The reader also accepts the legacy format, a single JSON array.
+This module does not depend on Django, it runs in the neurondm task image.
+"""
+import gzip
+import json
+from typing import Dict, Iterable, Iterator
+
+from composer.services.cs_ingestion.models import convert_statement_from_json, convert_statement_to_json_serializable
+
+NDJSON_GZ_SUFFIX = '.ndjson.gz'
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def write_statements_file(path: str, statements: Iterable[Dict]) -> int:
+    """
+    Writes the statements one line at a time, returns the number of statements written.
+    """
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for statement in statements:
+            f.write(json.dumps(convert_statement_to_json_serializable(statement), separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_statements_file(path: str) -> Iterator[Dict]:
+    """
+    Yields the statements of an intermediate file, converted back to object format.
+    The format is detected from the content: gzip NDJSON is streamed, a legacy JSON array is loaded whole.
+    """
+    with open(path, 'rb') as f:
+        is_gzip = f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+    if is_gzip:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield convert_statement_from_json(json.loads(line))
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = json.load(f)
+    # the serialized statements are released as they are converted
+    statements.reverse()
+    while statements:
+        yield convert_statement_from_json(statements.pop())
@@ -1,15 +1,25 @@
 import csv
-from typing import List, Dict
+import json
+import logging
+import os
+from collections import Counter
+from typing import Dict, Iterator, List
 
-from composer.pure_enums import CSState, SentenceState
+from composer.pure_enums import AnomalyType, CSState, SentenceState
 from composer.services.cs_ingestion.helpers.common_helpers import ID, LABEL, STATE, VALIDATION_ERRORS
-from composer.services.cs_ingestion.models import LoggableAnomaly
+from composer.services.cs_ingestion.models import LoggableAnomaly, Severity
 
 AXIOM_NOT_FOUND = "Entity not found in any axiom"
 SENTENCE_INCORRECT_STATE = f"Sentence already found and is not in {SentenceState.COMPOSE_NOW.value} state"
 STATEMENT_INCORRECT_STATE = f"Statement already found and is not in {CSState.EXPORTED.value} or {CSState.INVALID.value} state"
 
 INCONSISTENT_AXIOMS = "Region and layer found in different axioms"
+CUSTOM_RELATIONSHIP_PREFIX = "[CUSTOM_RELATIONSHIP]"
+UNKNOWN_URI_MARKER = " not found, referred to by "
+
+# The anomalies log is rotated once it reaches this size
+ANOMALIES_LOG_MAX_BYTES = 50 * 1024 * 1024
+ANOMALIES_LOG_BACKUP_COUNT = 10
 
 
 class SingletonMeta(type):
@@ -25,59 +35,187 @@ class SingletonMeta(type):
         return cls._instances[cls]
 
 
+def get_anomaly_type(anomaly: LoggableAnomaly) -> AnomalyType:
+    if anomaly.type is not None:
+        return anomaly.type
+    if anomaly.message.startswith(CUSTOM_RELATIONSHIP_PREFIX):
+        return AnomalyType.CUSTOM_RELATIONSHIP
+    if anomaly.message == AXIOM_NOT_FOUND:
+        return AnomalyType.AXIOM_NOT_FOUND
+    if UNKNOWN_URI_MARKER in anomaly.message:
+        return AnomalyType.UNKNOWN_URI
+    if anomaly.message in (SENTENCE_INCORRECT_STATE, STATEMENT_INCORRECT_STATE):
+        return AnomalyType.INCORRECT_STATE
+    if anomaly.severity == Severity.ERROR:
+        return AnomalyType.ERROR
+    return AnomalyType.OTHER
+
+
+def get_log_file_paths(path: str, backup_count: int = ANOMALIES_LOG_BACKUP_COUNT) -> List[str]:
+    """
+    Returns the existing files of a rotated log, oldest first.
+    """
+    paths = [f"{path}.{index}" for index in range(backup_count, 0, -1)] + [path]
+    return [log_path for log_path in paths if os.path.exists(log_path)]
+
+
+def read_anomalies_file(path: str) -> Iterator[LoggableAnomaly]:
+    """
+    Yields the anomalies of a CSV anomalies log, or of a JSON list of anomalies (.json).
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            anomalies_data = json.load(f)
+        for anomaly_dict in anomalies_data:
+            yield LoggableAnomaly(
+                statement_id=anomaly_dict.get('statement_id'),
+                entity_id=anomaly_dict.get('entity_id'),
+                message=anomaly_dict.get('message', ''),
+                severity=parse_severity(anomaly_dict.get('severity')),
+            )
+        return
+
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 4:
+                continue
+            severity, statement_id, entity_id, message = row[:4]
+            yield LoggableAnomaly(statement_id or None, entity_id or None, message, parse_severity(severity))
+
+
+def iter_anomalies_log(path: str, backup_count: int = ANOMALIES_LOG_BACKUP_COUNT) -> Iterator[LoggableAnomaly]:
+    for log_path in get_log_file_paths(path, backup_count):
+        yield from read_anomalies_file(log_path)
+
+
+def format_severity_counts(severity_counts: Counter) -> str:
+    return ", ".join(f"{count} {severity.value}" for severity, count in severity_counts.items()) or "none"
+
+
+def parse_severity(value) -> Severity:
+    try:
+        return Severity(value)
+    except ValueError:
+        return Severity.WARNING
+
+
+class RotatingCsvFile:
+    """
+    CSV file written one flushed row at a time, rotated like logging.handlers.RotatingFileHandler:
+    once the file reaches max_bytes it is renamed to path.1, path.1 to path.2 and so on,
+    up to backup_count files. Without max_bytes or backup_count the file is not rotated.
+
+    The first open of a log truncates it (and removes its rotated files), unless append is set.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.append = False
+        self.file = None
+        self.writer = None
+
+    def writerow(self, row: List):
+        if self.file is None:
+            self.open()
+        elif self.max_bytes and self.backup_count and self.file.tell() >= self.max_bytes:
+            self.rotate()
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def open(self):
+        if not self.append:
+            for log_path in get_log_file_paths(self.path, self.backup_count):
+                os.remove(log_path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        # reopening after a close continues the same log
+        self.append = True
+
+    def rotate(self):
+        self.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.open()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+
 class LoggerService(metaclass=SingletonMeta):
-    def __init__(self, ingestion_anomalies_log_path: str, ingested_log_path: str):
+    def __init__(self, ingestion_anomalies_log_path: str, ingested_log_path: str,
+                 max_bytes: int = ANOMALIES_LOG_MAX_BYTES, backup_count: int = ANOMALIES_LOG_BACKUP_COUNT):
         """
         Initialize LoggerService with explicit log file paths.
+
+        The anomalies are written to the anomalies log as they are added, only their number
+        per severity is kept in memory.
         
         Args:
             ingestion_anomalies_log_path: Full path to the anomalies log CSV file
             ingested_log_path: Full path to the ingested statements log CSV file
+            max_bytes: Size at which the anomalies log is rotated
+            backup_count: Number of rotated anomalies log files kept
         """
         self.anomalies_log_path = ingestion_anomalies_log_path
         self.ingested_log_path = ingested_log_path
-        self.anomalies = []
+        self.backup_count = backup_count
+        self.anomalies_log = RotatingCsvFile(ingestion_anomalies_log_path, max_bytes, backup_count)
+        self.severity_counts = Counter()
+        self.db_sink = None
+
+    @property
+    def total_anomalies(self) -> int:
+        return sum(self.severity_counts.values())
 
     def add_anomaly(self, error: LoggableAnomaly):
-        self.anomalies.append(error)
-    
-    def load_anomalies_from_json(self, json_path: str):
+        self.anomalies_log.writerow([error.severity.value, error.statement_id, error.entity_id, error.message])
+        self.severity_counts[error.severity] += 1
+
+    def set_db_sink(self, db_sink):
         """
-        Load anomalies from a JSON file (from previous workflow steps).
-        Expected format: [{"statement_id": ..., "entity_id": ..., "message": ..., "severity": ...}, ...]
+        db_sink.write(anomalies) is called with an iterator over the anomalies log when it is closed.
         """
-        import json
-        import os
-        from composer.services.cs_ingestion.models import Severity
-        
-        if not os.path.exists(json_path):
+        self.db_sink = db_sink
+
+    def load_anomalies_from_file(self, path: str):
+        """
+        Adds the anomalies of a previous workflow step, from a CSV anomalies log or a JSON list.
+        When it is the anomalies log of this service, the log is continued instead.
+        """
+        if not os.path.exists(path):
             return  # No previous anomalies to load
-        
+
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                anomalies_data = json.load(f)
-            
-            for anomaly_dict in anomalies_data:
-                severity_str = anomaly_dict.get('severity', 'warning')
-                severity = Severity.ERROR if severity_str == 'error' else Severity.WARNING
-                
-                anomaly = LoggableAnomaly(
-                    statement_id=anomaly_dict.get('statement_id'),
-                    entity_id=anomaly_dict.get('entity_id'),
-                    message=anomaly_dict.get('message', ''),
-                    severity=severity,
-                )
-                self.anomalies.append(anomaly)
+            if os.path.abspath(path) == os.path.abspath(self.anomalies_log_path):
+                if not self.anomalies_log.append:
+                    self.anomalies_log.append = True
+                    for anomaly in iter_anomalies_log(path, self.backup_count):
+                        self.severity_counts[anomaly.severity] += 1
+                return
+
+            for anomaly in read_anomalies_file(path):
+                self.add_anomaly(anomaly)
         except Exception as e:
             # Log error but don't fail - just skip loading previous anomalies
-            import logging
-            logging.warning(f"Could not load anomalies from {json_path}: {e}")
+            logging.warning(f"Could not load anomalies from {path}: {e}")
 
-    def write_anomalies_to_file(self):
-        with open(self.anomalies_log_path, 'w', newline='') as file:
-            writer = csv.writer(file)
-            for anomaly in self.anomalies:
-                writer.writerow([anomaly.severity.value, anomaly.statement_id, anomaly.entity_id, anomaly.message])
+    def close(self):
+        """
+        Closes the anomalies log and, when a database sink is set, loads the log into it.
+        """
+        self.anomalies_log.close()
+        if self.db_sink is not None:
+            self.db_sink.write(iter_anomalies_log(self.anomalies_log_path, self.backup_count))
 
     def write_ingested_statements_to_file(self, statements: List[Dict]):
         with open(self.ingested_log_path, 'w', newline='') as file:
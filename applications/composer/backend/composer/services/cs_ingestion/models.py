@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import Set, Optional, Dict, List, Any
 
+from composer.pure_enums import AnomalyType
 from composer.services.cs_ingestion.helpers.common_helpers import (
     ANATOMICAL_ENTITIES,
     FROM_ENTITIES,
@@ -135,15 +136,18 @@ class NeuronDMDestination:
 class Severity(Enum):
     ERROR = 'error'
     WARNING = 'warning'
+    INFO = 'info'
 
 
 class LoggableAnomaly:
     def __init__(self, statement_id: Optional[str], entity_id: Optional[str], message: str,
-                 severity: Severity = Severity.WARNING):
+                 severity: Severity = Severity.WARNING, type: Optional[AnomalyType] = None):
         self.statement_id = statement_id
         self.entity_id = entity_id
         self.message = message
         self.severity = severity
+        # inferred from the message by the logging service when not given
+        self.type = type
 
 
 class AxiomType(Enum):
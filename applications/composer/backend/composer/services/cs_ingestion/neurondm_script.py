@@ -1,4 +1,7 @@
+import math
+import multiprocessing
 import os
+import time
 import traceback
 from typing import Optional, Tuple, List, Set, Dict
 
@@ -6,14 +9,23 @@ import rdflib
 from neurondm import orders
 from neurondm.core import Config, graphBase
 from neurondm.core import OntTerm, OntId, RDFL
-from pyontutils.core import OntGraph, OntResIri, OntResPath
+from pyontutils.core import OntGraph
 from pyontutils.namespaces import rdfs, ilxtr
 import logging
 import re
 
+from composer.services.cs_ingestion.custom_relationship_code import (
+    CUSTOM_CODE_TIME_BUDGET,
+    CompiledRelationship,
+    CustomCodeStats,
+    CustomCodeTimeout,
+    compile_custom_relationships,
+    run_custom_code,
+)
 from composer.services.cs_ingestion.exceptions import NeuronDMInconsistency
 from composer.services.cs_ingestion.helpers.common_helpers import VALIDATION_ERRORS, DESTINATIONS, VIAS, ORIGINS
 from composer.services.cs_ingestion.logging_service import LoggerService, AXIOM_NOT_FOUND
+from composer.services.cs_ingestion.ontology_cache import OntologySource, load_ontology_triples
 from composer.services.cs_ingestion.models import NeuronDMVia, NeuronDMOrigin, NeuronDMDestination, LoggableAnomaly, \
     AxiomType, ValidationErrors, Severity
 
@@ -23,6 +35,10 @@ logger = logging.getLogger(__name__)
 RED_COLOR = "\033[91m"
 RESET_COLOR = "\033[0m"
 SPARC_NLP_OWL_CLASS_PREFIX = "http://uri.interlex.org/tgbugs/uris/readable/NeuronSparcNlp"
+# Each conversion worker gets about this many contiguous chunks of neurons
+CHUNKS_PER_WORKER = 4
+# Neurons and options of the conversion, set before forking the workers that read them
+_conversion_state = {}
 
 def log_error(message):
     logger.error(f"{RED_COLOR}{message}{RESET_COLOR}")
@@ -458,88 +474,184 @@ def update_from_entities(origins: NeuronDMOrigin, vias: List[NeuronDMVia], desti
     return origins, vias, destinations
 
 
-def process_custom_relationships_for_statement(statement: Dict, custom_relationships: List[Dict], logger_service: LoggerService):
+def process_custom_relationships_for_statement(statement: Dict, custom_relationships: List[CompiledRelationship],
+                                               logger_service: LoggerService,
+                                               stats: Optional[Dict[int, CustomCodeStats]] = None):
     """
     Execute custom code for relationships on a statement (Step 1 of ingestion).
     This runs during NeuroDM processing, before database interaction.
     
     Args:
         statement: The statement dict with neuron data including '_neuron' object
-        custom_relationships: List of dicts with relationship info (id, title, type, custom_ingestion_code)
+        custom_relationships: Relationships compiled by compile_custom_relationships
         logger_service: Service for logging anomalies
+        stats: Execution stats to update, keyed by relationship id (optional)
     
     Returns:
         Dict mapping relationship_id to execution result
     """
     results = {}
+    if stats is None:
+        stats = {}
     
-    for relationship_info in custom_relationships:
+    for relationship in custom_relationships:
+        relationship_stats = stats.setdefault(relationship.id, CustomCodeStats())
+        start = time.perf_counter()
         try:
-            # Prepare execution context - only provide fc dict
-            exec_globals = {
-                'fc': statement,
-            }
-            exec_locals = {}
-            
-            # Execute the custom code
-            exec(relationship_info['custom_ingestion_code'], exec_globals, exec_locals)
+            # the code only gets the fc dict, it runs with a time budget
+            namespace = run_custom_code(relationship, statement)
             
             # Get the result variable
-            if 'result' not in exec_locals:
+            if 'result' not in namespace:
+                relationship_stats.errors += 1
                 logger_service.add_anomaly(
                     LoggableAnomaly(
                         statement_id=statement.get('id'),
-                        entity_id=str(relationship_info['id']),
-                        message=f"[CUSTOM_RELATIONSHIP] Custom code for relationship '{relationship_info['title']}' did not define 'result' variable",
+                        entity_id=str(relationship.id),
+                        message=f"[CUSTOM_RELATIONSHIP] Custom code for relationship '{relationship.title}' did not define 'result' variable",
                         severity=Severity.WARNING
                     )
                 )
                 continue
             
-            results[relationship_info['id']] = exec_locals['result']
+            results[relationship.id] = namespace['result']
             
+        except CustomCodeTimeout:
+            relationship_stats.errors += 1
+            relationship_stats.timeouts += 1
+            logger_service.add_anomaly(
+                LoggableAnomaly(
+                    statement_id=statement.get('id'),
+                    entity_id=str(relationship.id),
+                    message=f"[CUSTOM_RELATIONSHIP] Custom code for relationship '{relationship.title}' exceeded its time budget of {CUSTOM_CODE_TIME_BUDGET}s",
+                    severity=Severity.WARNING
+                )
+            )
         except Exception as e:
+            relationship_stats.errors += 1
             logger_service.add_anomaly(
                 LoggableAnomaly(
                     statement_id=statement.get('id'),
-                    entity_id=str(relationship_info['id']),
-                    message=f"[CUSTOM_RELATIONSHIP] Error executing custom code for relationship '{relationship_info['title']}': {str(e)} | Details: {{'relationship_title': '{relationship_info['title']}', 'error': '{str(e)}', 'traceback': '{traceback.format_exc()}', 'code': '{relationship_info['custom_ingestion_code']}'}}",
+                    entity_id=str(relationship.id),
+                    message=f"[CUSTOM_RELATIONSHIP] Error executing custom code for relationship '{relationship.title}': {str(e)} | Details: {{'relationship_title': '{relationship.title}', 'error': '{str(e)}', 'traceback': '{traceback.format_exc()}', 'code': '{relationship.source}'}}",
                     severity=Severity.WARNING
                 )
             )
+        finally:
+            relationship_stats.calls += 1
+            relationship_stats.seconds += time.perf_counter() - start
     
     return results
 
 
-## Based on:
-## https://github.com/tgbugs/pyontutils/blob/30c415207b11644808f70c8caecc0c75bd6acb0a/neurondm/docs/composer.py#L668-L698
-def main(local=False, full_imports=[], label_imports=[], logger_service_param=Optional[LoggerService], statement_alert_uris: Set[str] = None, population_uris: Set[str] = None, custom_relationships: List[Dict] = None):
+def log_custom_relationships_stats(custom_relationships: List[CompiledRelationship],
+                                   stats: Dict[int, CustomCodeStats]):
+    for relationship in custom_relationships:
+        relationship_stats = stats.get(relationship.id, CustomCodeStats())
+        message = (f"[CUSTOM_RELATIONSHIP] Custom code for relationship '{relationship.title}' ran on "
+                   f"{relationship_stats.calls} statement(s) in {relationship_stats.seconds:.3f}s, "
+                   f"{relationship_stats.errors} error(s), {relationship_stats.timeouts} timeout(s)")
+        logger.info(message)
+        if logger_service:
+            logger_service.add_anomaly(LoggableAnomaly(None, str(relationship.id), message, severity=Severity.INFO))
+
+
+class AnomalyCollector:
+    """
+    Stands in for the logger service in the conversion workers,
+    the anomalies are sent back to the main process with the statements.
+    """
+
+    def __init__(self):
+        self.anomalies = []
+
+    def add_anomaly(self, error: LoggableAnomaly):
+        self.anomalies.append(error)
+
+
+def convert_neurons_chunk(bounds: Tuple[int, int]):
+    """
+    Runs in a forked worker: converts the neurons in [start, end) and evaluates the custom relationships.
+    Returns the statements, the anomalies of both steps and the custom relationships stats.
+    """
     global logger_service
-    logger_service = logger_service_param
+    start, end = bounds
+    neurons = _conversion_state['neurons'][start:end]
+    custom_relationships = _conversion_state['custom_relationships']
 
-    config = Config('random-merge')
-    g = OntGraph()  # load and query graph
+    # the worker owns its copy of the module, the logger service of the main process is not affected
+    logger_service = AnomalyCollector()
+    fcs = [for_composer(n, _conversion_state['statement_alert_uris']) for n in neurons]
+    composer_statements = [item for item in fcs if item is not None]
+    conversion_anomalies = logger_service.anomalies
+
+    logger_service = AnomalyCollector()
+    stats = {}
+    for statement in composer_statements:
+        if custom_relationships:
+            statement['_custom_relationship_results'] = process_custom_relationships_for_statement(
+                statement, custom_relationships, logger_service, stats
+            )
+        # the neuron refers to the graph, it is not sent back
+        statement.pop('_neuron', None)
 
-    # remove scigraph and interlex calls
-    graphBase._sgv = None
-    del graphBase._sgv
-    if len(OntTerm.query._services) > 1:
-        # backup services and avoid issues on rerun
-        _old_query_services = OntTerm.query._services
-        _noloc_query_services = _old_query_services[1:]
+    return composer_statements, conversion_anomalies, logger_service.anomalies, stats
 
-    OntTerm.query._services = (RDFL(g, OntId),)
 
+def convert_neurons_in_parallel(neurons, statement_alert_uris: Set[str],
+                                custom_relationships: List[CompiledRelationship], workers: int,
+                                stats: Optional[Dict[int, CustomCodeStats]] = None) -> List[Dict]:
+    """
+    Converts the neurons in a pool of forked processes, which share the loaded graph copy-on-write.
+    The statements and the anomalies are in the same order as a sequential conversion,
+    whatever the number of workers. The statements do not hold the '_neuron' object.
+    The custom relationships stats of the workers are merged into stats.
+    """
+    chunk_size = max(1, math.ceil(len(neurons) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [(start, min(start + chunk_size, len(neurons))) for start in range(0, len(neurons), chunk_size)]
+
+    composer_statements, custom_anomalies = [], []
+    _conversion_state.update(
+        neurons=neurons,
+        statement_alert_uris=statement_alert_uris,
+        custom_relationships=custom_relationships,
+    )
+    try:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            # imap yields the chunks in order
+            for statements, chunk_conversion_anomalies, chunk_custom_anomalies, chunk_stats in pool.imap(
+                convert_neurons_chunk, chunks
+            ):
+                composer_statements.extend(statements)
+                # the conversion anomalies come first, they are logged as the chunks arrive
+                if logger_service:
+                    for anomaly in chunk_conversion_anomalies:
+                        logger_service.add_anomaly(anomaly)
+                custom_anomalies.extend(chunk_custom_anomalies)
+                if stats is not None:
+                    for relationship_id, relationship_stats in chunk_stats.items():
+                        stats.setdefault(relationship_id, CustomCodeStats()).merge(relationship_stats)
+    finally:
+        _conversion_state.clear()
+
+    if logger_service:
+        for anomaly in custom_anomalies:
+            logger_service.add_anomaly(anomaly)
+    return composer_statements
+
+
+def get_ontology_sources(local=False, full_imports=[], label_imports=[], ontology_dir: Optional[str] = None) -> List[OntologySource]:
     # base paths to ontology files
     gen_neurons_path = 'ttl/generated/neurons/'
     suffix = '.ttl'
-    if local:
+    if ontology_dir:
+        base = str(ontology_dir)
+    elif local:
         from pyontutils.config import auth
-        olr = auth.get_path('ontology-local-repo')
-        local_base = olr / gen_neurons_path
+        base = str(auth.get_path('ontology-local-repo'))
     else:
-        orr = 'https://raw.githubusercontent.com/SciCrunch/NIF-Ontology/neurons/'
-        remote_base = orr + gen_neurons_path
+        base = 'https://raw.githubusercontent.com/SciCrunch/NIF-Ontology/neurons/'
+    base = base.rstrip('/')
 
     # full imports - if not provided manually, use default
     default_full_imports = ['apinat-partial-orders',
@@ -547,40 +659,62 @@ def main(local=False, full_imports=[], label_imports=[], logger_service_param=Op
                             'apinat-simple-sheet',
                             'sparc-nlp']
     full_imports_paths = full_imports if full_imports else default_full_imports
-    failed_full_imports_paths = []
-    for f in full_imports_paths:
-        if local:
-            ori = OntResPath(local_base / (f + suffix))
-        else:
-            ori = OntResIri(remote_base + f + suffix)
-
-        try:
-            [g.add(t) for t in ori.graph]
-        except ValueError:
-            failed_full_imports_paths.append(f)
-            log_error(f"Error in loading {ori}")
-    
-    if failed_full_imports_paths:
-        log_error(f"Failed to load the following full imports: {', '.join(failed_full_imports_paths)}")
 
     # label imports - if not provided manually, use default
     default_label_imports = ['apinatomy-neuron-populations',
                              '../../npo']
     label_imports_paths = label_imports if label_imports else default_label_imports
-    failed_label_imports_paths = []
-    for f in label_imports_paths:
-        p = os.path.normpath(gen_neurons_path + f)
-        if local:
-            ori = OntResPath(olr / (p + suffix))
-        else:
-            ori = OntResIri(orr + p + suffix)
 
-        try:
-            [g.add((s, rdfs.label, o)) for s, o in ori.graph[:rdfs.label:]]
-        except ValueError:
-            failed_label_imports_paths.append(f)
-            log_error(f"Error in loading {ori}")
+    sources = [OntologySource(f, f"{base}/{gen_neurons_path}{f}{suffix}") for f in full_imports_paths]
+    sources.extend(
+        OntologySource(f, f"{base}/{os.path.normpath(gen_neurons_path + f)}{suffix}", labels_only=True)
+        for f in label_imports_paths
+    )
+    return sources
+
 
+## Based on:
+## https://github.com/tgbugs/pyontutils/blob/30c415207b11644808f70c8caecc0c75bd6acb0a/neurondm/docs/composer.py#L668-L698
+def main(local=False, full_imports=[], label_imports=[], logger_service_param=Optional[LoggerService], statement_alert_uris: Set[str] = None, population_uris: Set[str] = None, custom_relationships: List[Dict] = None,
+         ontology_dir: Optional[str] = None, ontology_cache_dir: Optional[str] = None, workers: int = 1):
+    """
+    ontology_dir: local copy of the NIF-Ontology repository (neurons branch) to load the ttl files from,
+                  instead of downloading them.
+    ontology_cache_dir: directory of the parsed ontology cache (ontology_cache), not used when None.
+    workers: number of processes converting the neurons, forked once the graph is loaded.
+             With more than one worker the statements do not hold the '_neuron' object.
+    """
+    global logger_service
+    logger_service = logger_service_param
+
+    # compiled once per run, invalid code fails before the ontology is loaded
+    custom_relationships = compile_custom_relationships(custom_relationships or [])
+
+    config = Config('random-merge')
+    g = OntGraph()  # load and query graph
+
+    # remove scigraph and interlex calls
+    graphBase._sgv = None
+    del graphBase._sgv
+    if len(OntTerm.query._services) > 1:
+        # backup services and avoid issues on rerun
+        _old_query_services = OntTerm.query._services
+        _noloc_query_services = _old_query_services[1:]
+
+    OntTerm.query._services = (RDFL(g, OntId),)
+
+    sources = get_ontology_sources(local, full_imports, label_imports, ontology_dir)
+    triples, failed_sources = load_ontology_triples(sources, ontology_cache_dir)
+    g.addN((s, p, o, g) for s, p, o in triples)
+
+    for source in failed_sources:
+        log_error(f"Error in loading {source.location}")
+
+    failed_full_imports_paths = [source.name for source in failed_sources if not source.labels_only]
+    if failed_full_imports_paths:
+        log_error(f"Failed to load the following full imports: {', '.join(failed_full_imports_paths)}")
+
+    failed_label_imports_paths = [source.name for source in failed_sources if source.labels_only]
     if failed_label_imports_paths:
         log_error(f"Failed to load the following label imports: {', '.join(failed_label_imports_paths)}")
 
@@ -596,17 +730,27 @@ def main(local=False, full_imports=[], label_imports=[], logger_service_param=Op
         # Get neuron IDs and filter
         neurons = [n for n in neurons if str(n.id_) in population_uris]
     
-    fcs = [for_composer(n, statement_alert_uris) for n in neurons]
-    composer_statements = [item for item in fcs if item is not None]
-    
-    # Process custom relationships for each statement (Step 1)
+    custom_relationships_stats = {}
+    if workers > 1 and len(neurons) > 1:
+        # the custom relationships are processed by the workers, they need the neuron objects
+        composer_statements = convert_neurons_in_parallel(
+            neurons, statement_alert_uris, custom_relationships, workers, custom_relationships_stats
+        )
+    else:
+        fcs = [for_composer(n, statement_alert_uris) for n in neurons]
+        composer_statements = [item for item in fcs if item is not None]
+        
+        # Process custom relationships for each statement (Step 1)
+        if custom_relationships:
+            for statement in composer_statements:
+                custom_results = process_custom_relationships_for_statement(
+                    statement, custom_relationships, logger_service, custom_relationships_stats
+                )
+                # Store results in the statement dict for Step 2
+                statement['_custom_relationship_results'] = custom_results
+
     if custom_relationships:
-        for statement in composer_statements:
-            custom_results = process_custom_relationships_for_statement(
-                statement, custom_relationships, logger_service
-            )
-            # Store results in the statement dict for Step 2
-            statement['_custom_relationship_results'] = custom_results
+        log_custom_relationships_stats(custom_relationships, custom_relationships_stats)
 
     return composer_statements
 
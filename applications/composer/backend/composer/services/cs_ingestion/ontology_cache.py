@@ -0,0 +1,110 @@
+"""
+On-disk cache of the ontology triples loaded by the neurondm step.
+
+The triples parsed from the source ttl files are pickled in a file named after a hash of the
+content of those files: a warm run only reads (or downloads) and hashes the sources, the
+turtle parsing only happens again when one of them changed.
+This module does not depend on Django, it runs in the neurondm task image.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import rdflib
+from rdflib.namespace import RDFS
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the content of the cached files changes
+ONTOLOGY_CACHE_VERSION = 1
+
+REQUEST_TIMEOUT = 300
+
+
+class OntologySource(NamedTuple):
+    name: str
+    location: str  # url or path of the ttl file
+    labels_only: bool = False  # only the rdfs:label triples are loaded
+
+
+def read_source(location: str) -> bytes:
+    if re.match(r'^https?://', location):
+        import requests
+
+        response = requests.get(location, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    with open(location, 'rb') as f:
+        return f.read()
+
+
+def parse_source(data: bytes, labels_only: bool) -> List[Tuple]:
+    graph = rdflib.Graph()
+    graph.parse(data=data, format='turtle')
+    if labels_only:
+        return [(s, RDFS.label, o) for s, o in graph[:RDFS.label:]]
+    return list(graph)
+
+
+def load_ontology_triples(
+    sources: List[OntologySource], cache_dir: Optional[str] = None
+) -> Tuple[List[Tuple], List[OntologySource]]:
+    """
+    Returns the triples of the sources, in order, and the sources that could not be loaded.
+    Without cache_dir the sources are parsed on every call.
+    """
+    start = time.perf_counter()
+    contents, failed_sources = [], []
+    digest = hashlib.sha256(str(ONTOLOGY_CACHE_VERSION).encode())
+    for source in sources:
+        try:
+            data = read_source(source.location)
+        except (ValueError, OSError):
+            data = None
+            failed_sources.append(source)
+        contents.append(data)
+        content_hash = hashlib.sha256(data).hexdigest() if data is not None else 'missing'
+        digest.update(f'{source.name}|{source.labels_only}|{content_hash};'.encode())
+
+    cache_path = os.path.join(cache_dir, f'{digest.hexdigest()}.pickle') if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            triples, unparsable_names = pickle.load(f)
+        failed_sources.extend(source for source in sources if source.name in unparsable_names)
+        logger.info(f"Loaded {len(triples)} ontology triples from {cache_path} in {time.perf_counter() - start:.2f}s")
+        return triples, failed_sources
+
+    triples, unparsable_names = [], []
+    for source, data in zip(sources, contents):
+        if data is None:
+            continue
+        try:
+            triples.extend(parse_source(data, source.labels_only))
+        except (ValueError, SyntaxError):
+            unparsable_names.append(source.name)
+            failed_sources.append(source)
+
+    if cache_path:
+        write_cache(cache_path, (triples, unparsable_names))
+    logger.info(f"Parsed {len(triples)} ontology triples in {time.perf_counter() - start:.2f}s")
+    return triples, failed_sources
+
+
+def write_cache(cache_path: str, content):
+    # written next to the target then renamed, concurrent runs never read a partial file
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
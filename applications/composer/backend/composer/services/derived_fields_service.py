@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+
+from django.apps import apps
+
+from composer.services.graph_service import compile_journey
+from composer.services.statement_service import (
+    get_prefix_for_statement_preview,
+    get_suffix_for_statement_preview,
+)
+
+# Derived data of a statement that the signals keep up to date
+GRAPH = "graph"
+JOURNEY = "journey"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+
+_state = threading.local()
+
+
+@contextmanager
+def coalesce_derived_fields():
+    """
+    Within this block the signals only record which derived fields (graph rendering state,
+    journey, statement prefix and suffix) are outdated; each statement is then
+    recomputed once, with a single save, when the block exits.
+    Nested blocks are merged into the outermost one.
+    """
+    if getattr(_state, "pending", None) is not None:
+        yield
+        return
+
+    _state.pending = {}
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+
+    for connectivity_statement, fields in pending.values():
+        recompute_derived_fields(connectivity_statement, fields)
+
+
+def defer_derived_fields(connectivity_statement, *fields) -> bool:
+    """
+    Records outdated derived fields when called inside coalesce_derived_fields.
+    Returns False (nothing deferred) otherwise, so the caller recomputes right away.
+    """
+    pending = getattr(_state, "pending", None)
+    if pending is None:
+        return False
+    _, outdated = pending.setdefault(connectivity_statement.pk, (connectivity_statement, set()))
+    outdated.update(fields)
+    return True
+
+
+def recompute_derived_fields(connectivity_statement, fields):
+    if GRAPH in fields:
+        GraphRenderingState = apps.get_model("composer", "GraphRenderingState")
+        GraphRenderingState.objects.filter(connectivity_statement_id=connectivity_statement.pk).delete()
+
+    update_fields = []
+    if JOURNEY in fields:
+        connectivity_statement.journey_path = compile_journey(connectivity_statement)
+        update_fields.append("journey_path")
+    if PREFIX in fields:
+        connectivity_statement.statement_prefix = get_prefix_for_statement_preview(connectivity_statement)
+        update_fields.append("statement_prefix")
+    if SUFFIX in fields:
+        connectivity_statement.statement_suffix = get_suffix_for_statement_preview(connectivity_statement)
+        update_fields.append("statement_suffix")
+
+    if update_fields:
+        connectivity_statement.save(update_fields=update_fields)
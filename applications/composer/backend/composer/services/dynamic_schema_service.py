@@ -1,5 +1,11 @@
+import gzip
+import hashlib
+
+from django.core.cache import cache
+
 from composer.enums import RelationshipType
 from composer.models import Relationship
+from composer.services.relationship_service import get_relationships_version
 from collections import OrderedDict
 
 def inject_dynamic_relationship_schema(schema):
@@ -43,4 +49,22 @@ def inject_dynamic_relationship_schema(schema):
 
     # === Inject into uiSchema ===
     cs_ui_schema = schema.get("ConnectivityStatement", {}).get("uiSchema", {})
-    cs_ui_schema.setdefault("statement_triples", {})["ui:order"] = ui_order
\ No newline at end of file
+    cs_ui_schema.setdefault("statement_triples", {})["ui:order"] = ui_order
+
+
+def get_cached_jsonschemas(render):
+    """
+    Returns the rendered jsonschemas as a dict with the raw bytes, their gzipped version and an ETag.
+    `render` is only called when nothing is cached for the current relationships version.
+    """
+    cache_key = f"composer:jsonschemas:{get_relationships_version()}"
+    rendered = cache.get(cache_key)
+    if rendered is None:
+        raw = render()
+        rendered = {
+            "raw": raw,
+            "gzip": gzip.compress(raw),
+            "etag": f'"{hashlib.sha1(raw).hexdigest()}"',
+        }
+        cache.set(cache_key, rendered, timeout=None)
+    return rendered
@@ -1,9 +1,96 @@
+from composer.models import ConnectivityStatement, Destination
 from composer.pure_enums import ConnectivityErrors
 from composer.services.state_services import ConnectivityStatementStateService
 
+# Stamp stored next to the cached errors; bump it whenever the checks below change
+# so that the lists stored with an older stamp get recomputed.
+CONNECTIVITY_ERRORS_VERSION = 1
 
-def get_connectivity_errors(connectivity_statement):
+
+def _build_connectivity_errors(has_invalid_forward_connection):
     errors = []
-    if not ConnectivityStatementStateService.is_forward_connection_valid(connectivity_statement):
+    if has_invalid_forward_connection:
         errors.append(ConnectivityErrors.INVALID_FORWARD_CONNECTION.value)
     return errors
+
+
+def has_cached_connectivity_errors(connectivity_statement):
+    return (
+        connectivity_statement.cached_errors is not None
+        and connectivity_statement.errors_version == CONNECTIVITY_ERRORS_VERSION
+    )
+
+
+def get_connectivity_errors(connectivity_statement):
+    if connectivity_statement.pk is None:
+        return _build_connectivity_errors(
+            not ConnectivityStatementStateService.is_forward_connection_valid(connectivity_statement)
+        )
+    if not has_cached_connectivity_errors(connectivity_statement):
+        refresh_connectivity_errors([connectivity_statement])
+    return connectivity_statement.cached_errors
+
+
+def refresh_connectivity_errors(connectivity_statements):
+    """
+    Computes the errors of many statements at once and stores them with the current stamp.
+    Statements whose stored errors are up to date are left untouched.
+    """
+    stale_statements = [
+        statement for statement in connectivity_statements
+        if statement.pk is not None and not has_cached_connectivity_errors(statement)
+    ]
+    if not stale_statements:
+        return
+
+    invalid_ids = ConnectivityStatementStateService.get_invalid_forward_connection_ids(
+        [statement.pk for statement in stale_statements]
+    )
+    for statement in stale_statements:
+        statement.cached_errors = _build_connectivity_errors(statement.pk in invalid_ids)
+        statement.errors_version = CONNECTIVITY_ERRORS_VERSION
+
+    # bulk_update neither sends signals nor touches modified_date
+    ConnectivityStatement.all_objects.bulk_update(stale_statements, ["cached_errors", "errors_version"])
+
+
+def invalidate_connectivity_errors(statement_ids):
+    ConnectivityStatement.all_objects.filter(id__in=statement_ids).update(
+        cached_errors=None, errors_version=None
+    )
+
+
+def invalidate_upstream_connectivity_errors(statement_id):
+    """
+    The errors of a statement depend on the origins of the statements it forward connects to,
+    so changing those has to invalidate the statements pointing at it.
+    """
+    ForwardConnection = ConnectivityStatement.forward_connection.through
+    invalidate_connectivity_errors(
+        ForwardConnection.objects.filter(to_connectivitystatement_id=statement_id).values(
+            "from_connectivitystatement_id"
+        )
+    )
+
+
+def invalidate_entity_connectivity_errors(entity_id):
+    """
+    The errors depend on the entities of the destinations and of the origins of the forward connections,
+    so removing an entity has to invalidate the statements with a destination containing it
+    and the statements pointing at a statement with it as an origin.
+    """
+    DestinationEntity = Destination.anatomical_entities.through
+    Origin = ConnectivityStatement.origins.through
+    ForwardConnection = ConnectivityStatement.forward_connection.through
+    invalidate_connectivity_errors(
+        Destination.objects.filter(
+            id__in=DestinationEntity.objects.filter(anatomicalentity_id=entity_id).values("destination_id")
+        ).values("connectivity_statement_id")
+    )
+    invalidate_connectivity_errors(
+        ForwardConnection.objects.filter(
+            to_connectivitystatement_id__in=Origin.objects.filter(anatomicalentity_id=entity_id).values(
+                "connectivitystatement_id"
+            )
+        ).values("from_connectivitystatement_id")
+    )
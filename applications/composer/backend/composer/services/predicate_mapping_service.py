@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+from django.db.models import Q
+
+from composer.constants import PREDICATE_MAPPING_CACHE_SIZE
+from composer.models import AnatomicalEntity
+from composer.services.cache_version_service import bump_cache_version, get_cache_version
+
+LABELS_VERSION_KEY = "composer:predicate_labels:version"
+
+
+class LabelCache:
+    """
+    Process-level LRU cache of URI -> labels, keyed by (model, uri).
+    The entries belong to a version of the labels, shared by all the app processes (see get_labels_version):
+    the cache is cleared as a whole when it is used with another version.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def use_version(self, version):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def set_many(self, entries):
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+label_cache = LabelCache(PREDICATE_MAPPING_CACHE_SIZE)
+
+
+def get_labels_version():
+    return get_cache_version(LABELS_VERSION_KEY)
+
+
+def clear_label_cache():
+    """
+    Invalidates the labels cached by every app process, for writes to the models the labels are read from.
+    """
+    bump_cache_version(LABELS_VERSION_KEY)
+    label_cache.clear()
+
+
+def _first_by_uri(objects, get_uris):
+    # mimics `.first()` of the single uri lookups: the first matching object wins
+    by_uri = {}
+    for obj in objects:
+        for uri in get_uris(obj):
+            by_uri.setdefault(uri, obj)
+    return by_uri
+
+
+def _anatomical_entity_uris(entity):
+    if entity.simple_entity:
+        return [entity.simple_entity.ontology_uri]
+    if entity.region_layer:
+        return [entity.region_layer.region.ontology_uri, entity.region_layer.layer.ontology_uri]
+    return []
+
+
+def _resolve_labels(model, uris):
+    if issubclass(model, AnatomicalEntity):
+        entities = AnatomicalEntity.objects.filter(
+            Q(simple_entity__ontology_uri__in=uris) |
+            Q(region_layer__region__ontology_uri__in=uris) |
+            Q(region_layer__layer__ontology_uri__in=uris)
+        ).order_by("pk")
+        by_uri = _first_by_uri(entities, _anatomical_entity_uris)
+        return {
+            uri: [by_uri[uri].name] + [synonym.name for synonym in by_uri[uri].synonyms.all()]
+            if uri in by_uri else []
+            for uri in uris
+        }
+
+    queryset = model.objects.filter(ontology_uri__in=uris)
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+    by_uri = _first_by_uri(queryset, lambda obj: [obj.ontology_uri])
+    return {uri: [by_uri[uri].name] if uri in by_uri else [] for uri in uris}
+
+
+def get_labels_for_uris(model, uris, version=None):
+    """
+    Returns a dict uri -> labels (name followed by the synonyms for anatomical entities).
+    Cache misses are resolved with one query for the model (plus the synonyms prefetch).
+    version is the labels version (get_labels_version), read once by the caller for a whole request.
+    """
+    label_cache.use_version(get_labels_version() if version is None else version)
+    keys = [(model, uri) for uri in uris]
+    cached = label_cache.get_many(keys)
+    missing = list({uri for (_, uri) in keys if (model, uri) not in cached})
+
+    if missing:
+        resolved = _resolve_labels(model, missing)
+        label_cache.set_many({(model, uri): labels for uri, labels in resolved.items()})
+        cached.update({(model, uri): labels for uri, labels in resolved.items()})
+
+    return {uri: list(cached[(model, uri)]) for uri in uris}
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+
+from composer.models import Relationship
+from composer.services.cache_version_service import bump_cache_version, get_cache_version
+from version import VERSION
+
+RELATIONSHIPS_VERSION_KEY = "composer:relationships:version"
+
+
+def get_relationships_version():
+    """
+    Returns the current version of the code and of the Relationship/Triple rows.
+    Anything derived from them can be cached under this version.
+    The rows version is stored in the database, so it is shared by all the app processes
+    (the default cache is local to each process).
+    """
+    return f"{VERSION}.{get_cache_version(RELATIONSHIPS_VERSION_KEY)}"
+
+
+def bump_relationships_version():
+    bump_cache_version(RELATIONSHIPS_VERSION_KEY)
+
+
+def get_relationship_catalog():
+    """
+    Returns {relationship_id: [{"id", "name", "uri"}, ...]} with the triples (options)
+    of every relationship, built with two queries and cached under the relationships version.
+    """
+    cache_key = f"composer:relationships:catalog:{get_relationships_version()}"
+    catalog = cache.get(cache_key)
+    if catalog is None:
+        catalog = {
+            relationship.id: [
+                {"id": triple.id, "name": triple.name, "uri": triple.uri}
+                for triple in sorted(relationship.triples.all(), key=lambda triple: triple.id)
+            ]
+            for relationship in Relationship.objects.prefetch_related("triples")
+        }
+        cache.set(cache_key, catalog, timeout=None)
+    return catalog
+
+
+def get_relationship_options(relationship_id, catalog=None):
+    if catalog is None:
+        catalog = get_relationship_catalog()
+    return catalog.get(relationship_id, [])
@@ -1,7 +1,7 @@
 from django.apps import apps
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.db.models import Q, Count
+from django.db.models import Exists, OuterRef
 
 from composer.enums import CSState
 from ..enums import SentenceState
@@ -121,10 +121,11 @@ class SentenceStateService(StateServiceMixin):
         # all statements related to the sentence must have knowledge_statement text and at least one provenance
         return (
             SentenceStateService.can_be_reviewed(sentence)
-        ) and (sentence.connectivitystatement_set.annotate(num_prov=Count('provenance')).filter(
-            Q(knowledge_statement__isnull=True)
-            | Q(knowledge_statement__exact="")
-            | Q(num_prov__lte=0)).count() == 0)
+        ) and all(
+            # iterate over .all() so prefetched statements and provenances are reused
+            cs.knowledge_statement and len(cs.provenance_set.all()) > 0
+            for cs in sentence.connectivitystatement_set.all()
+        )
 
     @staticmethod
     def has_permission_to_transition_to_compose_now(sentence, user) -> bool:
@@ -248,21 +249,34 @@ class ConnectivityStatementStateService(StateServiceMixin):
 
     @staticmethod
     def is_forward_connection_valid(connectivity_statement):
+        return connectivity_statement.pk not in ConnectivityStatementStateService.get_invalid_forward_connection_ids(
+            [connectivity_statement.pk]
+        )
 
-        if not connectivity_statement.forward_connection.exists():
-            return True
-
-        AnatomicalEntity = apps.get_model('composer', 'AnatomicalEntity')
-
-        # Get all anatomical_entities associated with the destinations of the connectivity statement
-        destination_anatomical_entities = AnatomicalEntity.objects.filter(
-            destination_connection_layers__in=connectivity_statement.destinations.all())
+    @staticmethod
+    def get_invalid_forward_connection_ids(statement_ids):
+        """
+        Returns the ids (among statement_ids) of the statements that have forward connections
+        but none of them has an origin in one of the statement's destinations.
+        Runs a single query whatever the number of statements.
+        """
+        ConnectivityStatement = apps.get_model('composer', 'ConnectivityStatement')
+        ForwardConnection = ConnectivityStatement.forward_connection.through
+
+        # deprecated statements are hidden from forward_connection, so they are ignored here as well
+        forward_connections = ForwardConnection.objects.filter(
+            from_connectivitystatement=OuterRef('pk')
+        ).exclude(to_connectivitystatement__state=CSState.DEPRECATED)
+        matching_forward_connections = forward_connections.filter(
+            to_connectivitystatement__origins__destination_connection_layers__connectivity_statement=OuterRef('pk')
+        )
 
-        for forward_connection in connectivity_statement.forward_connection.all():
-            # Check if any anatomical_entity associated with the destination is in the origins of the forward_connection
-            if any(entity in forward_connection.origins.all() for entity in destination_anatomical_entities):
-                return True
-        return False
+        return set(
+            ConnectivityStatement.all_objects.filter(id__in=statement_ids)
+            .filter(Exists(forward_connections))
+            .exclude(Exists(matching_forward_connections))
+            .values_list('id', flat=True)
+        )
 
     @staticmethod
     def has_populationset(connectivity_statement) -> bool:
@@ -301,4 +315,4 @@ def get_available_FIELD_transitions_without_conditions_check(instance, field):
     for name, transition in transitions.items():
         meta = transition._django_fsm
         if meta.has_transition(curr_state):
-            yield meta.get_transition(curr_state)
\ No newline at end of file
+            yield meta.get_transition(curr_state)
@@ -0,0 +1,84 @@
+from django.db import transaction
+
+from composer.models import ConnectivityStatement, Destination, Via
+from composer.services.derived_fields_service import (
+    GRAPH,
+    JOURNEY,
+    SUFFIX,
+    coalesce_derived_fields,
+    defer_derived_fields,
+)
+from composer.services.errors_service import (
+    invalidate_connectivity_errors,
+    invalidate_upstream_connectivity_errors,
+)
+
+
+def replace_statement_topology(connectivity_statement, origins, vias, destinations):
+    """
+    Replaces the origins, vias and destinations of a statement.
+
+    origins is a list of anatomical entity ids. vias (in order) and destinations are dicts
+    with an optional "type" and the "anatomical_entities" and "from_entities" ids.
+
+    The layers and the through table rows are written with bulk inserts, which do not send
+    the per-row signals, so the graph rendering state, journey, statement suffix and
+    errors are refreshed here, once.
+    """
+    with transaction.atomic(), coalesce_derived_fields():
+        Via.objects.filter(connectivity_statement=connectivity_statement).delete()
+        Destination.objects.filter(connectivity_statement=connectivity_statement).delete()
+
+        _replace_relations(ConnectivityStatement.origins.field, [connectivity_statement.pk], {connectivity_statement.pk: origins})
+        _create_layers(
+            Via,
+            connectivity_statement,
+            [dict(layer, order=order) for order, layer in enumerate(vias)],
+        )
+        _create_layers(Destination, connectivity_statement, destinations)
+
+        connectivity_statement.cached_errors = None
+        connectivity_statement.errors_version = None
+        invalidate_connectivity_errors([connectivity_statement.pk])
+        invalidate_upstream_connectivity_errors(connectivity_statement.pk)
+        defer_derived_fields(connectivity_statement, GRAPH, JOURNEY, SUFFIX)
+
+    # related managers read from the prefetch cache when there is one
+    getattr(connectivity_statement, "_prefetched_objects_cache", {}).clear()
+    return connectivity_statement
+
+
+def _create_layers(model, connectivity_statement, layers):
+    instances = []
+    for layer in layers:
+        instance = model(connectivity_statement=connectivity_statement)
+        if layer.get("type"):
+            instance.type = layer["type"]
+        if "order" in layer:
+            instance.order = layer["order"]
+        instances.append(instance)
+    instances = model.objects.bulk_create(instances)
+
+    for field_name in ("anatomical_entities", "from_entities"):
+        _replace_relations(
+            model._meta.get_field(field_name),
+            [],
+            {instance.pk: layer.get(field_name, []) for instance, layer in zip(instances, layers)},
+        )
+
+
+def _replace_relations(m2m_field, clear_ids, related_ids_by_id):
+    """
+    Deletes the through rows of clear_ids and inserts one row per (id, related id).
+    """
+    through = m2m_field.remote_field.through
+    source = f"{m2m_field.m2m_field_name()}_id"
+    target = f"{m2m_field.m2m_reverse_field_name()}_id"
+
+    if clear_ids:
+        through.objects.filter(**{f"{source}__in": clear_ids}).delete()
+    through.objects.bulk_create([
+        through(**{source: object_id, target: related_id})
+        for object_id, related_ids in related_ids_by_id.items()
+        for related_id in dict.fromkeys(related_ids)
+    ])
@@ -0,0 +1,67 @@
+from composer.services.state_services import get_available_FIELD_transitions_without_conditions_check
+
+
+class TransitionEvaluator:
+    """
+    Evaluates the FSM transitions a user can trigger, memoizing the work that repeats
+    across the objects serialized during a single request.
+
+    - Permission callables (has_permission_to_transition_to_*) only look at the current
+      state and at the user's role, so the permitted transitions are computed once per
+      (model, state, user).
+    - Conditions (can_be_reviewed, is_valid, ...) only look at the object's data, so each
+      one runs once per (condition, model, pk, version), where the version is the
+      object's modified_date.
+    """
+
+    REQUEST_ATTRIBUTE = "_transition_evaluator"
+
+    def __init__(self, user):
+        self.user = user
+        self._permitted = {}
+        self._conditions = {}
+
+    @classmethod
+    def for_request(cls, request):
+        """
+        Returns the evaluator attached to the request, creating it on first use.
+        Without a request nothing can be shared, so a throwaway evaluator is returned.
+        """
+        if request is None:
+            return cls(None)
+
+        evaluator = getattr(request, cls.REQUEST_ATTRIBUTE, None)
+        if evaluator is None or evaluator.user != request.user:
+            evaluator = cls(request.user)
+            setattr(request, cls.REQUEST_ATTRIBUTE, evaluator)
+        return evaluator
+
+    def get_available_transitions(self, instance):
+        """
+        Same result as instance.get_available_user_state_transitions(user).
+        """
+        return [
+            transition
+            for transition in self._get_permitted_transitions(instance)
+            if all(self.check_condition(condition, instance) for condition in transition.conditions)
+        ]
+
+    def check_condition(self, condition, instance):
+        if instance.pk is None:
+            return condition(instance)
+
+        key = (condition, instance.__class__, instance.pk, getattr(instance, "modified_date", None))
+        if key not in self._conditions:
+            self._conditions[key] = condition(instance)
+        return self._conditions[key]
+
+    def _get_permitted_transitions(self, instance):
+        state_field = instance._meta.get_field("state")
+        key = (instance.__class__, state_field.get_state(instance), getattr(self.user, "pk", None))
+        if key not in self._permitted:
+            self._permitted[key] = [
+                transition
+                for transition in get_available_FIELD_transitions_without_conditions_check(instance, state_field)
+                if transition.has_perm(instance, self.user)
+            ]
+        return self._permitted[key]
@@ -2,7 +2,11 @@ import json
 import os
 from django.conf import settings
 from django.contrib.auth.models import User
-from composer.constants import INGESTION_ANOMALIES_LOG_PATH, INGESTION_INGESTED_LOG_PATH
+from composer.constants import (
+    INGESTION_ANOMALIES_LOG_PATH,
+    INGESTION_INGESTED_LOG_PATH,
+    INGESTION_ONTOLOGY_CACHE_DIR,
+)
 from composer.services.workflows.ingestion_utils import (
     get_ingestion_timestamp,
     get_ingestion_temp_file_paths,
@@ -62,6 +66,7 @@ def run_ingestion_workflow(
         f"--output_filepath={intermediate_file}",
         f"--anomalies_csv_output={INGESTION_ANOMALIES_LOG_PATH}",
         f"--ingested_csv_output={INGESTION_INGESTED_LOG_PATH}",
+        f"--ontology_cache_dir={INGESTION_ONTOLOGY_CACHE_DIR}",
     ]
     
     if full_imports:
@@ -89,6 +94,7 @@ def run_ingestion_workflow(
         "ingest_to_database",
         f"--input_filepath={intermediate_file}",
         f"--anomalies_csv_input={INGESTION_ANOMALIES_LOG_PATH}",
+        "--anomalies_db",
     ]
     
     if update_upstream:
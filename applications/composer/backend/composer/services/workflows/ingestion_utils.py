@@ -4,6 +4,7 @@ Utility functions for ingestion workflow file management.
 import os
 from datetime import datetime
 from composer.constants import INGESTION_TEMP_DIR
+from composer.services.cs_ingestion.intermediate_file import NDJSON_GZ_SUFFIX
 
 
 def get_ingestion_timestamp() -> str:
@@ -57,6 +58,6 @@ def get_ingestion_temp_file_paths(timestamp: str) -> dict:
     # INGESTION_TEMP_DIR already contains full path
     return {
         'composer_data': os.path.join(INGESTION_TEMP_DIR, f"composer_data_{timestamp}.json"),
-        'intermediate': os.path.join(INGESTION_TEMP_DIR, f"statements_{timestamp}.json"),
+        'intermediate': os.path.join(INGESTION_TEMP_DIR, f"statements_{timestamp}{NDJSON_GZ_SUFFIX}"),
         'anomalies_log': os.path.join(INGESTION_TEMP_DIR, f"anomalies_{timestamp}.json"),
     }
@@ -1,12 +1,27 @@
 import logging
 from django.dispatch import receiver
-from django.db.models.signals import post_save, m2m_changed, post_delete
+from django.db.models.signals import post_save, m2m_changed, post_delete, pre_delete
 from django.contrib.auth import get_user_model
 from django_fsm.signals import post_transition
 
 from composer.services.state_services import ConnectivityStatementStateService
 from composer.services.export.helpers.export_batch import compute_metrics
 from composer.services.layers_service import update_from_entities_on_deletion
+from composer.services.predicate_mapping_service import clear_label_cache
+from composer.services.relationship_service import bump_relationships_version
+from composer.services.derived_fields_service import (
+    GRAPH,
+    JOURNEY,
+    PREFIX,
+    SUFFIX,
+    defer_derived_fields,
+)
+from composer.services.export.helpers.predicate_mapping import PredicateToDBMapping
+from composer.services.errors_service import (
+    invalidate_connectivity_errors,
+    invalidate_entity_connectivity_errors,
+    invalidate_upstream_connectivity_errors,
+)
 from composer.services.statement_service import (
     get_suffix_for_statement_preview,
     get_prefix_for_statement_preview,
@@ -21,8 +36,13 @@ from .models import (
     Note,
     Sentence,
     AnatomicalEntity,
+    AnatomicalEntityIntersection,
+    AnatomicalEntityMeta,
+    Synonym,
     Layer,
     Region,
+    Relationship,
+    Triple,
     Via,
 )
 from .services.graph_service import recompile_journey_path
@@ -75,6 +95,39 @@ def post_transition_cs(sender, instance, name, source, target, **kwargs):
         ):
             # add important tag to CS when transition to COMPOSE_NOW from NPO Approved or Exported
             instance = ConnectivityStatementStateService.add_important_tag(instance)
+        if CSState.DEPRECATED in (source, target):
+            # deprecated statements are not taken into account as forward connections
+            invalidate_upstream_connectivity_errors(instance.pk)
+
+
+def invalidate_statement_errors(connectivity_statement):
+    connectivity_statement.cached_errors = None
+    connectivity_statement.errors_version = None
+    invalidate_connectivity_errors([connectivity_statement.pk])
+
+
+@receiver(m2m_changed, sender=ConnectivityStatement.forward_connection.through)
+def forward_connection_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is the target of the connections, the statements pointing at it are affected
+        if action in ["post_add", "post_remove"] and pk_set:
+            invalidate_connectivity_errors(pk_set)
+        elif action == "pre_clear":
+            invalidate_upstream_connectivity_errors(instance.pk)
+    elif action in ["post_add", "post_remove", "post_clear"]:
+        invalidate_statement_errors(instance)
+
+
+@receiver(pre_delete, sender=ConnectivityStatement)
+def connectivity_statement_pre_delete(sender, instance, **kwargs):
+    # the forward connection rows are removed by the cascade, without m2m_changed
+    invalidate_upstream_connectivity_errors(instance.pk)
+
+
+@receiver(pre_delete, sender=AnatomicalEntity)
+def anatomical_entity_pre_delete(sender, instance, **kwargs):
+    # the origins and destinations rows are removed by the cascade, without m2m_changed
+    invalidate_entity_connectivity_errors(instance.pk)
 
 
 @receiver(post_save, sender=Layer)
@@ -89,6 +142,29 @@ def create_region_anatomical_entity(sender, instance=None, created=False, **kwar
         AnatomicalEntity.objects.get_or_create(simple_entity=instance.ae_meta)
 
 
+# Labels served by the predicate mapping endpoint are cached per process,
+# any write to a model they are read from clears that cache
+def predicate_labels_changed(sender, **kwargs):
+    clear_label_cache()
+
+
+for labels_model in {
+    AnatomicalEntityMeta,
+    AnatomicalEntityIntersection,
+    Synonym,
+    *(mapping.value for mapping in PredicateToDBMapping),
+}:
+    post_save.connect(predicate_labels_changed, sender=labels_model)
+    post_delete.connect(predicate_labels_changed, sender=labels_model)
+
+
+# Jsonschemas (and anything else derived from relationships) are cached under this version
+@receiver([post_save, post_delete], sender=Relationship, dispatch_uid="relationship_changed")
+@receiver([post_save, post_delete], sender=Triple, dispatch_uid="triple_changed")
+def relationships_changed(sender, **kwargs):
+    bump_relationships_version()
+
+
 @receiver(post_delete, sender=AnatomicalEntity)
 def delete_associated_entities(sender, instance, **kwargs):
     # Delete the associated simple_entity if it exists
@@ -100,6 +176,25 @@ def delete_associated_entities(sender, instance, **kwargs):
         instance.region_layer.delete()
 
 
+def reset_graph_and_journey(connectivity_statement, recompile_journey=True):
+    """
+    Drops the saved graph rendering and recompiles the journey after a topology change.
+    Inside coalesce_derived_fields this only happens once per statement, at the end.
+    """
+    fields = (GRAPH, JOURNEY) if recompile_journey else (GRAPH,)
+    if defer_derived_fields(connectivity_statement, *fields):
+        return
+
+    try:
+        connectivity_statement.graph_rendering_state.delete()
+    except GraphRenderingState.DoesNotExist:
+        pass
+    except ValueError:
+        pass
+    if recompile_journey:
+        recompile_journey_path(connectivity_statement)
+
+
 # Signals for ConnectivityStatement origins
 @receiver(m2m_changed, sender=ConnectivityStatement.origins.through)
 def connectivity_statement_origins_changed(sender, instance, action, pk_set, **kwargs):
@@ -110,13 +205,8 @@ def connectivity_statement_origins_changed(sender, instance, action, pk_set, **k
     - Calls `update_from_entities_on_deletion` for each deleted entity on 'post_remove'.
     """
     if action in ["post_add", "post_remove", "post_clear"]:
-        try:
-            instance.graph_rendering_state.delete()
-        except GraphRenderingState.DoesNotExist:
-            pass
-        except ValueError:
-            pass
-        recompile_journey_path(instance)
+        reset_graph_and_journey(instance)
+        invalidate_upstream_connectivity_errors(instance.pk)
 
     # Call `update_from_entities_on_deletion` for each removed entity
     if action == "post_remove" and pk_set:
@@ -128,13 +218,7 @@ def connectivity_statement_origins_changed(sender, instance, action, pk_set, **k
 @receiver(m2m_changed, sender=Via.anatomical_entities.through)
 def via_anatomical_entities_changed(sender, instance, action, pk_set, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        try:
-            instance.connectivity_statement.graph_rendering_state.delete()
-        except GraphRenderingState.DoesNotExist:
-            pass
-        except ValueError:
-            pass
-        recompile_journey_path(instance.connectivity_statement)
+        reset_graph_and_journey(instance.connectivity_statement)
 
     # Call `update_from_entities_on_deletion` for each removed entity
     if action == "post_remove" and pk_set:
@@ -148,63 +232,38 @@ def via_anatomical_entities_changed(sender, instance, action, pk_set, **kwargs):
 @receiver(m2m_changed, sender=Via.from_entities.through)
 def via_from_entities_changed(sender, instance, action, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        try:
-            instance.connectivity_statement.graph_rendering_state.delete()
-        except GraphRenderingState.DoesNotExist:
-            pass
-        except ValueError:
-            pass
-        recompile_journey_path(instance.connectivity_statement)
+        reset_graph_and_journey(instance.connectivity_statement)
 
 
 # Signals for Destination anatomical_entities
 @receiver(m2m_changed, sender=Destination.anatomical_entities.through)
 def destination_anatomical_entities_changed(sender, instance, action, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        try:
-            instance.connectivity_statement.graph_rendering_state.delete()
-        except GraphRenderingState.DoesNotExist:
-            pass
-        except ValueError:
-            pass
-        recompile_journey_path(instance.connectivity_statement)
+        reset_graph_and_journey(instance.connectivity_statement)
+        invalidate_statement_errors(instance.connectivity_statement)
 
 
 # Signals for Destination from_entities
 @receiver(m2m_changed, sender=Destination.from_entities.through)
 def destination_from_entities_changed(sender, instance, action, **kwargs):
     if action in ["post_add", "post_remove", "post_clear"]:
-        try:
-            instance.connectivity_statement.graph_rendering_state.delete()
-        except GraphRenderingState.DoesNotExist:
-            pass
-        except ValueError:
-            pass
-        recompile_journey_path(instance.connectivity_statement)
+        reset_graph_and_journey(instance.connectivity_statement)
 
 
 # Signals for Via model changes
 @receiver(post_save, sender=Via)
 @receiver(post_delete, sender=Via)
 def via_changed(sender, instance, **kwargs):
-    try:
-        instance.connectivity_statement.graph_rendering_state.delete()
-    except GraphRenderingState.DoesNotExist:
-        pass
-    except ValueError:
-        pass
+    reset_graph_and_journey(instance.connectivity_statement, recompile_journey=False)
 
 
 # Signals for Destination model changes
 @receiver(post_save, sender=Destination)
 @receiver(post_delete, sender=Destination)
 def destination_changed(sender, instance, **kwargs):
-    try:
-        instance.connectivity_statement.graph_rendering_state.delete()
-    except GraphRenderingState.DoesNotExist:
-        pass
-    except ValueError:
-        pass
+    reset_graph_and_journey(instance.connectivity_statement, recompile_journey=False)
+    if kwargs.get("signal") is post_delete:
+        invalidate_statement_errors(instance.connectivity_statement)
 
 
 # TAG: If a sentence/CS tag is changed, update the modified_date
@@ -291,6 +350,14 @@ def update_prefix_suffix_for_connectivity_statement_preview(
     if not (update_prefix or update_suffix):
         return
 
+    deferred_fields = []
+    if update_prefix:
+        deferred_fields.append(PREFIX)
+    if update_suffix:
+        deferred_fields.append(SUFFIX)
+    if defer_derived_fields(instance, *deferred_fields):
+        return
+
     update_fields = []
 
     if update_prefix:
@@ -1,6 +1,8 @@
 import pytest
 
-from composer.models import ConnectivityStatement, AnatomicalEntity, Sentence, Destination
+from composer.models import ConnectivityStatement, AnatomicalEntity, AnatomicalEntityMeta, Sentence, Destination
+from composer.pure_enums import ConnectivityErrors
+from composer.services.errors_service import CONNECTIVITY_ERRORS_VERSION, get_connectivity_errors
 from composer.services.state_services import ConnectivityStatementStateService
 
 @pytest.mark.django_db
@@ -40,3 +42,82 @@ def test_forward_connection_service():
         pytest.fail("The forward connection should not be valid!")
     else:
         assert True, "The forward connection was signaled as invalid as expected."
+
+
+def _create_entity(name):
+    meta = AnatomicalEntityMeta.objects.create(name=name, ontology_uri=f"http://example.org/{name}")
+    return AnatomicalEntity.objects.create(simple_entity=meta)
+
+
+def _create_statement(sentence, origins=(), destinations=()):
+    statement = ConnectivityStatement.objects.create(sentence=sentence)
+    statement.origins.add(*origins)
+    destination = Destination.objects.create(connectivity_statement=statement)
+    destination.anatomical_entities.add(*destinations)
+    return statement
+
+
+@pytest.mark.django_db
+def test_invalid_forward_connection_ids_in_batch():
+    sentence = Sentence.objects.create()
+    shared = _create_entity("Shared")
+    other = _create_entity("Other")
+
+    target = _create_statement(sentence, origins=[shared])
+    valid = _create_statement(sentence, destinations=[shared])
+    invalid = _create_statement(sentence, destinations=[other])
+    unconnected = _create_statement(sentence, destinations=[other])
+    valid.forward_connection.add(target)
+    invalid.forward_connection.add(target)
+
+    statement_ids = [target.id, valid.id, invalid.id, unconnected.id]
+    assert ConnectivityStatementStateService.get_invalid_forward_connection_ids(statement_ids) == {invalid.id}
+
+
+@pytest.mark.django_db
+def test_connectivity_errors_are_stored_and_invalidated():
+    sentence = Sentence.objects.create()
+    shared = _create_entity("Shared")
+    other = _create_entity("Other")
+
+    target = _create_statement(sentence, origins=[other])
+    statement = _create_statement(sentence, destinations=[shared])
+    statement.forward_connection.add(target)
+
+    assert get_connectivity_errors(statement) == [ConnectivityErrors.INVALID_FORWARD_CONNECTION.value]
+    statement.refresh_from_db()
+    assert statement.errors_version == CONNECTIVITY_ERRORS_VERSION
+    assert get_connectivity_errors(statement) == [ConnectivityErrors.INVALID_FORWARD_CONNECTION.value]
+
+    # changing the origins of the forward connection invalidates the stored errors upstream
+    target.origins.add(shared)
+    statement.refresh_from_db()
+    assert statement.cached_errors is None
+    assert get_connectivity_errors(statement) == []
+
+
+@pytest.mark.django_db
+def test_connectivity_errors_are_invalidated_on_entity_deletion():
+    sentence = Sentence.objects.create()
+    origin = _create_entity("Origin")
+    destination = _create_entity("Destination")
+    other = _create_entity("Other")
+
+    target = _create_statement(sentence, origins=[origin, destination])
+    statement = _create_statement(sentence, destinations=[destination, origin])
+    statement.forward_connection.add(target)
+    assert get_connectivity_errors(statement) == []
+
+    # the cascade removes the origins row of the forward connection target, without m2m_changed
+    origin.delete()
+    statement.refresh_from_db()
+    assert statement.cached_errors is None
+    assert get_connectivity_errors(statement) == []
+
+    # the cascade removes the destination row of the statement
+    target.origins.add(other)
+    get_connectivity_errors(statement)
+    destination.delete()
+    statement.refresh_from_db()
+    assert statement.cached_errors is None
+    assert get_connectivity_errors(statement) == [ConnectivityErrors.INVALID_FORWARD_CONNECTION.value]
@@ -0,0 +1,178 @@
+import csv
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from composer.pure_enums import AnomalyType
+from composer.services.cs_ingestion.logging_service import (
+    AXIOM_NOT_FOUND,
+    LoggerService,
+    get_anomaly_type,
+    get_log_file_paths,
+    iter_anomalies_log,
+)
+from composer.services.cs_ingestion.models import LoggableAnomaly, Severity
+
+
+def make_logger_service(path, **kwargs):
+    # bypasses the singleton, each test gets its own log
+    logger_service = LoggerService.__new__(LoggerService)
+    logger_service.__init__(path, os.path.join(os.path.dirname(path), "ingested.csv"), **kwargs)
+    return logger_service
+
+
+class TemporaryAnomaliesLogMixin:
+    """
+    Points the shared LoggerService (used by the ingestion helpers) at a temporary directory,
+    so running the tests never replaces the real ingestion logs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.anomalies_log_path = os.path.join(tmp_dir.name, "ingestion_anomalies_log.csv")
+        # the shared instance, whatever the paths it was created with
+        logger_service = LoggerService(self.anomalies_log_path, os.path.join(tmp_dir.name, "ingested.csv"))
+        patcher = mock.patch.dict(logger_service.__dict__, vars(make_logger_service(self.anomalies_log_path)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(logger_service.anomalies_log.close)
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+class TestAnomalyLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "anomalies.csv")
+
+    def test_anomalies_are_written_as_they_arrive(self):
+        logger_service = make_logger_service(self.path)
+
+        logger_service.add_anomaly(LoggableAnomaly("statement", None, "No circuit type found."))
+        logger_service.add_anomaly(LoggableAnomaly(None, "entity", "Broken", severity=Severity.ERROR))
+
+        # not closed, as after a crash
+        self.assertEqual(read_rows(self.path), [
+            ["warning", "statement", "", "No circuit type found."],
+            ["error", "", "entity", "Broken"],
+        ])
+        self.assertEqual(logger_service.severity_counts, {Severity.WARNING: 1, Severity.ERROR: 1})
+        self.assertEqual(logger_service.total_anomalies, 2)
+        self.assertFalse(hasattr(logger_service, "anomalies"))
+
+    def test_previous_log_is_replaced(self):
+        with open(self.path, "w") as f:
+            f.write("warning,old,,old anomaly\r\n")
+        with open(f"{self.path}.1", "w") as f:
+            f.write("warning,older,,old anomaly\r\n")
+        logger_service = make_logger_service(self.path)
+
+        logger_service.add_anomaly(LoggableAnomaly("new", None, "new anomaly"))
+
+        self.assertEqual(get_log_file_paths(self.path), [self.path])
+        self.assertEqual(read_rows(self.path), [["warning", "new", "", "new anomaly"]])
+
+    def test_rotation(self):
+        logger_service = make_logger_service(self.path, max_bytes=1000, backup_count=3)
+
+        for i in range(200):
+            logger_service.add_anomaly(LoggableAnomaly(f"statement {i}", None, "x" * 30))
+        logger_service.close()
+
+        paths = get_log_file_paths(self.path, 3)
+        self.assertEqual(paths, [f"{self.path}.3", f"{self.path}.2", f"{self.path}.1", self.path])
+        self.assertTrue(all(os.path.getsize(path) < 1100 for path in paths))
+        # the oldest rows are dropped, the others are in order
+        statement_ids = [anomaly.statement_id for anomaly in iter_anomalies_log(self.path, 3)]
+        self.assertEqual(statement_ids[-1], "statement 199")
+        self.assertEqual(statement_ids, sorted(statement_ids, key=lambda s: int(s.split()[1])))
+        self.assertEqual(logger_service.total_anomalies, 200)
+
+    def test_memory_does_not_grow_with_the_anomalies(self):
+        logger_service = make_logger_service(self.path)
+        logger_service.add_anomaly(LoggableAnomaly(None, None, "first"))
+
+        tracemalloc.start()
+        try:
+            for i in range(20000):
+                logger_service.add_anomaly(LoggableAnomaly(f"statement {i}", f"entity {i}", AXIOM_NOT_FOUND))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        logger_service.close()
+
+        self.assertLess(peak, 100 * 1024)
+        self.assertEqual(logger_service.total_anomalies, 20001)
+
+    def test_continue_the_log_of_the_previous_step(self):
+        previous_step = make_logger_service(self.path)
+        previous_step.add_anomaly(LoggableAnomaly("statement", None, AXIOM_NOT_FOUND))
+        previous_step.close()
+
+        logger_service = make_logger_service(self.path)
+        logger_service.load_anomalies_from_file(self.path)
+        logger_service.add_anomaly(LoggableAnomaly(None, None, "Ingestion aborted", severity=Severity.ERROR))
+        logger_service.close()
+
+        self.assertEqual([row[3] for row in read_rows(self.path)], [AXIOM_NOT_FOUND, "Ingestion aborted"])
+        self.assertEqual(logger_service.total_anomalies, 2)
+
+    def test_load_anomalies_of_another_file(self):
+        other_path = os.path.join(self.tmp_dir.name, "other.csv")
+        with open(other_path, "w", newline="") as f:
+            csv.writer(f).writerow(["error", "statement", "", "No partial order found"])
+        logger_service = make_logger_service(self.path)
+
+        logger_service.load_anomalies_from_file(other_path)
+        logger_service.load_anomalies_from_file(os.path.join(self.tmp_dir.name, "missing.csv"))
+
+        self.assertEqual(read_rows(self.path), [["error", "statement", "", "No partial order found"]])
+        self.assertEqual(logger_service.severity_counts, {Severity.ERROR: 1})
+
+    def test_db_sink_gets_the_log_on_close(self):
+        written = []
+
+        class ListSink:
+            def write(self, anomalies):
+                written.extend(anomalies)
+
+        logger_service = make_logger_service(self.path)
+        logger_service.set_db_sink(ListSink())
+        logger_service.add_anomaly(LoggableAnomaly("statement", None, AXIOM_NOT_FOUND))
+
+        self.assertEqual(written, [])
+        logger_service.close()
+
+        self.assertEqual([(a.statement_id, a.entity_id, a.message) for a in written], [("statement", None, AXIOM_NOT_FOUND)])
+
+    def test_anomaly_type(self):
+        def anomaly_type(message, severity=Severity.WARNING):
+            return get_anomaly_type(LoggableAnomaly(None, None, message, severity))
+
+        self.assertEqual(anomaly_type(AXIOM_NOT_FOUND), AnomalyType.AXIOM_NOT_FOUND)
+        self.assertEqual(anomaly_type("[CUSTOM_RELATIONSHIP] Error"), AnomalyType.CUSTOM_RELATIONSHIP)
+        self.assertEqual(anomaly_type("Species not found, referred to by 2 statement(s)."), AnomalyType.UNKNOWN_URI)
+        self.assertEqual(anomaly_type("No partial order found", Severity.ERROR), AnomalyType.ERROR)
+        self.assertEqual(anomaly_type("Multiple phenotypes found."), AnomalyType.OTHER)
+        self.assertEqual(
+            get_anomaly_type(LoggableAnomaly(None, None, "Broken", type=AnomalyType.INCORRECT_STATE)),
+            AnomalyType.INCORRECT_STATE,
+        )
+
+
+class TestTemporaryAnomaliesLog(TemporaryAnomaliesLogMixin, unittest.TestCase):
+    def test_shared_logger_service_writes_to_the_temporary_log(self):
+        shared = LoggerService("/nonexistent/anomalies.csv", "/nonexistent/ingested.csv")
+
+        shared.add_anomaly(LoggableAnomaly("statement", None, "anomaly"))
+
+        self.assertEqual(shared.anomalies_log_path, self.anomalies_log_path)
+        self.assertEqual(read_rows(self.anomalies_log_path), [["warning", "statement", "", "anomaly"]])
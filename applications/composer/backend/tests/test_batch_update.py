@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.models import AnatomicalEntity, AnatomicalEntityMeta, ConnectivityStatement, Profile, Sentence
+from composer.services import derived_fields_service
+
+URL = "/api/composer/connectivity-statement/batch/"
+
+
+class ConnectivityStatementBatchUpdateTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        self.statements = [
+            ConnectivityStatement.objects.create(sentence=sentence, knowledge_statement=f"statement {i}", owner=self.user)
+            for i in range(3)
+        ]
+        self.others = ConnectivityStatement.objects.create(
+            sentence=sentence, knowledge_statement="not mine", owner=User.objects.create_user(username="other")
+        )
+        self.entities = []
+        for i in range(2):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"http://example.org/{i}")
+            self.entities.append(AnatomicalEntity.objects.create(simple_entity=meta))
+
+    def test_batch_update_with_coalesced_recompute(self):
+        payload = [
+            {
+                "id": statement.id,
+                "knowledge_statement": f"updated {statement.id}",
+                "origins": [entity.id for entity in self.entities],
+            }
+            for statement in self.statements
+        ]
+
+        with mock.patch.object(
+            derived_fields_service, "compile_journey", wraps=derived_fields_service.compile_journey
+        ) as compile_journey:
+            response = self.client.patch(URL, payload, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.data], [s.id for s in self.statements])
+        self.assertTrue(all(item["status"] == 200 for item in response.data))
+        # one journey compilation per statement, however many signals fired
+        self.assertEqual(compile_journey.call_count, len(self.statements))
+
+        for statement in self.statements:
+            statement.refresh_from_db()
+            self.assertEqual(statement.knowledge_statement, f"updated {statement.id}")
+            self.assertEqual(statement.origins.count(), 2)
+            self.assertIsNotNone(statement.journey_path)
+            self.assertIn("entity 0", statement.statement_suffix)
+
+    def test_nothing_is_written_when_an_update_fails(self):
+        payload = [
+            {"id": self.statements[0].id, "knowledge_statement": "should not be saved"},
+            {"id": self.others.id, "knowledge_statement": "not allowed"},
+            {"id": 999999, "knowledge_statement": "missing"},
+        ]
+
+        response = self.client.patch(URL, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual({item["id"]: item["status"] for item in response.data}, {self.others.id: 403, 999999: 404})
+        self.statements[0].refresh_from_db()
+        self.assertEqual(self.statements[0].knowledge_statement, "statement 0")
+
+    def test_rejects_non_list_payload(self):
+        response = self.client.patch(URL, {"id": self.statements[0].id}, format="json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from composer.enums import BulkActionJobStatus, CSState
+from composer.models import BulkActionJob, ConnectivityStatement, Profile, Sentence
+from composer.pure_enums import BulkActionType
+from composer.services import bulk_jobs_service
+
+
+class BulkActionJobTestCase(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(username="system")
+        self.user = User.objects.create_user(username="staff", is_staff=True)
+        Profile.objects.create(user=self.user, is_curator=True, is_reviewer=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        for i in range(7):
+            ConnectivityStatement.objects.create(
+                sentence=self.sentence,
+                knowledge_statement=f"statement {i}",
+                owner=self.user,
+                # compose_now is not allowed from rejected
+                state=CSState.REJECTED if i < 2 else CSState.DRAFT,
+            )
+
+    def _change_status(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(
+                f"/api/composer/connectivity-statement/bulk_action/?sentence_id={self.sentence.id}",
+                {"action": BulkActionType.CHANGE_STATUS.value, "new_status": CSState.COMPOSE_NOW.value},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(callbacks), 1)
+        return response
+
+    def test_change_status_returns_a_job(self):
+        response = self._change_status()
+
+        job = BulkActionJob.objects.get(id=response.data["id"])
+        self.assertEqual(job.status, BulkActionJobStatus.PENDING)
+        self.assertEqual(job.total, 7)
+        self.assertEqual(job.model_label, "composer.ConnectivityStatement")
+        # nothing changes until the worker runs the job
+        self.assertEqual(ConnectivityStatement.objects.filter(state=CSState.COMPOSE_NOW).count(), 0)
+
+    @mock.patch.object(bulk_jobs_service, "BULK_ACTION_JOB_CHUNK_SIZE", 3)
+    def test_job_progress(self):
+        job_id = self._change_status().data["id"]
+
+        bulk_jobs_service.run_bulk_action_job(job_id)
+
+        progress = self.client.get(f"/api/composer/bulk-action-job/{job_id}/").data
+        self.assertEqual(progress["status"], BulkActionJobStatus.COMPLETED)
+        self.assertEqual(progress["processed"], 7)
+        self.assertEqual(progress["succeeded"], 5)
+        self.assertEqual(progress["failed"], 2)
+        self.assertEqual(ConnectivityStatement.objects.filter(state=CSState.COMPOSE_NOW).count(), 5)
+
+    def test_jobs_are_private(self):
+        job_id = self._change_status().data["id"]
+        other = User.objects.create_user(username="other")
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.client.get(f"/api/composer/bulk-action-job/{job_id}/").status_code, 404)
+
+    def test_stale_jobs_are_failed(self):
+        lost_job_id = self._change_status().data["id"]
+        BulkActionJob.objects.filter(id=lost_job_id).update(
+            status=BulkActionJobStatus.RUNNING, updated_at=timezone.now() - timedelta(minutes=31)
+        )
+        active_job_id = self._change_status().data["id"]
+
+        self.assertEqual(bulk_jobs_service.fail_stale_jobs(), 1)
+
+        progress = self.client.get(f"/api/composer/bulk-action-job/{lost_job_id}/").data
+        self.assertEqual(progress["status"], BulkActionJobStatus.FAILED)
+        self.assertIn("restart", progress["error"])
+        self.assertEqual(BulkActionJob.objects.get(id=active_job_id).status, BulkActionJobStatus.PENDING)
+        self.assertEqual(bulk_jobs_service.fail_stale_jobs(), 0)
+
+    @mock.patch.object(bulk_jobs_service.connection, "close")
+    @mock.patch.object(bulk_jobs_service.threading, "Timer")
+    def test_heartbeat_keeps_the_held_jobs(self, timer, close):
+        held_job_id = self._change_status().data["id"]
+        lost_job_id = self._change_status().data["id"]
+        # both were queued long ago, only the first one is still held by the executor of this process
+        BulkActionJob.objects.update(updated_at=timezone.now() - timedelta(minutes=31))
+
+        with mock.patch.object(bulk_jobs_service, "_held_job_ids", {held_job_id}):
+            bulk_jobs_service._heartbeat()
+
+        self.assertEqual(BulkActionJob.objects.get(id=held_job_id).status, BulkActionJobStatus.PENDING)
+        self.assertEqual(BulkActionJob.objects.get(id=lost_job_id).status, BulkActionJobStatus.FAILED)
+        # the timer goes on while the process holds jobs
+        timer.return_value.start.assert_called_once()
+
+    def test_failed_job_is_not_run(self):
+        job_id = self._change_status().data["id"]
+        bulk_jobs_service.fail_stale_jobs(stale_minutes=0)
+
+        bulk_jobs_service.run_bulk_action_job(job_id)
+
+        job = BulkActionJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.processed), (BulkActionJobStatus.FAILED, 0))
+        self.assertEqual(ConnectivityStatement.objects.filter(state=CSState.COMPOSE_NOW).count(), 0)
+
+    @mock.patch.object(bulk_jobs_service, "BULK_ACTION_JOB_CHUNK_SIZE", 3)
+    def test_job_failed_while_running_is_stopped(self):
+        job_id = self._change_status().data["id"]
+        change_status = bulk_jobs_service.JOB_ACTIONS[BulkActionType.CHANGE_STATUS.value]
+
+        def fail_after_first_chunk(qs, user, data):
+            succeeded = change_status(qs, user, data)
+            bulk_jobs_service.fail_stale_jobs(stale_minutes=0)
+            return succeeded
+
+        with mock.patch.dict(
+            bulk_jobs_service.JOB_ACTIONS, {BulkActionType.CHANGE_STATUS.value: fail_after_first_chunk}
+        ):
+            bulk_jobs_service.run_bulk_action_job(job_id)
+
+        job = BulkActionJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.processed), (BulkActionJobStatus.FAILED, 0))
+        # only the first chunk was applied
+        self.assertLessEqual(ConnectivityStatement.objects.filter(state=CSState.COMPOSE_NOW).count(), 3)
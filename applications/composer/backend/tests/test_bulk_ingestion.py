@@ -0,0 +1,199 @@
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from composer.enums import CSState
+from composer.models import (
+    AlertType,
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    Phenotype,
+    PopulationSet,
+    Sentence,
+    Sex,
+    Specie,
+)
+from composer.services.cs_ingestion.cs_ingestion_services import ingest_to_database
+from composer.services.cs_ingestion.models import (
+    NeuronDMDestination,
+    NeuronDMOrigin,
+    NeuronDMVia,
+    ValidationErrors,
+)
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
+
+BASE = "http://uri.interlex.org/composer/uris/set/bulk"
+ENTITY = "http://purl.obolibrary.org/obo/UBERON_000000"
+ALERT = "http://uri.interlex.org/tgbugs/uris/readable/alert"
+
+
+def make_statement(index, pref_label="statement", origins=(0,), vias=((1,),), destinations=(2,),
+                   forward_connection=(), **overrides):
+    statement = {
+        "id": f"{BASE}/{index}",
+        "label": f"neuron type bulk {index}",
+        "pref_label": f"{pref_label} {index}",
+        "origins": NeuronDMOrigin({f"{ENTITY}{i}" for i in origins}),
+        "vias": [
+            NeuronDMVia({f"{ENTITY}{i}" for i in entities}, set(), order, "AXON")
+            for order, entities in enumerate(vias)
+        ],
+        "destinations": [
+            NeuronDMDestination({f"{ENTITY}{i}" for i in destinations}, set(), "AXON-T")
+        ],
+        "populationset": "bulk",
+        "species": ["http://purl.obolibrary.org/obo/NCBITaxon_10116"],
+        "sex": ["http://purl.obolibrary.org/obo/PATO_0000384"],
+        "circuit_type": ["http://uri.interlex.org/tgbugs/uris/readable/ProjectionPhenotype"],
+        "circuit_role": [],
+        "phenotype": ["http://uri.interlex.org/tgbugs/uris/readable/SympatheticPhenotype"],
+        "other_phenotypes": [],
+        "forward_connection": [f"{BASE}/{i}" for i in forward_connection],
+        "provenance": [f"http://dx.doi.org/10.1126/bulk.{index}"],
+        "expert_consultants": [],
+        "sentence_number": [],
+        "note_alert": [],
+        "validation_errors": ValidationErrors(),
+        "statement_alerts": [],
+    }
+    statement.update(overrides)
+    return statement
+
+
+class BulkIngestionTestCase(TemporaryAnomaliesLogMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"{ENTITY}{i}")
+            # the last entities only have their meta, the ingestion creates the anatomical entity
+            if i < 3:
+                AnatomicalEntity.objects.create(simple_entity=meta)
+        Specie.objects.create(name="Rat", ontology_uri="http://purl.obolibrary.org/obo/NCBITaxon_10116")
+        Sex.objects.create(name="Male", ontology_uri="http://purl.obolibrary.org/obo/PATO_0000384")
+        Phenotype.objects.create(
+            name="Sympathetic", ontology_uri="http://uri.interlex.org/tgbugs/uris/readable/SympatheticPhenotype"
+        )
+        AlertType.objects.create(name="Alert", predicate="alert", uri=ALERT)
+
+        # statements already ingested, the fixture below overwrites them
+        ingest_to_database([
+            make_statement(0),
+            make_statement(1, destinations=(0,), forward_connection=(0,)),
+            make_statement(5, destinations=(3,), forward_connection=(0,)),
+        ])
+        ConnectivityStatement.objects.filter(reference_uri=f"{BASE}/5").update(state=CSState.INVALID)
+
+    def fixture(self):
+        return [
+            # overwritten, with an entity that has no anatomical entity yet
+            make_statement(0, pref_label="updated", origins=(3,), vias=((1, 3),), note_alert=["check the vias"]),
+            # unchanged
+            make_statement(1, destinations=(0,), forward_connection=(0,)),
+            # new statements forward connecting to each other, and to an existing one
+            make_statement(
+                2, origins=(2,), vias=((3,), (4,)), destinations=(0,), forward_connection=(3, 1),
+                statement_alerts=[(ALERT, "alert text"), ("http://example.org/unknown", "lost")],
+            ),
+            make_statement(3, origins=(0,), destinations=(4,), expert_consultants=["https://orcid.org/0000"]),
+            # invalid, its entity and forward connection do not exist
+            make_statement(4, origins=(0, 9), forward_connection=(9,), sentence_number=["1", "2"]),
+            # exported again, only valid once the new origins of 0 are written
+            make_statement(5, destinations=(3,), forward_connection=(0,)),
+        ]
+
+    def snapshot(self):
+        def uris(entities):
+            return sorted(entity.ontology_uri for entity in entities)
+
+        statements = {}
+        for statement in ConnectivityStatement.all_objects.all():
+            statements[statement.reference_uri] = {
+                "fields": (
+                    statement.knowledge_statement, statement.state, statement.curie_id,
+                    statement.sentence.doi, statement.owner_id, statement.sex_id, statement.phenotype_id,
+                    statement.population.name, statement.population_index, statement.circuit_type,
+                    statement.has_statement_been_exported, statement.journey_path,
+                    statement.statement_prefix, statement.statement_suffix, statement.cached_errors,
+                ),
+                "origins": uris(statement.origins.all()),
+                "vias": [
+                    (via.order, via.type, uris(via.anatomical_entities.all()), uris(via.from_entities.all()))
+                    for via in statement.via_set.order_by("order")
+                ],
+                "destinations": sorted(
+                    (destination.type, uris(destination.anatomical_entities.all()),
+                     uris(destination.from_entities.all()))
+                    for destination in statement.destinations.all()
+                ),
+                "species": sorted(statement.species.values_list("name", flat=True)),
+                "provenances": sorted(statement.provenance_set.values_list("uri", flat=True)),
+                "experts": sorted(statement.expertconsultant_set.values_list("uri", flat=True)),
+                "forward_connection": sorted(statement.forward_connection.values_list("reference_uri", flat=True)),
+                "notes": sorted(statement.notes.values_list("type", "note")),
+                "alerts": sorted(statement.statement_alerts.values_list("alert_type__uri", "text")),
+            }
+        return {
+            "statements": statements,
+            "sentences": sorted(Sentence.objects.values_list("doi", "title", "external_ref", "state")),
+            "populations": sorted(PopulationSet.objects.values_list("name", "last_used_index")),
+            "entities": sorted(
+                AnatomicalEntity.objects.filter(simple_entity__isnull=False).values_list(
+                    "simple_entity__ontology_uri", flat=True
+                )
+            ),
+        }
+
+    def ingest(self, bulk):
+        """
+        Ingests the fixture and returns the resulting database state and number of queries,
+        the changes are rolled back.
+        """
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(ingest_to_database(self.fixture(), bulk=bulk))
+            snapshot = self.snapshot()
+            transaction.set_rollback(True)
+        return snapshot, len(queries.captured_queries)
+
+    def test_same_database_state_as_statement_by_statement_ingestion(self):
+        expected, expected_queries = self.ingest(bulk=False)
+        snapshot, queries = self.ingest(bulk=True)
+
+        self.assertEqual(snapshot, expected)
+        self.assertLess(queries, expected_queries)
+
+        statements = snapshot["statements"]
+        self.assertEqual(statements[f"{BASE}/4"]["fields"][1], CSState.INVALID)
+        self.assertEqual(statements[f"{BASE}/2"]["fields"][1], CSState.EXPORTED)
+        self.assertEqual(statements[f"{BASE}/2"]["forward_connection"], [f"{BASE}/1", f"{BASE}/3"])
+        self.assertEqual(statements[f"{BASE}/5"]["fields"][1], CSState.EXPORTED)
+        self.assertIn(f"{ENTITY}3", snapshot["entities"])
+
+    def test_population_set_spellings_share_one_row(self):
+        statements = [
+            make_statement(10, populationset="Mixed"),
+            make_statement(11, populationset="mixed"),
+            make_statement(12, populationset="BULK"),
+        ]
+
+        self.assertTrue(ingest_to_database(statements, bulk=True))
+
+        self.assertEqual(PopulationSet.objects.filter(name="mixed").count(), 1)
+        self.assertFalse(PopulationSet.objects.filter(name__in=["Mixed", "BULK"]).exists())
+        populations = dict(
+            ConnectivityStatement.objects.filter(reference_uri__in=[s["id"] for s in statements]).values_list(
+                "reference_uri", "population__name"
+            )
+        )
+        self.assertEqual(populations, {f"{BASE}/10": "mixed", f"{BASE}/11": "mixed", f"{BASE}/12": "bulk"})
+
+    def test_same_database_state_from_an_empty_database(self):
+        ConnectivityStatement.objects.all().delete()
+        Sentence.objects.all().delete()
+
+        expected, _ = self.ingest(bulk=False)
+        snapshot, _ = self.ingest(bulk=True)
+
+        self.assertEqual(snapshot, expected)
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from composer.enums import CSState, NoteType
+from composer.models import ConnectivityStatement, Note, Sentence, Tag
+from composer.services import bulk_service
+
+
+class SetBasedBulkServiceTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        self.owner = User.objects.create_user(username="owner")
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        for i in range(10):
+            ConnectivityStatement.objects.create(
+                sentence=self.sentence, knowledge_statement=f"statement {i}", owner=self.user
+            )
+        self.tag_a = Tag.objects.create(tag="bulk-a")
+        self.tag_b = Tag.objects.create(tag="bulk-b")
+        self.tag_c = Tag.objects.create(tag="bulk-c")
+
+    def _statements(self):
+        return ConnectivityStatement.objects.filter(sentence=self.sentence).order_by("-modified_date")
+
+    def test_assign_tags_ignores_existing_associations(self):
+        already_tagged = self._statements().first()
+        already_tagged.tags.add(self.tag_a, self.tag_c)
+
+        with self.assertNumQueries(3):
+            processed = bulk_service.assign_tags(
+                self._statements(), [self.tag_a.id, self.tag_b.id, 999999], [self.tag_c.id]
+            )
+
+        self.assertEqual(processed, 10)
+        for statement in self._statements():
+            self.assertEqual(set(statement.tags.all()), {self.tag_a, self.tag_b})
+
+    def test_write_note(self):
+        with self.assertNumQueries(1):
+            created = bulk_service.write_note(self._statements(), self.user, "bulk note")
+
+        self.assertEqual(created, 10)
+        notes = Note.objects.filter(note="bulk note")
+        self.assertEqual(notes.count(), 10)
+        self.assertTrue(all(note.type == NoteType.PLAIN and note.user == self.user for note in notes))
+        self.assertEqual(
+            set(notes.values_list("connectivity_statement_id", flat=True)),
+            set(self._statements().values_list("id", flat=True)),
+        )
+
+    def test_assign_owner_on_sentences_updates_draft_statements(self):
+        # the selection depends on the owner being changed
+        sentences = Sentence.objects.filter(owner=self.user)
+
+        updated = bulk_service.assign_owner(sentences, self.user, self.owner.id)
+
+        self.assertEqual(updated, 1)
+        self.sentence.refresh_from_db()
+        self.assertEqual(self.sentence.owner, self.owner)
+        self.assertFalse(
+            ConnectivityStatement.objects.filter(sentence=self.sentence, state=CSState.DRAFT).exclude(owner=self.owner).exists()
+        )
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from composer.enums import CSState, IngestionRunStatus
+from composer.models import AnatomicalEntity, AnatomicalEntityMeta, ConnectivityStatement, Sex, Specie
+from composer.services.cs_ingestion import cs_ingestion_services
+from composer.services.cs_ingestion.cs_ingestion_services import ingest_to_database_in_chunks
+from tests.test_bulk_ingestion import BASE, ENTITY, make_statement
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
+
+
+class ChunkedIngestionTestCase(TemporaryAnomaliesLogMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"{ENTITY}{i}")
+            AnatomicalEntity.objects.create(simple_entity=meta)
+        Specie.objects.create(name="Rat", ontology_uri="http://purl.obolibrary.org/obo/NCBITaxon_10116")
+        Sex.objects.create(name="Male", ontology_uri="http://purl.obolibrary.org/obo/PATO_0000384")
+
+    def statements(self):
+        return [
+            # forward connects to a statement of the last chunk
+            make_statement(0, forward_connection=(4,)),
+            make_statement(1),
+            make_statement(2),
+            make_statement(3),
+            make_statement(4, origins=(9,)),
+        ]
+
+    def reference_uris(self):
+        return set(ConnectivityStatement.objects.values_list("reference_uri", flat=True))
+
+    def test_chunked_ingestion(self):
+        run = ingest_to_database_in_chunks(self.statements(), chunk_size=2)
+
+        self.assertEqual(run.status, IngestionRunStatus.COMPLETED)
+        self.assertEqual((run.processed, run.total, run.invalid), (5, 5, 1))
+        self.assertEqual(run.last_reference_uri, f"{BASE}/4")
+        self.assertEqual(len(self.reference_uris()), 5)
+        statement = ConnectivityStatement.objects.get(reference_uri=f"{BASE}/0")
+        self.assertEqual(list(statement.forward_connection.values_list("reference_uri", flat=True)), [f"{BASE}/4"])
+        self.assertEqual(statement.state, CSState.EXPORTED)
+
+    def test_resume_failed_run(self):
+        create_or_update = cs_ingestion_services.create_or_update_connectivity_statement
+
+        def fail_on_third_statement(statement, *args, **kwargs):
+            if statement["id"] == f"{BASE}/2":
+                raise ValueError("bad statement")
+            return create_or_update(statement, *args, **kwargs)
+
+        with mock.patch.object(
+            cs_ingestion_services, "create_or_update_connectivity_statement", side_effect=fail_on_third_statement
+        ):
+            run = ingest_to_database_in_chunks(self.statements(), chunk_size=2)
+
+        # the first chunk is committed, the failing one is rolled back
+        self.assertEqual(run.status, IngestionRunStatus.FAILED)
+        self.assertEqual(run.error, "bad statement")
+        self.assertEqual((run.processed, run.last_reference_uri), (2, f"{BASE}/1"))
+        self.assertEqual(self.reference_uris(), {f"{BASE}/0", f"{BASE}/1"})
+
+        with mock.patch.object(
+            cs_ingestion_services, "create_or_update_connectivity_statement", wraps=create_or_update
+        ) as resumed:
+            run = ingest_to_database_in_chunks(self.statements(), resume_run_id=run.id)
+
+        self.assertEqual(resumed.call_count, 3)
+        self.assertEqual(run.status, IngestionRunStatus.COMPLETED)
+        self.assertEqual((run.processed, run.invalid), (5, 1))
+        self.assertEqual(len(self.reference_uris()), 5)
+        self.assertTrue(
+            ConnectivityStatement.objects.get(reference_uri=f"{BASE}/0").forward_connection.exists()
+        )
+
+    def test_resume_with_other_input(self):
+        run = ingest_to_database_in_chunks(self.statements(), chunk_size=2)
+        run.status = IngestionRunStatus.FAILED
+        run.save()
+
+        with self.assertRaises(ValueError):
+            ingest_to_database_in_chunks(self.statements()[1:], resume_run_id=run.id)
@@ -0,0 +1,111 @@
+import time
+import unittest
+from unittest import mock
+
+from composer.services.cs_ingestion import neurondm_script
+from composer.services.cs_ingestion.custom_relationship_code import (
+    CustomCodeStats,
+    CustomCodeTimeout,
+    compile_custom_relationships,
+    run_custom_code,
+)
+from composer.services.cs_ingestion.exceptions import CustomRelationshipCodeError
+from composer.services.cs_ingestion.models import Severity
+from composer.services.cs_ingestion.neurondm_script import process_custom_relationships_for_statement
+
+
+def relationship(relationship_id, code, title="relationship"):
+    return {"id": relationship_id, "title": title, "type": "text", "custom_ingestion_code": code}
+
+
+class TestCustomRelationshipCode(unittest.TestCase):
+    def setUp(self):
+        self.logger_service = neurondm_script.AnomalyCollector()
+
+    def test_syntax_error_fails_with_the_relationship_id(self):
+        with self.assertRaises(CustomRelationshipCodeError) as context:
+            compile_custom_relationships([
+                relationship(1, "result = 1"),
+                relationship(7, "result = (", title="unbalanced"),
+            ])
+
+        self.assertEqual(context.exception.relationship_id, 7)
+        self.assertIn("RelationshipID: 7", str(context.exception))
+
+    def test_code_is_compiled_once(self):
+        compiled = compile_custom_relationships([relationship(1, "result = fc['id'].upper()")])
+
+        with mock.patch("builtins.compile") as compile_:
+            results = [
+                process_custom_relationships_for_statement({"id": f"s{i}"}, compiled, self.logger_service)
+                for i in range(3)
+            ]
+
+        compile_.assert_not_called()
+        self.assertEqual(results, [{1: "S0"}, {1: "S1"}, {1: "S2"}])
+
+    def test_restricted_namespace(self):
+        compiled = compile_custom_relationships([
+            relationship(1, "import re\nimport json\nresult = re.sub('a', 'b', json.dumps(fc['id']))"),
+            relationship(2, "import os\nresult = os.listdir('/')"),
+            relationship(3, "result = open('/etc/passwd').read()"),
+            relationship(4, "prefix = 'x'\ndef label(value):\n    return prefix + value\nresult = label(fc['id'])"),
+        ])
+
+        results = process_custom_relationships_for_statement({"id": "a"}, compiled, self.logger_service)
+
+        self.assertEqual(results, {1: '"b"', 4: "xa"})
+        messages = [anomaly.message for anomaly in self.logger_service.anomalies]
+        self.assertIn("Import of 'os' is not allowed", messages[0])
+        self.assertIn("name 'open' is not defined", messages[1])
+
+    def test_common_builtins(self):
+        compiled = compile_custom_relationships([
+            relationship(1, "try:\n    value = 1 / 0\nexcept ZeroDivisionError:\n    value = divmod(7, 2)\n"
+                            "result = [chr(ord(fc['id']) + 1), value, callable(len)]"),
+            relationship(2, "class Label(object):\n    def __init__(self):\n        super().__init__()\n"
+                            "        self.value = fc['id']\nresult = Label().value"),
+            relationship(3, "try:\n    raise RuntimeError('boom')\nexcept (NameError, RuntimeError) as e:\n    result = str(e)"),
+        ])
+
+        results = process_custom_relationships_for_statement({"id": "a"}, compiled, self.logger_service)
+
+        self.assertEqual(results, {1: ["b", (3, 1), True], 2: "a", 3: "boom"})
+        self.assertEqual(self.logger_service.anomalies, [])
+
+    def test_time_budget(self):
+        compiled = compile_custom_relationships([
+            relationship(1, "try:\n    while True:\n        pass\nexcept Exception:\n    result = 'caught'"),
+        ])
+
+        start = time.perf_counter()
+        with self.assertRaises(CustomCodeTimeout):
+            run_custom_code(compiled[0], {"id": "a"}, seconds=0.2)
+
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_stats_are_logged(self):
+        compiled = compile_custom_relationships([
+            relationship(1, "result = 1 / int(fc['id'])", title="division"),
+            relationship(2, "value = 1", title="no result"),
+        ])
+        stats = {}
+        for statement_id in ("1", "0", "2"):
+            process_custom_relationships_for_statement({"id": statement_id}, compiled, self.logger_service, stats)
+        neurondm_script.logger_service = self.logger_service
+        self.addCleanup(setattr, neurondm_script, "logger_service", None)
+
+        neurondm_script.log_custom_relationships_stats(compiled, stats)
+
+        self.assertEqual((stats[1].calls, stats[1].errors, stats[1].timeouts), (3, 1, 0))
+        self.assertEqual((stats[2].calls, stats[2].errors), (3, 3))
+        summaries = [anomaly for anomaly in self.logger_service.anomalies if anomaly.severity == Severity.INFO]
+        self.assertEqual([anomaly.entity_id for anomaly in summaries], ["1", "2"])
+        self.assertIn("ran on 3 statement(s)", summaries[0].message)
+        self.assertIn("1 error(s), 0 timeout(s)", summaries[0].message)
+
+    def test_stats_merge(self):
+        stats = CustomCodeStats(calls=2, errors=1, seconds=0.5)
+        stats.merge(CustomCodeStats(calls=3, timeouts=1, errors=1, seconds=0.25))
+
+        self.assertEqual(stats, CustomCodeStats(calls=5, errors=2, timeouts=1, seconds=0.75))
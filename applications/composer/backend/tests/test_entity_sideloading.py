@@ -0,0 +1,76 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.models import (
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    Destination,
+    Profile,
+    Sentence,
+    Via,
+)
+
+URL = "/api/composer/connectivity-statement/"
+
+
+class EntitySideloadingTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        self.entities = []
+        for i in range(3):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"http://example.org/{i}")
+            self.entities.append(AnatomicalEntity.objects.create(simple_entity=meta))
+        origin, middle, target = self.entities
+
+        self.statement = ConnectivityStatement.objects.create(
+            sentence=sentence, knowledge_statement="statement", owner=self.user
+        )
+        self.statement.origins.add(origin)
+        via = Via.objects.create(connectivity_statement=self.statement)
+        via.anatomical_entities.add(middle)
+        destination = Destination.objects.create(connectivity_statement=self.statement)
+        destination.anatomical_entities.add(target)
+
+        forward = ConnectivityStatement.objects.create(
+            sentence=sentence, knowledge_statement="forward", owner=self.user
+        )
+        forward.origins.add(target)
+        self.statement.forward_connection.add(forward)
+
+    def _retrieve(self, **params):
+        response = self.client.get(f"{URL}{self.statement.id}/", params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_default_shape_is_unchanged(self):
+        data = self._retrieve().data
+
+        self.assertNotIn("entities", data)
+        self.assertEqual(data["origins"][0]["simple_entity"]["name"], "entity 0")
+
+    def test_sideloaded_entities(self):
+        response = self._retrieve(sideload_entities="true")
+        data = response.data
+        origin, middle, target = self.entities
+
+        self.assertEqual(set(data["entities"]), {origin.id, middle.id, target.id})
+        self.assertEqual(data["entities"][origin.id]["simple_entity"]["name"], "entity 0")
+        self.assertEqual(data["origins"], [origin.id])
+        self.assertEqual(data["vias"][0]["anatomical_entities"], [middle.id])
+        # implicit from_entities and forward connections are referenced the same way
+        self.assertEqual(data["vias"][0]["from_entities"], [origin.id])
+        self.assertEqual(data["destinations"][0]["from_entities"], [middle.id])
+        self.assertEqual(data["forward_connection"][0]["origins"], [target.id])
+
+        self.assertLess(len(response.content), len(self._retrieve().content))
+        self.assertIn(str(origin.id), json.loads(response.content)["entities"])
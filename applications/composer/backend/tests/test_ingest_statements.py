@@ -6,9 +6,10 @@ from composer.services.cs_ingestion.models import NeuronDMOrigin, NeuronDMDestin
 from composer.enums import CSState
 from django.db.models import Q
 from django.test import TestCase
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
 
 
-class TestIngestStatements(TestCase):
+class TestIngestStatements(TemporaryAnomaliesLogMixin, TestCase):
     def flush_connectivity_statements(self):
         ConnectivityStatement.objects.all().delete()
 
@@ -793,7 +794,7 @@ class TestIngestStatements(TestCase):
         )
 
 
-class TestDynamicRelationships(TestCase):
+class TestDynamicRelationships(TemporaryAnomaliesLogMixin, TestCase):
     """Test custom ingestion code for dynamic relationships"""
     
     def flush_connectivity_statements(self):
@@ -6,9 +6,10 @@ from composer.services.cs_ingestion.models import NeuronDMOrigin, NeuronDMDestin
 from composer.enums import CSState
 from django.db.models import Q
 from django.test import TestCase
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
 
 
-class TestIngestStatements(TestCase):
+class TestIngestStatements(TemporaryAnomaliesLogMixin, TestCase):
     # """
     # NOTE:
     # This test depends on the directory system of the Scicrunch neurondm - here - https://raw.githubusercontent.com/SciCrunch/NIF-Ontology/neurons/**/*.ttl
@@ -0,0 +1,88 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.models import IngestionAnomaly
+from composer.services.cs_ingestion.anomaly_db_sink import DatabaseAnomalySink
+from composer.services.cs_ingestion.logging_service import AXIOM_NOT_FOUND, LoggerService
+from composer.services.cs_ingestion.models import LoggableAnomaly, Severity
+
+URL = "/api/composer/ingestion-logs/"
+STATEMENT = "http://uri.interlex.org/tgbugs/uris/readable/neuron-type-test-1"
+
+
+class IngestionAnomaliesViewTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.log_path = os.path.join(self.tmp_dir.name, "ingestion_anomalies_log.csv")
+
+        user = User.objects.create_user(username="admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+        # a previous ingestion, replaced by the sink
+        IngestionAnomaly.objects.create(severity="warning", type="other", message="previous run")
+
+        logger_service = LoggerService.__new__(LoggerService)
+        logger_service.__init__(self.log_path, os.path.join(self.tmp_dir.name, "ingested.csv"), max_bytes=500)
+        logger_service.set_db_sink(DatabaseAnomalySink(batch_size=7))
+        for i in range(30):
+            logger_service.add_anomaly(LoggableAnomaly(None, f"entity {i}", AXIOM_NOT_FOUND))
+        logger_service.add_anomaly(LoggableAnomaly(STATEMENT, None, "No partial order found", severity=Severity.ERROR))
+        logger_service.add_anomaly(LoggableAnomaly(STATEMENT, None, "Multiple phenotypes found."))
+        logger_service.close()
+
+    def get(self, **params):
+        with mock.patch("composer.constants.INGESTION_ANOMALIES_LOG_PATH", self.log_path):
+            return self.client.get(URL, {"log_type": "anomalies", **params})
+
+    def test_sink_replaces_the_anomalies(self):
+        self.assertEqual(IngestionAnomaly.objects.count(), 32)
+        self.assertFalse(IngestionAnomaly.objects.filter(message="previous run").exists())
+        self.assertEqual(IngestionAnomaly.objects.filter(type="axiom_not_found").count(), 30)
+
+    def test_page_and_filter_records(self):
+        response = self.get(output="records", limit=10)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 32)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["entity_id"], "entity 0")
+
+        response = self.get(output="records", statement_id=STATEMENT)
+        self.assertEqual([record["message"] for record in response.data["results"]],
+                         ["No partial order found", "Multiple phenotypes found."])
+
+        response = self.get(output="records", statement_id=STATEMENT, severity="error")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["type"], "error")
+
+        response = self.get(output="records", type="other")
+        self.assertEqual(response.data["count"], 1)
+
+    def test_invalid_filter(self):
+        response = self.get(output="records", severity="fatal")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_download_concatenates_the_rotated_files(self):
+        self.assertTrue(os.path.exists(f"{self.log_path}.1"))
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 32)
+        self.assertIn("entity 0", rows[0])
+        self.assertIn("Multiple phenotypes found.", rows[-1])
+
+    def test_records_only_for_the_anomalies_log(self):
+        response = self.client.get(URL, {"log_type": "ingested", "output": "records"})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from composer.models import (
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    GraphRenderingState,
+    Sex,
+    Specie,
+)
+from composer.services import derived_fields_service
+from composer.services.cs_ingestion.cs_ingestion_services import ingest_to_database
+from composer.services.statement_service import (
+    get_prefix_for_statement_preview,
+    get_suffix_for_statement_preview,
+)
+from tests.test_bulk_ingestion import BASE, ENTITY, make_statement
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
+
+
+class IngestionRelationsDiffTestCase(TemporaryAnomaliesLogMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"{ENTITY}{i}")
+            AnatomicalEntity.objects.create(simple_entity=meta)
+        Specie.objects.create(name="Rat", ontology_uri="http://purl.obolibrary.org/obo/NCBITaxon_10116")
+        Sex.objects.create(name="Male", ontology_uri="http://purl.obolibrary.org/obo/PATO_0000384")
+
+        self.assertTrue(ingest_to_database([make_statement(0, vias=((1,), (2,)), destinations=(3,))]))
+        self.statement = ConnectivityStatement.objects.get(reference_uri=f"{BASE}/0")
+        GraphRenderingState.objects.create(connectivity_statement=self.statement, serialized_graph={})
+
+    def rows(self):
+        return (
+            list(self.statement.via_set.values_list("id", "order")),
+            list(self.statement.destinations.values_list("id", flat=True)),
+            list(self.statement.provenance_set.values_list("id", flat=True)),
+        )
+
+    def reingest(self, **overrides):
+        with mock.patch.object(
+            derived_fields_service, "compile_journey", wraps=derived_fields_service.compile_journey
+        ) as compile_journey:
+            self.assertTrue(ingest_to_database(
+                [make_statement(0, vias=((1,), (2,)), destinations=(3,), **overrides)]
+            ))
+        return compile_journey.call_count
+
+    def test_unchanged_statement_is_not_rewritten(self):
+        rows = self.rows()
+
+        self.assertEqual(self.reingest(), 0)
+
+        self.assertEqual(self.rows(), rows)
+        self.assertTrue(GraphRenderingState.objects.filter(connectivity_statement=self.statement).exists())
+
+    def test_only_changed_rows_are_written(self):
+        (first_via, second_via), destinations, provenances = self.rows()
+        journey_path = ConnectivityStatement.objects.get(pk=self.statement.pk).journey_path
+
+        self.assertEqual(self.reingest(vias=((1,), (4,), (2,))), 1)
+
+        vias, new_destinations, new_provenances = self.rows()
+        self.assertEqual(vias[:2], [first_via, second_via])
+        self.assertEqual(vias[2][1], 2)
+        self.assertEqual(
+            [
+                sorted(via.anatomical_entities.values_list("simple_entity__ontology_uri", flat=True))
+                for via in self.statement.via_set.all()
+            ],
+            [[f"{ENTITY}1"], [f"{ENTITY}4"], [f"{ENTITY}2"]],
+        )
+        self.assertEqual((new_destinations, new_provenances), (destinations, provenances))
+        self.assertFalse(GraphRenderingState.objects.filter(connectivity_statement=self.statement).exists())
+        self.assertNotEqual(ConnectivityStatement.objects.get(pk=self.statement.pk).journey_path, journey_path)
+
+    def test_preview_follows_scalar_changes(self):
+        Sex.objects.create(name="Female", ontology_uri="http://purl.obolibrary.org/obo/PATO_0000383")
+        statement = ConnectivityStatement.objects.get(pk=self.statement.pk)
+        self.assertIn("Male", statement.statement_prefix)
+
+        # only the sex changes, the origins and species stay the same
+        self.reingest(sex=["http://purl.obolibrary.org/obo/PATO_0000383"])
+
+        statement = ConnectivityStatement.objects.get(pk=self.statement.pk)
+        self.assertIn("Female", statement.statement_prefix)
+        self.assertEqual(statement.statement_prefix, get_prefix_for_statement_preview(statement))
+        self.assertEqual(statement.statement_suffix, get_suffix_for_statement_preview(statement))
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from composer.models import AnatomicalEntityMeta, Sex, Specie
+from composer.services.cs_ingestion.helpers import validators
+from composer.services.cs_ingestion.helpers.validators import validate_statements
+from composer.services.cs_ingestion.models import NeuronDMDestination, NeuronDMOrigin, NeuronDMVia
+from tests.test_anomaly_logger import TemporaryAnomaliesLogMixin
+
+ENTITY = "http://purl.obolibrary.org/obo/UBERON_000000"
+RAT = "http://purl.obolibrary.org/obo/NCBITaxon_10116"
+MALE = "http://purl.obolibrary.org/obo/PATO_0000384"
+
+
+def make_statement(index, entities=(0,), species=(RAT,), sex=(MALE,), forward_connection=()):
+    return {
+        "id": f"http://example.org/statement/{index}",
+        "origins": NeuronDMOrigin({f"{ENTITY}{i}" for i in entities}),
+        "vias": [NeuronDMVia({f"{ENTITY}1"}, set(), 0, "AXON")],
+        "destinations": [NeuronDMDestination({f"{ENTITY}2"}, set(), "AXON-T")],
+        "species": list(species),
+        "sex": list(sex),
+        "forward_connection": [f"http://example.org/statement/{i}" for i in forward_connection],
+    }
+
+
+class ValidateStatementsTestCase(TemporaryAnomaliesLogMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"{ENTITY}{i}")
+        Specie.objects.create(name="Rat", ontology_uri=RAT)
+        Sex.objects.create(name="Male", ontology_uri=MALE)
+
+    def validate(self, statements):
+        with CaptureQueriesContext(connection) as queries:
+            validate_statements(statements, update_anatomical_entities=False)
+        return len(queries.captured_queries)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        single = self.validate([make_statement(0)])
+        batch = self.validate([make_statement(i, forward_connection=(i + 1,)) for i in range(10)])
+
+        self.assertEqual(single, batch)
+
+    def test_invalid_uris(self):
+        statements = [
+            make_statement(0, forward_connection=(1,)),
+            make_statement(1, entities=(0, 9), species=(RAT, "http://example.org/dog"),
+                           sex=("http://example.org/unknown", MALE), forward_connection=(9,)),
+            make_statement(2, entities=(9,)),
+        ]
+        with mock.patch.object(validators.logger_service, "add_anomaly") as add_anomaly:
+            validate_statements(statements, update_anatomical_entities=False)
+
+        self.assertFalse(statements[0]["validation_errors"].has_errors())
+        errors = statements[1]["validation_errors"]
+        self.assertEqual(errors.entities, {f"{ENTITY}9"})
+        self.assertEqual(errors.species, {"http://example.org/dog"})
+        self.assertEqual(errors.sex, {"http://example.org/unknown"})
+        self.assertEqual(errors.forward_connection, {"http://example.org/statement/9"})
+
+        # one report per unknown uri, besides the multiple sexes anomaly
+        reported = {anomaly.entity_id: anomaly.message for (anomaly,), _ in add_anomaly.call_args_list}
+        self.assertIn("2 statement(s)", reported[f"{ENTITY}9"])
+        self.assertEqual(
+            set(reported) - {None},
+            {f"{ENTITY}9", "http://example.org/dog", "http://example.org/unknown", "http://example.org/statement/9"},
+        )
@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from composer.services.cs_ingestion.intermediate_file import iter_statements_file, write_statements_file
+from composer.services.cs_ingestion.models import (
+    NeuronDMDestination,
+    NeuronDMOrigin,
+    NeuronDMVia,
+    convert_statement_to_json_serializable,
+)
+
+STATEMENTS = 3000
+# gzip buffers and a few statements
+MEMORY_HIGH_WATER_MARK = 1024 * 1024
+ENTITY = "http://purl.obolibrary.org/obo/UBERON_"
+
+
+def make_statement(index):
+    return {
+        "id": f"http://uri.interlex.org/composer/uris/set/intermediate/{index}",
+        "label": f"neuron type intermediate {index}",
+        "origins": NeuronDMOrigin({f"{ENTITY}{index}"}),
+        "vias": [NeuronDMVia({f"{ENTITY}{index + 1}"}, {f"{ENTITY}{index}"}, 0, "AXON")],
+        "destinations": [NeuronDMDestination({f"{ENTITY}{index + 2}"}, set(), "AXON-T")],
+        "provenance": [f"http://dx.doi.org/10.1126/intermediate.{index}"],
+        "note_alert": ["x" * 1000],
+        "statement_alerts": [("http://uri.interlex.org/tgbugs/uris/readable/alert", f"alert {index}")],
+        "_custom_relationship_results": {"1": [f"value {index}"]},
+    }
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def consume(iterator):
+    for _ in iterator:
+        pass
+
+
+class TestIntermediateFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.ndjson_path = os.path.join(self.tmp_dir.name, "statements.ndjson.gz")
+        self.legacy_path = os.path.join(self.tmp_dir.name, "statements.json")
+
+    def write_legacy_file(self):
+        with open(self.legacy_path, "w", encoding="utf-8") as f:
+            json.dump([convert_statement_to_json_serializable(make_statement(i)) for i in range(STATEMENTS)], f, indent=2)
+
+    def test_round_trip(self):
+        count = write_statements_file(self.ndjson_path, (make_statement(i) for i in range(3)))
+
+        statements = list(iter_statements_file(self.ndjson_path))
+
+        self.assertEqual(count, 3)
+        with gzip.open(self.ndjson_path, "rt") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        self.assertEqual(statements[1]["id"], make_statement(1)["id"])
+        self.assertEqual(statements[1]["origins"].anatomical_entities, {f"{ENTITY}1"})
+        self.assertEqual(statements[1]["vias"][0].from_entities, {f"{ENTITY}1"})
+        self.assertEqual(statements[1]["destinations"][0].type, "AXON-T")
+        self.assertEqual(statements[1]["statement_alerts"], [make_statement(1)["statement_alerts"][0]])
+
+    def test_legacy_format_is_read(self):
+        self.write_legacy_file()
+        write_statements_file(self.ndjson_path, (make_statement(i) for i in range(STATEMENTS)))
+
+        legacy = [convert_statement_to_json_serializable(s) for s in iter_statements_file(self.legacy_path)]
+        streamed = [convert_statement_to_json_serializable(s) for s in iter_statements_file(self.ndjson_path)]
+
+        self.assertEqual(len(streamed), STATEMENTS)
+        self.assertEqual(streamed, legacy)
+
+    def test_memory_high_water_mark(self):
+        self.write_legacy_file()
+
+        write_peak = peak_memory(
+            lambda: write_statements_file(self.ndjson_path, (make_statement(i) for i in range(STATEMENTS)))
+        )
+        streamed_peak = peak_memory(lambda: consume(iter_statements_file(self.ndjson_path)))
+        legacy_peak = peak_memory(lambda: consume(iter_statements_file(self.legacy_path)))
+
+        # streaming only holds a few statements at a time, whatever the size of the file
+        self.assertLess(write_peak, MEMORY_HIGH_WATER_MARK)
+        self.assertLess(streamed_peak, MEMORY_HIGH_WATER_MARK)
+        self.assertGreater(legacy_peak, os.path.getsize(self.legacy_path))
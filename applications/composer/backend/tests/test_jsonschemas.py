@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.enums import RelationshipType
+from composer.models import Relationship
+
+URL = "/api/composer/jsonschemas/"
+
+
+class JsonSchemasCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_none_match_list(self):
+        etag = self.client.get(URL)["ETag"]
+
+        for if_none_match in (f'"other", {etag}', f"W/{etag}", "*"):
+            self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=if_none_match).status_code, 304)
+        # tags are compared exactly
+        for if_none_match in (etag.strip('"'), f'"x{etag}"', f'{etag[:-2]}"'):
+            self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=if_none_match).status_code, 200)
+
+    def test_gzip_matches_raw(self):
+        raw = self.client.get(URL).content
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), raw)
+
+    def test_relationship_write_invalidates_cache(self):
+        etag = self.client.get(URL)["ETag"]
+
+        relationship = Relationship.objects.create(
+            title="Cached relationship",
+            predicate_name="has_cached",
+            predicate_uri="http://example.org/has_cached",
+            type=RelationshipType.TEXT,
+        )
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        properties = json.loads(response.content)["ConnectivityStatement"]["schema"]["properties"]
+        self.assertIn(str(relationship.id), properties["statement_triples"]["properties"])
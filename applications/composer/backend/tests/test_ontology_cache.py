@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from rdflib.namespace import RDFS
+
+from composer.services.cs_ingestion import ontology_cache
+from composer.services.cs_ingestion.ontology_cache import OntologySource, load_ontology_triples
+
+NEURON = "http://uri.interlex.org/tgbugs/uris/readable/neuron-type-"
+UBERON = "http://purl.obolibrary.org/obo/UBERON_"
+
+
+def write_ttl(path, neurons):
+    lines = [
+        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
+        "@prefix owl: <http://www.w3.org/2002/07/owl#> .",
+    ]
+    for i in range(neurons):
+        lines.append(
+            f'<{NEURON}{i}> a owl:Class ; rdfs:label "neuron {i}" ; '
+            f'rdfs:subClassOf <{UBERON}{i:07d}> .'
+        )
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+class TestOntologyCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        self.full_path = os.path.join(self.tmp_dir.name, "full.ttl")
+        self.labels_path = os.path.join(self.tmp_dir.name, "labels.ttl")
+        write_ttl(self.full_path, 2000)
+        write_ttl(self.labels_path, 10)
+        self.sources = [
+            OntologySource("full", self.full_path),
+            OntologySource("labels", self.labels_path, labels_only=True),
+        ]
+
+    def test_warm_load_does_not_parse(self):
+        start = time.perf_counter()
+        cold_triples, cold_failed = load_ontology_triples(self.sources, self.cache_dir)
+        cold_time = time.perf_counter() - start
+
+        with mock.patch.object(ontology_cache, "parse_source") as parse_source:
+            start = time.perf_counter()
+            warm_triples, warm_failed = load_ontology_triples(self.sources, self.cache_dir)
+            warm_time = time.perf_counter() - start
+
+        parse_source.assert_not_called()
+        self.assertEqual(set(warm_triples), set(cold_triples))
+        self.assertEqual(warm_failed, cold_failed)
+        self.assertLess(warm_time, cold_time)
+
+        # 3 triples per neuron of the full import, only the labels of the label import
+        self.assertEqual(len(cold_triples), 2000 * 3 + 10)
+        self.assertEqual(cold_failed, [])
+
+    def test_labels_only_source(self):
+        triples, _ = load_ontology_triples(self.sources[1:])
+
+        self.assertEqual(len(triples), 10)
+        self.assertTrue(all(p == RDFS.label for _, p, _ in triples))
+
+    def test_changed_source_is_parsed_again(self):
+        load_ontology_triples(self.sources, self.cache_dir)
+        write_ttl(self.labels_path, 20)
+
+        triples, _ = load_ontology_triples(self.sources, self.cache_dir)
+
+        self.assertEqual(len(triples), 2000 * 3 + 20)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_failed_sources(self):
+        with open(self.labels_path, "w") as f:
+            f.write("this is not turtle")
+        sources = self.sources + [OntologySource("missing", os.path.join(self.tmp_dir.name, "missing.ttl"))]
+
+        _, cold_failed = load_ontology_triples(sources, self.cache_dir)
+        _, warm_failed = load_ontology_triples(sources, self.cache_dir)
+
+        self.assertEqual({source.name for source in cold_failed}, {"labels", "missing"})
+        self.assertEqual(set(warm_failed), set(cold_failed))
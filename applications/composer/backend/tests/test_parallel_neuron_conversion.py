@@ -0,0 +1,88 @@
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+from composer.services.cs_ingestion import neurondm_script
+from composer.services.cs_ingestion.custom_relationship_code import compile_custom_relationships
+from composer.services.cs_ingestion.models import LoggableAnomaly, Severity
+from composer.services.cs_ingestion.neurondm_script import (
+    convert_neurons_in_parallel,
+    process_custom_relationships_for_statement,
+)
+
+FakeNeuron = namedtuple("FakeNeuron", ["index"])
+
+CUSTOM_RELATIONSHIPS = compile_custom_relationships([
+    {"id": 1, "title": "index", "type": "text", "custom_ingestion_code": "result = fc['_neuron'].index * 2"},
+    {"id": 2, "title": "broken", "type": "text", "custom_ingestion_code": "1 / (fc['_neuron'].index % 5)"},
+])
+
+
+def fake_for_composer(n, statement_alert_uris=None):
+    if n.index % 7 == 0:
+        neurondm_script.logger_service.add_anomaly(
+            LoggableAnomaly(str(n.index), None, "No partial order found", severity=Severity.ERROR)
+        )
+        return None
+    return dict(id=str(n.index), label=f"neuron {n.index}", statement_alerts=sorted(statement_alert_uris), _neuron=n)
+
+
+class TestParallelNeuronConversion(unittest.TestCase):
+    def setUp(self):
+        self.neurons = [FakeNeuron(i) for i in range(1, 101)]
+        patcher = mock.patch.object(neurondm_script, "for_composer", fake_for_composer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def convert_sequentially(self):
+        neurondm_script.logger_service = neurondm_script.AnomalyCollector()
+        fcs = [neurondm_script.for_composer(n, {"alert"}) for n in self.neurons]
+        statements = [item for item in fcs if item is not None]
+        for statement in statements:
+            statement["_custom_relationship_results"] = process_custom_relationships_for_statement(
+                statement, CUSTOM_RELATIONSHIPS, neurondm_script.logger_service
+            )
+            statement.pop("_neuron")
+        return statements, neurondm_script.logger_service.anomalies
+
+    def convert_in_parallel(self, workers, stats=None):
+        neurondm_script.logger_service = neurondm_script.AnomalyCollector()
+        statements = convert_neurons_in_parallel(self.neurons, {"alert"}, CUSTOM_RELATIONSHIPS, workers, stats)
+        return statements, neurondm_script.logger_service.anomalies
+
+    def tearDown(self):
+        neurondm_script.logger_service = None
+
+    def test_same_output_whatever_the_number_of_workers(self):
+        expected_statements, expected_anomalies = self.convert_sequentially()
+
+        for workers in (2, 3, 8):
+            statements, anomalies = self.convert_in_parallel(workers)
+
+            self.assertEqual(statements, expected_statements)
+            self.assertEqual(
+                [(a.statement_id, a.entity_id, a.severity) for a in anomalies],
+                [(a.statement_id, a.entity_id, a.severity) for a in expected_anomalies],
+            )
+
+    def test_custom_relationships_are_evaluated_in_the_workers(self):
+        stats = {}
+        statements, anomalies = self.convert_in_parallel(4, stats)
+
+        self.assertEqual(len(statements), 100 - 14)
+        self.assertEqual((stats[1].calls, stats[1].errors), (86, 0))
+        self.assertEqual((stats[2].calls, stats[2].errors), (86, 86))
+        self.assertEqual(statements[0]["_custom_relationship_results"], {1: 2})
+        self.assertNotIn("_neuron", statements[0])
+        # the conversion anomalies come before the custom relationship ones
+        self.assertEqual(anomalies[0].message, "No partial order found")
+        self.assertIn("[CUSTOM_RELATIONSHIP]", anomalies[-1].message)
+
+    def test_worker_does_not_replace_the_logger_of_the_main_process(self):
+        collector = neurondm_script.AnomalyCollector()
+        neurondm_script.logger_service = collector
+
+        convert_neurons_in_parallel(self.neurons, set(), [], 2)
+
+        self.assertIs(neurondm_script.logger_service, collector)
+        self.assertEqual(len(collector.anomalies), 14)
@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from composer.constants import PREDICATE_MAPPING_MAX_URIS
+from composer.models import AnatomicalEntity, AnatomicalEntityMeta, Sex, Synonym
+from composer.services.cache_version_service import bump_cache_version
+from composer.services.predicate_mapping_service import LABELS_VERSION_KEY, clear_label_cache
+
+URL = "/api/composer/predicate-mapping/"
+
+
+class PredicateMappingTestCase(TestCase):
+
+    def setUp(self):
+        clear_label_cache()
+        self.client = APIClient()
+        self.uris = []
+        for i in range(30):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"http://example.org/ae/{i}")
+            entity = AnatomicalEntity.objects.create(simple_entity=meta)
+            Synonym.objects.create(anatomical_entity=entity, name=f"synonym {i}")
+            self.uris.append(meta.ontology_uri)
+        Sex.objects.create(name="Female", ontology_uri="http://example.org/female")
+
+    def _post(self, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(URL, data, format="json")
+        return response, len(ctx.captured_queries)
+
+    def test_labels_are_resolved_in_batch(self):
+        response, queries = self._post({
+            "hasSomaLocatedIn": self.uris[:20],
+            "hasAxonLocatedIn": self.uris[10:] + ["http://example.org/unknown"],
+            "hasBiologicalSex": ["http://example.org/female"],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["hasSomaLocatedIn"][self.uris[0]], ["entity 0", "synonym 0"])
+        self.assertEqual(response.data["hasAxonLocatedIn"]["http://example.org/unknown"], [])
+        self.assertEqual(response.data["hasBiologicalSex"]["http://example.org/female"], ["Female"])
+        # labels version + entities + synonyms prefetch + sexes
+        self.assertLessEqual(queries, 4)
+
+        # only the labels version is read
+        _, cached_queries = self._post({"hasSomaLocatedIn": self.uris[:20]})
+        self.assertEqual(cached_queries, 1)
+
+    def test_cache_is_cleared_on_synonym_write(self):
+        self._post({"hasSomaLocatedIn": [self.uris[0]]})
+        Synonym.objects.create(anatomical_entity=AnatomicalEntity.objects.get(simple_entity__ontology_uri=self.uris[0]), name="new")
+
+        response, _ = self._post({"hasSomaLocatedIn": [self.uris[0]]})
+        self.assertEqual(set(response.data["hasSomaLocatedIn"][self.uris[0]]), {"entity 0", "synonym 0", "new"})
+
+    def test_cache_follows_the_shared_version(self):
+        self._post({"hasSomaLocatedIn": [self.uris[0]]})
+        # a write made by another process: no signal reaches this one, only the shared version changes
+        AnatomicalEntityMeta.objects.filter(ontology_uri=self.uris[0]).update(name="renamed")
+        bump_cache_version(LABELS_VERSION_KEY)
+
+        response, _ = self._post({"hasSomaLocatedIn": [self.uris[0]]})
+        self.assertEqual(response.data["hasSomaLocatedIn"][self.uris[0]], ["renamed", "synonym 0"])
+
+    def test_request_size_is_bounded(self):
+        uris = [f"http://example.org/{i}" for i in range(PREDICATE_MAPPING_MAX_URIS + 1)]
+        response, _ = self._post({"hasSomaLocatedIn": uris})
+        self.assertEqual(response.status_code, 400)
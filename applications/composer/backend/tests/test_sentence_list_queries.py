@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from composer.enums import SentenceState
+from composer.models import (
+    ConnectivityStatement,
+    Phenotype,
+    PopulationSet,
+    Profile,
+    ProjectionPhenotype,
+    Provenance,
+    Sentence,
+    Sex,
+    Specie,
+)
+
+
+class SentenceListQueryCountTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="triage", first_name="Tri", last_name="Age")
+        Profile.objects.create(user=self.user, is_triage_operator=True, is_reviewer=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        sex = Sex.objects.create(name="Male", ontology_uri="http://example.org/male")
+        phenotype = Phenotype.objects.create(name="Sympathetic", ontology_uri="http://example.org/sympathetic")
+        projection = ProjectionPhenotype.objects.create(name="Projection", ontology_uri="http://example.org/proj")
+        population = PopulationSet.objects.create(name="listpop")
+        species = [
+            Specie.objects.create(name="Rat", ontology_uri="http://example.org/rat"),
+            Specie.objects.create(name="Mouse", ontology_uri="http://example.org/mouse"),
+        ]
+
+        for i in range(20):
+            state = SentenceState.OPEN if i % 2 else SentenceState.READY_TO_COMPOSE
+            sentence = Sentence.objects.create(
+                title=f"sentence {i}", text=f"sentence {i}", pmid=1000 + i, state=state, owner=self.user,
+            )
+            for j in range(2):
+                statement = ConnectivityStatement.objects.create(
+                    sentence=sentence,
+                    knowledge_statement=f"statement {i}.{j}",
+                    sex=sex,
+                    phenotype=phenotype,
+                    projection_phenotype=projection,
+                    population=population,
+                    owner=self.user,
+                )
+                statement.species.add(*species)
+                Provenance.objects.create(connectivity_statement=statement, uri=f"https://example.org/{i}/{j}")
+
+    def _list(self, limit):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/composer/sentence/", {"limit": limit})
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        small_page, small_count = self._list(4)
+        large_page, large_count = self._list(20)
+
+        self.assertEqual(len(small_page.data["results"]), 4)
+        self.assertEqual(len(large_page.data["results"]), 20)
+        self.assertEqual(small_count, large_count)
+
+    def test_nested_statements_and_transitions(self):
+        response, _ = self._list(20)
+        for sentence in response.data["results"]:
+            self.assertEqual(len(sentence["connectivity_statements"]), 2)
+            for statement in sentence["connectivity_statements"]:
+                self.assertEqual(len(statement["species"]), 2)
+                self.assertEqual(len(statement["provenances"]), 1)
+                self.assertEqual(statement["population"]["name"], "listpop")
+
+            instance = Sentence.objects.get(id=sentence["id"])
+            expected = {t.name for t in instance.get_available_user_state_transitions(self.user)}
+            self.assertEqual(set(sentence["available_transitions"]), expected)
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.enums import CSState
+from composer.models import ConnectivityStatement, Profile, Sentence
+
+
+class SparseFieldsetsTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        self.statement = ConnectivityStatement.objects.create(
+            sentence=sentence, knowledge_statement="statement", owner=self.user
+        )
+        self.forward = ConnectivityStatement.objects.create(
+            sentence=sentence, knowledge_statement="forward", owner=self.user
+        )
+        self.statement.forward_connection.add(self.forward)
+        ConnectivityStatement.objects.filter(
+            pk__in=[self.statement.pk, self.forward.pk]
+        ).update(state=CSState.NPO_APPROVED)
+
+    def _retrieve(self, **params):
+        response = self.client.get(f"/api/composer/connectivity-statement/{self.statement.id}/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_representation_by_default(self):
+        data = self._retrieve()
+
+        self.assertIn("journey", data)
+        self.assertEqual(data["forward_connection"][0]["knowledge_statement"], "forward")
+
+    def test_only_requested_fields_are_computed(self):
+        with mock.patch.object(ConnectivityStatement, "get_journey") as get_journey:
+            data = self._retrieve(fields="knowledge_statement,forward_connection")
+
+        get_journey.assert_not_called()
+        self.assertEqual(set(data), {"id", "knowledge_statement", "forward_connection"})
+        self.assertEqual(data["forward_connection"], [self.forward.id])
+
+    def test_expand_forward_connection(self):
+        data = self._retrieve(fields="knowledge_statement,forward_connection", expand="forward_connection")
+
+        self.assertEqual(data["forward_connection"], [{"id": self.forward.id, "knowledge_statement": "forward", "forward_connection": []}])
+
+    def test_knowledge_statement_fields(self):
+        response = self.client.get(
+            "/api/composer/knowledge-statement/", {"fields": "knowledge_statement,forward_connection"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = {item["id"]: item for item in response.data["results"]}
+        self.assertEqual(
+            results[self.statement.id],
+            {"id": self.statement.id, "knowledge_statement": "statement", "forward_connection": [self.forward.id]},
+        )
@@ -0,0 +1,169 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from composer.enums import CSState, RelationshipType, ViaType
+from composer.models import (
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    ConnectivityStatementText,
+    ConnectivityStatementTriple,
+    Destination,
+    Profile,
+    Provenance,
+    Relationship,
+    Sentence,
+    Specie,
+    Tag,
+    Triple,
+    Via,
+)
+from composer.services.cloning_service import clone_statements
+
+URL = "/api/composer/connectivity-statement/"
+
+
+class StatementCloningTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+
+        self.entities = []
+        for i in range(4):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"http://example.org/{i}")
+            self.entities.append(AnatomicalEntity.objects.create(simple_entity=meta))
+        self.specie = Specie.objects.create(name="Rat", ontology_uri="http://example.org/rat")
+        self.tag = Tag.objects.create(tag="cloned")
+        self.triple_relationship = Relationship.objects.create(
+            title="triple", predicate_name="has_triple", predicate_uri="http://example.org/has_triple",
+            type=RelationshipType.TRIPLE_MULTI, order=1,
+        )
+        self.text_relationship = Relationship.objects.create(
+            title="text", predicate_name="has_text", predicate_uri="http://example.org/has_text",
+            type=RelationshipType.TEXT, order=2,
+        )
+        self.triple = Triple.objects.create(relationship=self.triple_relationship, name="t", uri="http://example.org/t")
+
+        self.statements = [self._statement(i) for i in range(3)]
+
+    def _statement(self, i):
+        e = self.entities
+        statement = ConnectivityStatement.objects.create(
+            sentence=self.sentence, knowledge_statement=f"statement {i}", owner=self.user
+        )
+        statement.origins.add(e[0])
+        statement.species.add(self.specie)
+        statement.tags.add(self.tag)
+        Provenance.objects.create(connectivity_statement=statement, uri=f"https://example.org/p{i}")
+        for order in range(2):
+            via = Via.objects.create(connectivity_statement=statement, type=ViaType.DENDRITE)
+            via.anatomical_entities.add(e[order + 1])
+            via.from_entities.add(e[order])
+        destination = Destination.objects.create(connectivity_statement=statement)
+        destination.anatomical_entities.add(e[3])
+        ConnectivityStatementTriple.objects.create(
+            connectivity_statement=statement, relationship=self.triple_relationship
+        ).triples.add(self.triple)
+        ConnectivityStatementText.objects.create(
+            connectivity_statement=statement, relationship=self.text_relationship, text=f"text {i}"
+        )
+        statement.refresh_from_db()
+        return statement
+
+    def _assert_clone(self, original, clone):
+        self.assertNotEqual(original.pk, clone.pk)
+        clone = ConnectivityStatement.objects.get(pk=clone.pk)
+        self.assertEqual(clone.knowledge_statement, original.knowledge_statement)
+        self.assertEqual(clone.journey_path, original.journey_path)
+        self.assertEqual(clone.statement_suffix, original.statement_suffix)
+        self.assertEqual(list(clone.origins.all()), list(original.origins.all()))
+        self.assertEqual(list(clone.species.all()), [self.specie])
+        self.assertEqual(list(clone.tags.all()), [self.tag])
+        self.assertEqual(
+            list(clone.provenance_set.values_list("uri", flat=True)),
+            list(original.provenance_set.values_list("uri", flat=True)),
+        )
+
+        original_vias = Via.objects.filter(connectivity_statement=original).order_by("order")
+        clone_vias = Via.objects.filter(connectivity_statement=clone).order_by("order")
+        self.assertEqual(
+            [(v.order, v.type, list(v.anatomical_entities.all()), list(v.from_entities.all())) for v in clone_vias],
+            [(v.order, v.type, list(v.anatomical_entities.all()), list(v.from_entities.all())) for v in original_vias],
+        )
+        self.assertEqual(
+            list(Destination.objects.get(connectivity_statement=clone).anatomical_entities.all()),
+            [self.entities[3]],
+        )
+        self.assertEqual(
+            list(ConnectivityStatementTriple.objects.get(connectivity_statement=clone).triples.all()),
+            [self.triple],
+        )
+        self.assertEqual(
+            ConnectivityStatementText.objects.get(connectivity_statement=clone).text,
+            ConnectivityStatementText.objects.get(connectivity_statement=original).text,
+        )
+
+    def test_clone_statement(self):
+        original = self.statements[0]
+        response = self.client.get(f"{URL}{original.id}/clone_statement/")
+
+        self.assertEqual(response.status_code, 200)
+        self._assert_clone(original, ConnectivityStatement.objects.get(pk=response.data["id"]))
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        with CaptureQueriesContext(connection) as single:
+            clone_statements(self.statements[:1])
+        with CaptureQueriesContext(connection) as batch:
+            clones = clone_statements(self.statements)
+
+        self.assertEqual(len(single.captured_queries), len(batch.captured_queries))
+
+        for original, clone in zip(self.statements, clones):
+            self._assert_clone(original, clone)
+
+    def test_clone_batch(self):
+        ids = [self.statements[2].id, self.statements[0].id]
+        response = self.client.post(f"{URL}clone_statements/", {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item["knowledge_statement"] for item in response.data], ["statement 2", "statement 0"])
+        for original, item in zip([self.statements[2], self.statements[0]], response.data):
+            self._assert_clone(original, ConnectivityStatement.objects.get(pk=item["id"]))
+
+    def test_clone_ingested_statement(self):
+        original = self.statements[0]
+        ConnectivityStatement.objects.filter(pk=original.pk).update(
+            reference_uri="http://example.org/neuron/0", curie_id="neuron:0", population_index=3,
+            has_statement_been_exported=True, state=CSState.EXPORTED,
+        )
+        original.refresh_from_db()
+
+        # cloned twice: the clones must not collide with the original nor with each other
+        responses = [
+            self.client.post(f"{URL}clone_statements/", {"ids": [original.id]}, format="json") for _ in range(2)
+        ]
+
+        for response in responses:
+            self.assertEqual(response.status_code, 201)
+            clone = ConnectivityStatement.objects.get(pk=response.data[0]["id"])
+            self._assert_clone(original, clone)
+            self.assertEqual(
+                (clone.reference_uri, clone.curie_id, clone.population_index,
+                 clone.has_statement_been_exported, clone.state),
+                (None, None, None, False, CSState.DRAFT),
+            )
+        original.refresh_from_db()
+        self.assertEqual((original.reference_uri, original.state), ("http://example.org/neuron/0", CSState.EXPORTED))
+
+    def test_clone_batch_with_unknown_ids(self):
+        response = self.client.post(f"{URL}clone_statements/", {"ids": [self.statements[0].id, 999999]}, format="json")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(ConnectivityStatement.objects.count(), len(self.statements))
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from composer.enums import NoteType
+from composer.models import ConnectivityStatement, Note, Sentence, Tag
+
+
+class ConnectivityStatementListQueryCountTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="curator", first_name="Cu", last_name="Rator")
+        self.sentence = Sentence.objects.create(title="List sentence", text="List sentence", owner=self.user)
+        tag_a = Tag.objects.create(tag="list-a")
+        tag_b = Tag.objects.create(tag="list-b")
+
+        for i in range(20):
+            statement = ConnectivityStatement.objects.create(
+                sentence=self.sentence,
+                knowledge_statement=f"statement {i}",
+                owner=self.user,
+            )
+            statement.tags.add(tag_a, tag_b)
+            if i % 2:
+                Note.objects.create(connectivity_statement=statement, user=self.user, note=f"note {i}")
+            else:
+                Note.objects.create(
+                    connectivity_statement=statement, user=self.user, note=f"transition {i}",
+                    type=NoteType.TRANSITION,
+                )
+
+    def _list(self, limit):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                "/api/composer/connectivity-statement/",
+                {"sentence_id": self.sentence.id, "limit": limit},
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        small_page, small_count = self._list(5)
+        large_page, large_count = self._list(20)
+
+        self.assertEqual(len(small_page.data["results"]), 5)
+        self.assertEqual(len(large_page.data["results"]), 20)
+        self.assertEqual(small_count, large_count)
+        # count + page + tags prefetch
+        self.assertLessEqual(large_count, 4)
+
+    def test_has_notes_ignores_transition_notes(self):
+        response, _ = self._list(20)
+        has_notes = {
+            item["knowledge_statement"]: item["has_notes"] for item in response.data["results"]
+        }
+        for i in range(20):
+            self.assertEqual(has_notes[f"statement {i}"], bool(i % 2))
@@ -0,0 +1,154 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from composer.enums import RelationshipType
+from composer.models import (
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    CacheVersion,
+    ConnectivityStatement,
+    ConnectivityStatementAnatomicalEntity,
+    ConnectivityStatementText,
+    ConnectivityStatementTriple,
+    Destination,
+    Profile,
+    Relationship,
+    Sentence,
+    Triple,
+    Via,
+)
+from composer.services.relationship_service import RELATIONSHIPS_VERSION_KEY, get_relationship_options
+
+
+class StatementRetrieveQueryCountTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        self.order = 0
+
+    def _relationship(self, relationship_type):
+        self.order += 1
+        return Relationship.objects.create(
+            title=f"relationship {self.order}",
+            predicate_name=f"has_{self.order}",
+            predicate_uri=f"http://example.org/has_{self.order}",
+            type=relationship_type,
+            order=self.order,
+        )
+
+    def _entity(self, name):
+        meta = AnatomicalEntityMeta.objects.create(name=name, ontology_uri=f"http://example.org/{name}")
+        return AnatomicalEntity.objects.create(simple_entity=meta)
+
+    def _add_dynamic_values(self, statement, count):
+        for i in range(count):
+            relationship = self._relationship(RelationshipType.TRIPLE_MULTI)
+            triple = Triple.objects.create(relationship=relationship, name=f"triple {self.order}", uri=f"http://example.org/t{self.order}")
+            ConnectivityStatementTriple.objects.create(
+                connectivity_statement=statement, relationship=relationship
+            ).triples.add(triple)
+
+            ConnectivityStatementText.objects.create(
+                connectivity_statement=statement, relationship=self._relationship(RelationshipType.TEXT), text=f"text {i}"
+            )
+
+            ConnectivityStatementAnatomicalEntity.objects.create(
+                connectivity_statement=statement, relationship=self._relationship(RelationshipType.ANATOMICAL_MULTI)
+            ).anatomical_entities.add(self._entity(f"entity {self.order}"))
+
+    def _statement(self, dynamic_values, forward_connections):
+        statement = ConnectivityStatement.objects.create(sentence=self.sentence, owner=self.user)
+        self._add_dynamic_values(statement, dynamic_values)
+        for _ in range(forward_connections):
+            forward = ConnectivityStatement.objects.create(sentence=self.sentence, owner=self.user)
+            self._add_dynamic_values(forward, dynamic_values)
+            statement.forward_connection.add(forward)
+        return statement
+
+    def _retrieve(self, statement):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/api/composer/connectivity-statement/{statement.id}/")
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_depend_on_dynamic_values(self):
+        # warm up the cached work (stored errors, relationship catalog, ...)
+        small = self._statement(dynamic_values=1, forward_connections=2)
+        large = self._statement(dynamic_values=4, forward_connections=2)
+        self._retrieve(small)
+        self._retrieve(large)
+
+        small_response, small_count = self._retrieve(small)
+        large_response, large_count = self._retrieve(large)
+
+        self.assertEqual(len(large_response.data["statement_triples"]), 4)
+        self.assertEqual(len(large_response.data["statement_texts"]), 4)
+        self.assertEqual(len(large_response.data["statement_anatomical_entities"]), 4)
+        self.assertEqual(len(large_response.data["forward_connection"][0]["statement_texts"]), 4)
+        self.assertEqual(small_count, large_count)
+
+    def _add_layers(self, statement, vias):
+        origin = self._entity(f"origin {statement.id}")
+        statement.origins.add(origin)
+        previous = origin
+        for order in range(vias):
+            via = Via.objects.create(connectivity_statement=statement)
+            entity = self._entity(f"via {statement.id}.{order}")
+            via.anatomical_entities.add(entity)
+            if order == 1:
+                # explicit connection, skipping the previous via
+                via.from_entities.add(origin)
+            previous = entity
+        destination = Destination.objects.create(connectivity_statement=statement)
+        destination.anatomical_entities.add(self._entity(f"destination {statement.id}"))
+        return origin, previous
+
+    def test_query_count_does_not_depend_on_layers(self):
+        small = self._statement(dynamic_values=1, forward_connections=1)
+        large = self._statement(dynamic_values=1, forward_connections=1)
+        self._add_layers(small, vias=1)
+        origin, last_via_entity = self._add_layers(large, vias=4)
+        self._retrieve(small)
+        self._retrieve(large)
+
+        _, small_count = self._retrieve(small)
+        large_response, large_count = self._retrieve(large)
+
+        self.assertEqual(small_count, large_count)
+        vias = large_response.data["vias"]
+        self.assertEqual([via["order"] for via in vias], [0, 1, 2, 3])
+        self.assertEqual([e["id"] for e in vias[0]["from_entities"]], [origin.id])
+        self.assertTrue(vias[1]["are_connections_explicit"])
+        self.assertEqual([e["id"] for e in vias[1]["from_entities"]], [origin.id])
+        self.assertFalse(vias[2]["are_connections_explicit"])
+        self.assertEqual(vias[2]["from_entities"], vias[1]["anatomical_entities"])
+        destination = large_response.data["destinations"][0]
+        self.assertEqual([e["id"] for e in destination["from_entities"]], [last_via_entity.id])
+
+    def test_relationship_options_catalog(self):
+        relationship = self._relationship(RelationshipType.TRIPLE_SINGLE)
+        triple = Triple.objects.create(relationship=relationship, name="first", uri="http://example.org/first")
+        self.assertEqual(get_relationship_options(relationship.id), [{"id": triple.id, "name": "first", "uri": "http://example.org/first"}])
+
+        # only the shared version is read
+        with self.assertNumQueries(1):
+            get_relationship_options(relationship.id)
+
+        # writes bump the version, so the catalog is rebuilt
+        Triple.objects.create(relationship=relationship, name="second", uri="http://example.org/second")
+        self.assertEqual([option["name"] for option in get_relationship_options(relationship.id)], ["first", "second"])
+
+        # a write handled by another app process only changes the version in the database
+        Triple.objects.bulk_create([Triple(relationship=relationship, name="third", uri="http://example.org/third")])
+        CacheVersion.objects.filter(key=RELATIONSHIPS_VERSION_KEY).update(version=F("version") + 1)
+        self.assertEqual(len(get_relationship_options(relationship.id)), 3)
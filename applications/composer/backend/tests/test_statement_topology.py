@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from composer.enums import DestinationType, ViaType
+from composer.models import (
+    AnatomicalEntity,
+    AnatomicalEntityMeta,
+    ConnectivityStatement,
+    Destination,
+    Profile,
+    Sentence,
+    Via,
+)
+from composer.services import derived_fields_service
+
+URL = "/api/composer/connectivity-statement/"
+
+
+class StatementTopologyTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        Profile.objects.create(user=self.user, is_curator=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+        self.statement = ConnectivityStatement.objects.create(
+            sentence=self.sentence, knowledge_statement="statement", owner=self.user
+        )
+        self.entities = []
+        for i in range(5):
+            meta = AnatomicalEntityMeta.objects.create(name=f"entity {i}", ontology_uri=f"http://example.org/{i}")
+            self.entities.append(AnatomicalEntity.objects.create(simple_entity=meta))
+
+    def _topology(self):
+        e = [entity.id for entity in self.entities]
+        return {
+            "origins": [e[0]],
+            "vias": [
+                {"type": ViaType.AXON, "anatomical_entities": [e[1]], "from_entities": [e[0]]},
+                {"type": ViaType.DENDRITE, "anatomical_entities": [e[2], e[3]], "from_entities": [e[1]]},
+            ],
+            "destinations": [
+                {"type": DestinationType.AFFERENT_T, "anatomical_entities": [e[4]], "from_entities": [e[2], e[3]]},
+            ],
+        }
+
+    def _put(self, statement, payload):
+        with mock.patch.object(
+            derived_fields_service, "compile_journey", wraps=derived_fields_service.compile_journey
+        ) as compile_journey:
+            response = self.client.put(f"{URL}{statement.id}/topology/", payload, format="json")
+        return response, compile_journey.call_count
+
+    def _assert_topology(self, statement):
+        e = self.entities
+        self.assertEqual(list(statement.origins.all()), [e[0]])
+
+        vias = list(Via.objects.filter(connectivity_statement=statement).order_by("order"))
+        self.assertEqual([via.order for via in vias], [0, 1])
+        self.assertEqual([via.type for via in vias], [ViaType.AXON, ViaType.DENDRITE])
+        self.assertEqual(set(vias[1].anatomical_entities.all()), {e[2], e[3]})
+        self.assertEqual(list(vias[1].from_entities.all()), [e[1]])
+
+        destination = Destination.objects.get(connectivity_statement=statement)
+        self.assertEqual(destination.type, DestinationType.AFFERENT_T)
+        self.assertEqual(list(destination.anatomical_entities.all()), [e[4]])
+        self.assertEqual(set(destination.from_entities.all()), {e[2], e[3]})
+
+        statement.refresh_from_db()
+        self.assertTrue(statement.journey_path)
+        self.assertIn("entity 0", statement.statement_suffix)
+
+    def test_replace_topology(self):
+        old_via = Via.objects.create(connectivity_statement=self.statement)
+        old_via.anatomical_entities.add(self.entities[4])
+
+        response, journey_compilations = self._put(self.statement, self._topology())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["vias"]), 2)
+        self.assertEqual(journey_compilations, 1)
+        self.assertFalse(Via.objects.filter(id=old_via.id).exists())
+        self._assert_topology(self.statement)
+
+    def test_create_with_topology(self):
+        payload = {"sentence_id": self.sentence.id, "knowledge_statement": "nested", **self._topology()}
+
+        with mock.patch.object(
+            derived_fields_service, "compile_journey", wraps=derived_fields_service.compile_journey
+        ) as compile_journey:
+            response = self.client.post(f"{URL}with-topology/", payload, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(compile_journey.call_count, 1)
+        statement = ConnectivityStatement.objects.get(id=response.data["id"])
+        self.assertEqual(statement.knowledge_statement, "nested")
+        self._assert_topology(statement)
+
+    def test_unknown_entities_are_rejected(self):
+        payload = self._topology()
+        payload["vias"][0]["anatomical_entities"].append(999999)
+
+        response, _ = self._put(self.statement, payload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Via.objects.filter(connectivity_statement=self.statement).exists())
+
+    def test_only_the_owner_can_replace_topology(self):
+        statement = ConnectivityStatement.objects.create(
+            sentence=self.sentence, knowledge_statement="not mine", owner=User.objects.create_user(username="other")
+        )
+
+        response, _ = self._put(statement, self._topology())
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(statement.origins.exists())
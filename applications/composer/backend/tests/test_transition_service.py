@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from composer.enums import SentenceState
+from composer.models import ConnectivityStatement, Profile, Provenance, Sentence
+from composer.services.transition_service import TransitionEvaluator
+
+
+class TransitionEvaluatorTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="evaluator")
+        Profile.objects.create(user=self.user, is_triage_operator=True, is_curator=True, is_reviewer=True)
+
+        self.sentences = []
+        for i in range(6):
+            state = SentenceState.OPEN if i % 2 else SentenceState.READY_TO_COMPOSE
+            sentence = Sentence.objects.create(
+                title=f"sentence {i}", text=f"sentence {i}", pmid=2000 + i, state=state, owner=self.user,
+            )
+            statement = ConnectivityStatement.objects.create(
+                sentence=sentence, knowledge_statement=f"statement {i}", owner=self.user,
+            )
+            Provenance.objects.create(connectivity_statement=statement, uri=f"https://example.org/{i}")
+            self.sentences.append(sentence)
+
+    def test_matches_django_fsm(self):
+        evaluator = TransitionEvaluator(self.user)
+        for sentence in self.sentences:
+            expected = [t.name for t in sentence.get_available_user_state_transitions(self.user)]
+            self.assertEqual([t.name for t in evaluator.get_available_transitions(sentence)], expected)
+
+    def test_permissions_are_computed_once_per_state(self):
+        evaluator = TransitionEvaluator(self.user)
+        for sentence in self.sentences:
+            evaluator.get_available_transitions(sentence)
+
+        self.assertEqual(len(evaluator._permitted), 2)
+
+    def test_conditions_are_memoized_per_version(self):
+        evaluator = TransitionEvaluator(self.user)
+        sentence = self.sentences[0]
+        first = evaluator.get_available_transitions(sentence)
+
+        with self.assertNumQueries(0):
+            second = evaluator.get_available_transitions(sentence)
+        self.assertEqual([t.name for t in first], [t.name for t in second])
+
+    def test_for_request_reuses_evaluator(self):
+        class FakeRequest:
+            user = self.user
+
+        request = FakeRequest()
+        self.assertIs(TransitionEvaluator.for_request(request), TransitionEvaluator.for_request(request))
@@ -0,0 +1,98 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from composer.enums import CSState, NoteType
+from composer.models import ConnectivityStatement, Note, Sentence
+from composer.services.cs_ingestion.helpers.upstream_changes_helper import (
+    propagate_invalid_state,
+    update_upstream_statements,
+)
+
+CHAIN_LENGTH = 10000
+
+
+class UpstreamPropagationTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="curator")
+        self.sentence = Sentence.objects.create(title="sentence", text="sentence", owner=self.user)
+
+    def chain(self, length, state):
+        """
+        Statements where each one forward connects to the next, the last one is invalid.
+        """
+        statements = ConnectivityStatement.objects.bulk_create([
+            ConnectivityStatement(sentence=self.sentence, knowledge_statement=f"statement {i}", owner=self.user)
+            for i in range(length)
+        ])
+        ConnectivityStatement.objects.filter(pk__in=[statement.pk for statement in statements]).update(
+            state=state, has_statement_been_exported=True
+        )
+        ConnectivityStatement.objects.filter(pk=statements[-1].pk).update(state=CSState.INVALID)
+        ForwardConnection = ConnectivityStatement.forward_connection.through
+        ForwardConnection.objects.bulk_create([
+            ForwardConnection(from_connectivitystatement_id=upstream.pk, to_connectivitystatement_id=downstream.pk)
+            for upstream, downstream in zip(statements, statements[1:])
+        ])
+        return statements
+
+    def test_invalid_state_is_propagated_upstream(self):
+        statements = self.chain(4, CSState.EXPORTED)
+        first, second, third, invalid = statements
+        # a second path to the first statement
+        first.forward_connection.add(third)
+
+        update_upstream_statements()
+
+        self.assertEqual(
+            set(ConnectivityStatement.objects.filter(state=CSState.INVALID).values_list("id", flat=True)),
+            {statement.id for statement in statements},
+        )
+        notes = dict(Note.objects.filter(type=NoteType.ALERT).values_list("connectivity_statement_id", "note"))
+        self.assertEqual(
+            notes[third.id],
+            f"Invalidated due to the following reason(s): statement with id {third.id} is invalid "
+            f"because its forward connection with id {invalid.id} is invalid",
+        )
+        self.assertIn(
+            f"forward connection with id {third.id} is invalid because of the invalid statement with id {invalid.id}",
+            notes[first.id],
+        )
+        self.assertIn(f"forward connection with id {second.id} is invalid", notes[first.id])
+        self.assertNotIn(invalid.id, notes)
+
+    def test_deep_chain_in_memory(self):
+        backward_connections = {i + 1: [i] for i in range(CHAIN_LENGTH - 1)}
+
+        start = time.perf_counter()
+        reasons = propagate_invalid_state([CHAIN_LENGTH - 1], backward_connections)
+        elapsed = time.perf_counter() - start
+
+        # the depth of the chain (no recursion limit) is the regression guard, the timing is only reported
+        self.assertEqual(
+            len(reasons), CHAIN_LENGTH - 1, f"propagation over {CHAIN_LENGTH} statements took {elapsed:.3f}s"
+        )
+        self.assertEqual(
+            reasons[0],
+            [f"statement with id 0 is invalid because its forward connection with id 1 is invalid "
+             f"because of the invalid statement with id {CHAIN_LENGTH - 1}"],
+        )
+
+    def test_deep_chain_benchmark(self):
+        statements = self.chain(CHAIN_LENGTH, CSState.INVALID)
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            update_upstream_statements()
+        elapsed = time.perf_counter() - start
+
+        # the number of queries does not depend on the length of the chain
+        self.assertLess(len(queries.captured_queries), 10, f"{len(queries.captured_queries)} queries in {elapsed:.3f}s")
+        self.assertEqual(
+            Note.objects.filter(type=NoteType.ALERT, connectivity_statement__in=statements).count(),
+            CHAIN_LENGTH - 1,
+        )
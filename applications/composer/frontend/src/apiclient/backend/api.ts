@@ -311,6 +311,81 @@ export type BlankEnum = typeof BlankEnum[keyof typeof BlankEnum];
  */
 export type BulkAction = { action: 'assign_population_set' } & AssignPopulationSet | { action: 'assign_tag' } & AssignTags | { action: 'assign_user' } & AssignUser | { action: 'change_status' } & ChangeStatus | { action: 'write_note' } & WriteNote;
 
+/**
+ * Bulk action executed in the background, in chunks, by the local job worker. The selection is frozen (object_ids) when the job is created.
+ * @export
+ * @interface BulkActionJob
+ */
+export interface BulkActionJob {
+    /**
+     * 
+     * @type {number}
+     * @memberof BulkActionJob
+     */
+    'id': number;
+    /**
+     * 
+     * @type {string}
+     * @memberof BulkActionJob
+     */
+    'action': string;
+    /**
+     * 
+     * @type {StatusEnum}
+     * @memberof BulkActionJob
+     */
+    'status': StatusEnum;
+    /**
+     * 
+     * @type {number}
+     * @memberof BulkActionJob
+     */
+    'total': number;
+    /**
+     * 
+     * @type {number}
+     * @memberof BulkActionJob
+     */
+    'processed': number;
+    /**
+     * 
+     * @type {number}
+     * @memberof BulkActionJob
+     */
+    'succeeded': number;
+    /**
+     * 
+     * @type {number}
+     * @memberof BulkActionJob
+     */
+    'failed': number;
+    /**
+     * 
+     * @type {string}
+     * @memberof BulkActionJob
+     */
+    'error': string;
+    /**
+     * 
+     * @type {string}
+     * @memberof BulkActionJob
+     */
+    'created_at': string;
+    /**
+     * 
+     * @type {string}
+     * @memberof BulkActionJob
+     */
+    'started_at': string | null;
+    /**
+     * 
+     * @type {string}
+     * @memberof BulkActionJob
+     */
+    'finished_at': string | null;
+}
+
+
 /**
  * 
  * @export
@@ -3467,6 +3542,25 @@ export interface StatementAlert {
      */
     'connectivity_statement_id': number;
 }
+/**
+ * * `pending` - Pending
+ * * `running` - Running
+ * * `completed` - Completed
+ * * `failed` - Failed
+ * @export
+ * @enum {string}
+ */
+
+export const StatusEnum = {
+    Pending: 'pending',
+    Running: 'running',
+    Completed: 'completed',
+    Failed: 'failed'
+} as const;
+
+export type StatusEnum = typeof StatusEnum[keyof typeof StatusEnum];
+
+
 /**
  * Note Tag
  * @export
@@ -3849,6 +3943,48 @@ export const ComposerApiAxiosParamCreator = function (configuration?: Configurat
 
 
     
+            setSearchParams(localVarUrlObj, localVarQueryParameter);
+            let headersFromBaseOptions = baseOptions && baseOptions.headers ? baseOptions.headers : {};
+            localVarRequestOptions.headers = {...localVarHeaderParameter, ...headersFromBaseOptions, ...options.headers};
+
+            return {
+                url: toPathString(localVarUrlObj),
+                options: localVarRequestOptions,
+            };
+        },
+        /**
+         * Bulk action jobs: progress of the bulk actions running in the background.
+         * @param {number} id A unique integer value identifying this bulk action job.
+         * @param {*} [options] Override http request option.
+         * @throws {RequiredError}
+         */
+        composerBulkActionJobRetrieve: async (id: number, options: RawAxiosRequestConfig = {}): Promise<RequestArgs> => {
+            // verify required parameter 'id' is not null or undefined
+            assertParamExists('composerBulkActionJobRetrieve', 'id', id)
+            const localVarPath = `/api/composer/bulk-action-job/{id}/`
+                .replace(`{${"id"}}`, encodeURIComponent(String(id)));
+            // use dummy base URL string because the URL constructor only accepts absolute URLs.
+            const localVarUrlObj = new URL(localVarPath, DUMMY_BASE_URL);
+            let baseOptions;
+            if (configuration) {
+                baseOptions = configuration.baseOptions;
+            }
+
+            const localVarRequestOptions = { method: 'GET', ...baseOptions, ...options};
+            const localVarHeaderParameter = {} as any;
+            const localVarQueryParameter = {} as any;
+
+            // authentication basicAuth required
+            // http basic authentication required
+            setBasicAuthToObject(localVarRequestOptions, configuration)
+
+            // authentication tokenAuth required
+            await setApiKeyToObject(localVarHeaderParameter, "Authorization", configuration)
+
+            // authentication cookieAuth required
+
+
+    
             setSearchParams(localVarUrlObj, localVarQueryParameter);
             let headersFromBaseOptions = baseOptions && baseOptions.headers ? baseOptions.headers : {};
             localVarRequestOptions.headers = {...localVarHeaderParameter, ...headersFromBaseOptions, ...options.headers};
@@ -4466,7 +4602,7 @@ export const ComposerApiAxiosParamCreator = function (configuration?: Configurat
             };
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<number>} [destinations] 
          * @param {Array<number>} [excludeIds] Multiple values may be separated by commas.
          * @param {number} [excludeSentenceId] 
@@ -7016,7 +7152,7 @@ export const ComposerApiAxiosParamCreator = function (configuration?: Configurat
             };
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<string>} [batchName] Multiple values may be separated by commas.
          * @param {Array<string>} [exclude] Multiple values may be separated by commas.
          * @param {Array<number>} [include] Multiple values may be separated by commas.
@@ -8345,6 +8481,18 @@ export const ComposerApiFp = function(configuration?: Configuration) {
             const localVarOperationServerBasePath = operationServerMap['ComposerApi.composerAnatomicalEntityRetrieve']?.[localVarOperationServerIndex]?.url;
             return (axios, basePath) => createRequestFunction(localVarAxiosArgs, globalAxios, BASE_PATH, configuration)(axios, localVarOperationServerBasePath || basePath);
         },
+        /**
+         * Bulk action jobs: progress of the bulk actions running in the background.
+         * @param {number} id A unique integer value identifying this bulk action job.
+         * @param {*} [options] Override http request option.
+         * @throws {RequiredError}
+         */
+        async composerBulkActionJobRetrieve(id: number, options?: RawAxiosRequestConfig): Promise<(axios?: AxiosInstance, basePath?: string) => AxiosPromise<BulkActionJob>> {
+            const localVarAxiosArgs = await localVarAxiosParamCreator.composerBulkActionJobRetrieve(id, options);
+            const localVarOperationServerIndex = configuration?.serverIndex ?? 0;
+            const localVarOperationServerBasePath = operationServerMap['ComposerApi.composerBulkActionJobRetrieve']?.[localVarOperationServerIndex]?.url;
+            return (axios, basePath) => createRequestFunction(localVarAxiosArgs, globalAxios, BASE_PATH, configuration)(axios, localVarOperationServerBasePath || basePath);
+        },
         /**
          * ConnectivityStatement
          * @param {number} id A unique integer value identifying this connectivity statement.
@@ -8510,7 +8658,7 @@ export const ComposerApiFp = function(configuration?: Configuration) {
             return (axios, basePath) => createRequestFunction(localVarAxiosArgs, globalAxios, BASE_PATH, configuration)(axios, localVarOperationServerBasePath || basePath);
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<number>} [destinations] 
          * @param {Array<number>} [excludeIds] Multiple values may be separated by commas.
          * @param {number} [excludeSentenceId] 
@@ -9208,7 +9356,7 @@ export const ComposerApiFp = function(configuration?: Configuration) {
             return (axios, basePath) => createRequestFunction(localVarAxiosArgs, globalAxios, BASE_PATH, configuration)(axios, localVarOperationServerBasePath || basePath);
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<string>} [batchName] Multiple values may be separated by commas.
          * @param {Array<string>} [exclude] Multiple values may be separated by commas.
          * @param {Array<number>} [include] Multiple values may be separated by commas.
@@ -9602,6 +9750,15 @@ export const ComposerApiFactory = function (configuration?: Configuration, baseP
         composerAnatomicalEntityRetrieve(id: number, options?: RawAxiosRequestConfig): AxiosPromise<AnatomicalEntity> {
             return localVarFp.composerAnatomicalEntityRetrieve(id, options).then((request) => request(axios, basePath));
         },
+        /**
+         * Bulk action jobs: progress of the bulk actions running in the background.
+         * @param {number} id A unique integer value identifying this bulk action job.
+         * @param {*} [options] Override http request option.
+         * @throws {RequiredError}
+         */
+        composerBulkActionJobRetrieve(id: number, options?: RawAxiosRequestConfig): AxiosPromise<BulkActionJob> {
+            return localVarFp.composerBulkActionJobRetrieve(id, options).then((request) => request(axios, basePath));
+        },
         /**
          * ConnectivityStatement
          * @param {number} id A unique integer value identifying this connectivity statement.
@@ -9731,7 +9888,7 @@ export const ComposerApiFactory = function (configuration?: Configuration, baseP
             return localVarFp.composerConnectivityStatementAvailableOptionsRetrieve(destinations, excludeIds, excludeSentenceId, hasStatementBeenExported, include, knowledgeStatement, notes, ordering, origins, populationset, sentenceId, state, tags, options).then((request) => request(axios, basePath));
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<number>} [destinations] 
          * @param {Array<number>} [excludeIds] Multiple values may be separated by commas.
          * @param {number} [excludeSentenceId] 
@@ -10270,7 +10427,7 @@ export const ComposerApiFactory = function (configuration?: Configuration, baseP
             return localVarFp.composerSentenceBatchNamesRetrieve(options).then((request) => request(axios, basePath));
         },
         /**
-         * Apply a bulk action to the selected items and return the number of items updated successfully.
+         * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
          * @param {Array<string>} [batchName] Multiple values may be separated by commas.
          * @param {Array<string>} [exclude] Multiple values may be separated by commas.
          * @param {Array<number>} [include] Multiple values may be separated by commas.
@@ -10594,6 +10751,17 @@ export class ComposerApi extends BaseAPI {
         return ComposerApiFp(this.configuration).composerAnatomicalEntityRetrieve(id, options).then((request) => request(this.axios, this.basePath));
     }
 
+    /**
+     * Bulk action jobs: progress of the bulk actions running in the background.
+     * @param {number} id A unique integer value identifying this bulk action job.
+     * @param {*} [options] Override http request option.
+     * @throws {RequiredError}
+     * @memberof ComposerApi
+     */
+    public composerBulkActionJobRetrieve(id: number, options?: RawAxiosRequestConfig) {
+        return ComposerApiFp(this.configuration).composerBulkActionJobRetrieve(id, options).then((request) => request(this.axios, this.basePath));
+    }
+
     /**
      * ConnectivityStatement
      * @param {number} id A unique integer value identifying this connectivity statement.
@@ -10747,7 +10915,7 @@ export class ComposerApi extends BaseAPI {
     }
 
     /**
-     * Apply a bulk action to the selected items and return the number of items updated successfully.
+     * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
      * @param {Array<number>} [destinations] 
      * @param {Array<number>} [excludeIds] Multiple values may be separated by commas.
      * @param {number} [excludeSentenceId] 
@@ -11392,7 +11560,7 @@ export class ComposerApi extends BaseAPI {
     }
 
     /**
-     * Apply a bulk action to the selected items and return the number of items updated successfully.
+     * Apply a bulk action to the selected items and return the number of items updated successfully. Long running actions (status changes) are queued instead, and the created job is returned so its progress can be followed.
      * @param {Array<string>} [batchName] Multiple values may be separated by commas.
      * @param {Array<string>} [exclude] Multiple values may be separated by commas.
      * @param {Array<number>} [include] Multiple values may be separated by commas.
@@ -1,4 +1,5 @@
 import React, { useState } from "react";
+import { Alert, AlertColor, Snackbar } from "@mui/material";
 import PopoverMenu from "./PopoverMenu";
 import { ChangeStatusIcon, ChangeStatusDialogIcon } from "../icons";
 import { SentenceLabels, StatementsLabels } from "../../helpers/helpers";
@@ -11,6 +12,8 @@ import connectivityStatementService from "../../services/StatementService";
 import {useDispatch, useSelector} from "react-redux";
 import {RootState} from "../../redux/store";
 import { PopoverOptionType } from "../../types";
+import { BulkActionJob, StatusEnum } from "../../apiclient/backend";
+import { BulkActionJobTimeoutError } from "../../services/BulkActionJobService";
 
 interface ChangeStatusProps {
   selectedRowsCount: number;
@@ -28,6 +31,7 @@ interface ChangeStatusProps {
 const ChangeStatus: React.FC<ChangeStatusProps> = ({ entityType, possibleTransitions, queryOptions, onClick, onConfirm, isFetchingOptions, selectedRowsCount, setGridLoading, isGridLoading, originalStatus }) => {
   const [selectedStatus, setSelectedStatus] = useState<PopoverOptionType | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
+  const [result, setResult] = useState<{ severity: AlertColor; message: string } | null>(null);
   const dialogsState = useSelector((state: RootState) => state.statement.dialogs);
 
   const dispatch = useDispatch();
@@ -41,7 +45,7 @@ const ChangeStatus: React.FC<ChangeStatusProps> = ({ entityType, possibleTransit
 
   const changeStatusMap: Record<
     ENTITY_TYPES,
-    (queryOptions: SentenceQueryParams | StatementQueryParams, newStatus: string) => Promise<{ message: string }>
+    (queryOptions: SentenceQueryParams | StatementQueryParams, newStatus: string) => Promise<BulkActionJob>
   > = {
     [ENTITY_TYPES.SENTENCE]: (queryOptions, newStatus) =>
       sentenceService.changeStatusBulk(queryOptions as SentenceQueryParams, newStatus),
@@ -62,6 +66,16 @@ const ChangeStatus: React.FC<ChangeStatusProps> = ({ entityType, possibleTransit
     }
   };
 
+  const getJobResult = (job: BulkActionJob): { severity: AlertColor; message: string } => {
+    if (job.status === StatusEnum.Failed) {
+      return { severity: "error", message: `Status change failed after ${job.processed} of ${job.total} ${entityType}: ${job.error}` };
+    }
+    return {
+      severity: job.failed > 0 ? "warning" : "success",
+      message: `Status changed for ${job.succeeded} of ${job.total} ${entityType}.`,
+    };
+  };
+
   const handleStatusChange = async (statusOption: PopoverOptionType) => {
     if (!statusOption) return;
     setGridLoading(true);
@@ -69,9 +83,16 @@ const ChangeStatus: React.FC<ChangeStatusProps> = ({ entityType, possibleTransit
     try {
       const changeStatusFunction = changeStatusMap[entityType];
       if (!changeStatusFunction) throw new Error(`No function found for ${entityType}`);
-      await changeStatusFunction(queryOptions, statusOption.value);
+      // resolves once the background job is finished
+      const job = await changeStatusFunction(queryOptions, statusOption.value);
+      setResult(getJobResult(job));
     } catch (error) {
+      if (error instanceof BulkActionJobTimeoutError) {
+        setResult({ severity: "warning", message: `Status change still running (${error.job.processed} of ${error.job.total} ${entityType} processed), refresh the list later to see the result.` });
+        return;
+      }
       console.error("Error changing status:", error);
+      setResult({ severity: "error", message: "Status change failed." });
     } finally {
       setGridLoading(false);
       onConfirm();
@@ -116,6 +137,16 @@ const ChangeStatus: React.FC<ChangeStatusProps> = ({ entityType, possibleTransit
         dontShowAgain={dialogsState.changeStatus}
         setDontShowAgain={() => dispatch(setDialogState({ dialogKey: "changeStatus", dontShow: true }))}
       />
+      <Snackbar
+        open={result !== null}
+        autoHideDuration={6000}
+        onClose={() => setResult(null)}
+        anchorOrigin={{ vertical: "bottom", horizontal: "center" }}
+      >
+        <Alert severity={result?.severity} onClose={() => setResult(null)}>
+          {result?.message}
+        </Alert>
+      </Snackbar>
     </>
   );
 };
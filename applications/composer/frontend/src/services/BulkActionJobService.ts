@@ -0,0 +1,46 @@
+import { composerApi } from "./apis";
+import { BulkActionJob, StatusEnum } from "../apiclient/backend";
+
+const POLL_INTERVAL_MS = 1000;
+// Stop polling after this long, the job keeps running in the background
+const MAX_WAIT_MS = 30 * 60 * 1000;
+
+const isFinished = (job: BulkActionJob) =>
+  job.status === StatusEnum.Completed || job.status === StatusEnum.Failed;
+
+/**
+ * Raised when a bulk action job is still unfinished after the maximum wait.
+ */
+export class BulkActionJobTimeoutError extends Error {
+  job: BulkActionJob;
+
+  constructor(job: BulkActionJob) {
+    super(`Bulk action job ${job.id} is still ${job.status} after ${job.processed} of ${job.total} objects`);
+    this.name = "BulkActionJobTimeoutError";
+    this.job = job;
+  }
+}
+
+/**
+ * Poll a bulk action job until the background worker completes or fails it.
+ * @param job - The job returned by the bulk action endpoint.
+ * @param pollInterval - Delay between two polls, in milliseconds.
+ * @param maxWait - Maximum time spent polling, in milliseconds.
+ * @returns The finished job, with its succeeded / failed counts or its error.
+ * @throws BulkActionJobTimeoutError if the job is not finished after maxWait.
+ */
+export async function waitForBulkActionJob(
+  job: BulkActionJob,
+  pollInterval: number = POLL_INTERVAL_MS,
+  maxWait: number = MAX_WAIT_MS,
+): Promise<BulkActionJob> {
+  const deadline = Date.now() + maxWait;
+  while (!isFinished(job)) {
+    if (Date.now() >= deadline) {
+      throw new BulkActionJobTimeoutError(job);
+    }
+    await new Promise((resolve) => setTimeout(resolve, pollInterval));
+    job = await composerApi.composerBulkActionJobRetrieve(job.id).then((response: any) => response.data);
+  }
+  return job;
+}
@@ -1,6 +1,7 @@
 import { composerApi } from "./apis";
-import { ActionEnum, BulkAction, PaginatedSentenceList, PatchedSentence, Sentence } from '../apiclient/backend';
+import { ActionEnum, BulkAction, BulkActionJob, PaginatedSentenceList, PatchedSentence, Sentence } from '../apiclient/backend';
 import { AbstractService } from "./AbstractService";
+import { waitForBulkActionJob } from "./BulkActionJobService";
 import { QueryParams } from "../redux/sentenceSlice";
 import { checkSentenceOwnership } from "../helpers/ownershipAlert";
 
@@ -196,9 +197,11 @@ async performBulkAction(queryOptions: QueryParams, bulkAction: BulkAction): Prom
 
   /**
    * Bulk change the status of selected sentences.
+   * The change runs as a background job, resolved once the job is finished.
    */
-  async changeStatusBulk(queryOptions: QueryParams, newStatus: string): Promise<{ message: string }> {
-    return this.performBulkAction(queryOptions, { action: ActionEnum.ChangeStatus, new_status: newStatus });
+  async changeStatusBulk(queryOptions: QueryParams, newStatus: string): Promise<BulkActionJob> {
+    const job: BulkActionJob = await this.performBulkAction(queryOptions, { action: ActionEnum.ChangeStatus, new_status: newStatus }) as any;
+    return waitForBulkActionJob(job);
   }
 
   /**
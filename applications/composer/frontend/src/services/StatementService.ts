@@ -3,12 +3,14 @@ import {
   ActionEnum,
   AnatomicalEntity,
   BulkAction,
+  BulkActionJob,
   ConnectivityStatement,
   ConnectivityStatementUpdate,
   PaginatedBaseConnectivityStatementList, PatchedConnectivityStatement,
   PatchedConnectivityStatementUpdate
 } from '../apiclient/backend'
 import { AbstractService } from "./AbstractService"
+import { waitForBulkActionJob } from "./BulkActionJobService"
 import { QueryParams } from "../redux/statementSlice"
 import { checkOwnership } from "../helpers/ownershipAlert";
 import { ChangeRequestStatus } from "../helpers/settings";
@@ -457,9 +459,11 @@ class ConnectivityStatementService extends AbstractService {
 
   /**
    * Bulk change the status of selected connectivity statements.
+   * The change runs as a background job, resolved once the job is finished.
    */
-  async changeStatusBulk(queryOptions: QueryParams, newStatus: string): Promise<{ message: string }> {
-    return this.performBulkAction(queryOptions, { action: ActionEnum.ChangeStatus, new_status: newStatus });
+  async changeStatusBulk(queryOptions: QueryParams, newStatus: string): Promise<BulkActionJob> {
+    const job: BulkActionJob = await this.performBulkAction(queryOptions, { action: ActionEnum.ChangeStatus, new_status: newStatus }) as any;
+    return waitForBulkActionJob(job);
   }
 
     /**
@@ -17,6 +17,8 @@ fi
 # Django setup
 python3 manage.py collectstatic --noinput
 python3 manage.py migrate
+# fail the bulk action jobs lost with the previous server processes
+python3 manage.py fail_stale_bulk_action_jobs
 
 # Determine server to run
 if [ "$DEBUG" = "true" ]; then
@@ -10,8 +10,8 @@ import logging
 
 sys.path.insert(0, '/usr/src/app')
 from composer.services.cs_ingestion.neurondm_script import main as get_statements_from_neurondm
-from composer.services.cs_ingestion.logging_service import LoggerService
-from composer.services.cs_ingestion.models import convert_statement_to_json_serializable
+from composer.services.cs_ingestion.logging_service import LoggerService, format_severity_counts
+from composer.services.cs_ingestion.intermediate_file import write_statements_file
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -31,7 +31,7 @@ def main():
         '--output_filepath',
         type=str,
         required=True,
-        help='Path to output JSON file with processed statements'
+        help='Path to output gzip NDJSON file (.ndjson.gz) with processed statements'
     )
     parser.add_argument(
         '--full_imports',
@@ -50,6 +50,22 @@ def main():
         type=str,
         help='Path to population URIs file'
     )
+    parser.add_argument(
+        '--ontology_dir', '--ontology-dir',
+        type=str,
+        help='Path to a local NIF-Ontology checkout (neurons branch), the ttl files are not downloaded'
+    )
+    parser.add_argument(
+        '--ontology_cache_dir',
+        type=str,
+        help='Directory of the parsed ontology cache, reused while the ttl files are unchanged'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of processes converting the neurons'
+    )
     parser.add_argument(
         '--anomalies_csv_output',
         type=str,
@@ -109,23 +125,24 @@ def main():
             statement_alert_uris=statement_alert_uris,
             population_uris=population_uris,
             custom_relationships=custom_relationships,
+            ontology_dir=args.ontology_dir,
+            ontology_cache_dir=args.ontology_cache_dir,
+            workers=args.workers,
         )
         
         logger.info(f"Processed {len(statements_list)} statements")
         
-        # Convert statements to JSON-serializable format
-        logger.info("Converting statements to JSON-serializable format...")
-        json_statements = [convert_statement_to_json_serializable(stmt) for stmt in statements_list]
-        
-        # Save to JSON file
-        with open(args.output_filepath, 'w', encoding='utf-8') as f:
-            json.dump(json_statements, f, indent=2)
+        # Save to the gzip NDJSON intermediate file, one statement per line
+        write_statements_file(args.output_filepath, statements_list)
         
         logger.info(f"Successfully saved statements to {args.output_filepath}")
         
 
-        logger_service.write_anomalies_to_file()
-        logger.info(f"Saved {len(logger_service.anomalies)} anomalies to {logger_service.anomalies_log_path}")
+        logger_service.close()
+        logger.info(
+            f"Saved {logger_service.total_anomalies} anomalies to {logger_service.anomalies_log_path} "
+            f"({format_severity_counts(logger_service.severity_counts)})"
+        )
         
         sys.exit(0)
         